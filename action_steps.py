@@ -0,0 +1,156 @@
+#action_steps.py
+
+# Row/card position of each car type on the demo site
+CAR_TYPE_INDEX = {"SUV": 0, "VAN": 1, "Luxury": 2}
+
+# Each action is a list of steps, tuples of (op, *args), plus a function that
+# builds the result message from the values the steps read from the page.
+# The sync engine (playwright_actions) and the async engine (async_actions)
+# only know how to run each op, so both always do exactly the same thing.
+#
+#   ("section", selector)                 go to an in-page section
+#   ("scroll", selector)                  scroll an element into view
+#   ("capture", description, kind)        screenshot, if the capture policy wants `kind`
+#   ("fill", selector, value)
+#   ("select", selector, value)
+#   ("check", selector)
+#   ("click", selector)
+#   ("form_cleared",)                     wait until the booking form is empty
+#   ("dialog", selector, name)            click, store the dialog message as `name`
+#   ("text", selector, name)              store the element text as `name`
+#   ("popup", selector, description, name) click, capture the new tab as the result,
+#                                         store its URL as `name` and close it
+STEP_OPS = {"section", "scroll", "capture", "fill", "select", "check", "click",
+            "form_cleared", "dialog", "text", "popup"}
+
+
+def _search_car(instruction):
+    query = instruction.get("query")
+    steps = [
+        ("fill", 'form.search-bar input[name="search"]', query),
+        ("capture", f"Before searching for '{query}'", "step"),
+        ("popup", 'form.search-bar button', f"Search results for '{query}'", "url"),
+    ]
+    return steps, lambda values: f"Search completed for '{query}'. New page: {values['url']}"
+
+
+def _fill_booking_form(instruction):
+    form_data = instruction.get("form_data", {})
+    steps = [
+        ("section", "#booking"),
+        ("capture", "Empty booking form", "step"),
+        ("fill", '#fn', form_data.get("name", "John Doe")),
+        ("fill", '#email', form_data.get("email", "john@example.com")),
+        ("fill", 'input[name="start"]', form_data.get("start_date", "2025-08-01")),
+        ("fill", 'input[name="end"]', form_data.get("end_date", "2025-08-07")),
+        ("select", '#type', form_data.get("car_type", "SUV")),
+    ]
+    if form_data.get("cdw", True):
+        steps.append(("check", '#cdw'))
+    if form_data.get("terms", True):
+        steps.append(("check", '#term1'))
+    steps.append(("capture", "Filled booking form", "result"))
+    return steps, lambda values: "Booking form filled successfully"
+
+
+def _submit_booking(instruction):
+    steps = [
+        ("section", "#booking"),
+        ("capture", "Before submitting booking", "step"),
+        ("popup", '#submit', "Booking submission result", "url"),
+    ]
+    return steps, lambda values: f"Booking submitted. Redirect page: {values['url']}"
+
+
+def _reset_form(instruction):
+    steps = [
+        ("section", "#booking"),
+        ("capture", "Before form reset", "step"),
+        ("click", '#reset'),
+        ("form_cleared",),
+        ("capture", "After form reset", "result"),
+    ]
+    return steps, lambda values: "Form reset completed"
+
+
+def _navigate_to_section(instruction):
+    section = instruction.get("section", "#home")
+    steps = [
+        ("capture", f"Before navigating to {section}", "step"),
+        ("section", section),
+        ("capture", f"After navigating to {section}", "result"),
+    ]
+    return steps, lambda values: f"Navigated to section: {section}"
+
+
+def _test_contact_links(instruction):
+    steps = [
+        ("scroll", '#contact'),
+        ("capture", "Contact section", "step"),
+        ("dialog", '.footer-section a >> nth=0', "dialog"),
+        ("capture", "After contact dialog", "result"),
+    ]
+    return steps, lambda values: f"Contact link tested. Dialog: {values['dialog']}"
+
+
+def _check_pricing(instruction):
+    car_type = instruction.get("car_type", "SUV")
+    steps = [
+        ("section", "#price"),
+        ("capture", "Pricing table", "result"),
+    ]
+    if car_type in CAR_TYPE_INDEX:
+        steps.append(("text", f'tbody tr >> nth={CAR_TYPE_INDEX[car_type]} >> td >> nth=1', "price"))
+    return steps, lambda values: f"{car_type} price per day: {values.get('price') or ''}"
+
+
+def _validate_empty_form(instruction):
+    steps = [
+        ("section", "#booking"),
+        ("capture", "Empty form for validation", "step"),
+        ("dialog", '#submit', "dialog"),
+        ("capture", "After validation attempt", "result"),
+    ]
+    return steps, lambda values: f"Empty form validation tested. Message: {values['dialog']}"
+
+
+def _check_car_details(instruction):
+    car_type = instruction.get("car_type", "SUV")
+    steps = [
+        ("section", "#cars"),
+        ("capture", "Cars section", "result"),
+    ]
+    if car_type in CAR_TYPE_INDEX:
+        steps.append(("text", f'.car-item >> nth={CAR_TYPE_INDEX[car_type]} >> p', "name"))
+    return steps, lambda values: f"Car type: {values.get('name') or ''}"
+
+
+ACTION_STEPS = {
+    "search_car": _search_car,
+    "fill_booking_form": _fill_booking_form,
+    "submit_booking": _submit_booking,
+    "reset_form": _reset_form,
+    "navigate_to_section": _navigate_to_section,
+    "test_contact_links": _test_contact_links,
+    "check_pricing": _check_pricing,
+    "validate_empty_form": _validate_empty_form,
+    "check_car_details": _check_car_details,
+}
+
+
+def action_steps(instruction):
+    """(steps, message) for a single action; unknown actions get no steps and an "Unsupported" message"""
+    action = instruction.get("action")
+    build = ACTION_STEPS.get(action)
+    if build is None:
+        return [], lambda values: f"Unsupported action: {action}"
+    return build(instruction)
+
+
+def plan_step_failed(index, step, error):
+    """The exception a failing run_plan step is re-raised as"""
+    return RuntimeError(f"Plan step {index} ({step.get('action')}) failed: {error}")
+
+
+def plan_step_line(index, step, result):
+    return f"{index}. {step.get('action')}: {result}"
@@ -1,16 +1,12 @@
 import streamlit as st
-import json
-import time
+import uuid
 from datetime import datetime, date
-import base64
-from io import BytesIO
-from PIL import Image
-import os
 
 # Import your existing modules
-from client import call_ollama_model
-from parser import parse_response
-from playwright_actions import perform_action
+from artifact_store import get_artifact_store
+from history_store import get_history_store
+from instruction_pipeline import resolve_instruction
+from job_runner import get_job_runner
 
 # Page configuration
 st.set_page_config(
@@ -75,11 +71,25 @@ st.markdown("""
 
 # Initialize session state
 if 'automation_history' not in st.session_state:
-    st.session_state.automation_history = []
-if 'current_action' not in st.session_state:
-    st.session_state.current_action = None
+    st.session_state.automation_history = []  # Row ids in the shared history store
+if 'active_jobs' not in st.session_state:
+    st.session_state.active_jobs = []  # Ids of this session's background jobs that are still running
 if 'screenshots' not in st.session_state:
-    st.session_state.screenshots = []
+    st.session_state.screenshots = []  # Artifact store digests, not image bytes
+if 'run_id' not in st.session_state:
+    st.session_state.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+THUMBNAIL_WIDTH = 320
+JOB_POLL_SECONDS = 0.5
+
+@st.cache_data(max_entries=200, show_spinner=False)
+def load_thumbnail(screenshot_id, width=THUMBNAIL_WIDTH):
+    """Small JPEG for a stored screenshot; shared across sessions and reruns"""
+    return get_artifact_store().thumbnail(screenshot_id, width)
+
+def load_screenshot(screenshot_id):
+    """Full-size screenshot bytes, read from disk only when asked for"""
+    return get_artifact_store().get(screenshot_id)
 
 def main():
     # Header
@@ -188,14 +198,6 @@ def main():
                 st.success("History cleared!")
                 st.rerun()
         
-        # Current action status
-        if st.session_state.current_action:
-            st.markdown(f"""
-            <div class="info-box">
-                <strong>🔄 Current Action:</strong> {st.session_state.current_action}
-            </div>
-            """, unsafe_allow_html=True)
-        
         # Advanced form for custom booking
         with st.expander("🔧 Advanced Booking Form"):
             st.subheader("Custom Booking Parameters")
@@ -231,14 +233,17 @@ def main():
     with col2:
         st.header("📊 Status & Screenshots")
         
+        # Progress of running jobs; polls by itself without rerunning the whole page
+        show_active_jobs()
+        
         # Screenshots section
         if st.session_state.screenshots:
             st.subheader("📸 Latest Screenshots")
             for i, screenshot in enumerate(reversed(st.session_state.screenshots[-3:])):  # Show last 3
                 try:
-                    # Convert bytes to image
-                    image = Image.open(BytesIO(screenshot['image']))
-                    st.image(image, caption=f"{screenshot['timestamp']} - {screenshot['action']}", use_column_width=True)
+                    thumbnail = load_thumbnail(screenshot['id'])
+                    if thumbnail:
+                        st.image(thumbnail, caption=f"{screenshot['timestamp']} - {screenshot['action']}", use_column_width=True)
                 except Exception as e:
                     st.error(f"Error displaying screenshot: {e}")
         else:
@@ -248,8 +253,10 @@ def main():
     st.header("📋 Automation History")
     
     if st.session_state.automation_history:
-        for i, entry in enumerate(reversed(st.session_state.automation_history[-10:])):  # Show last 10
-            with st.expander(f"🕐 {entry['timestamp']} - {entry['command'][:50]}{'...' if len(entry['command']) > 50 else ''}"):
+        entries = get_history_store().get_many(reversed(st.session_state.automation_history[-10:]))  # Show last 10
+        for i, entry in enumerate(entries):
+            timestamp = datetime.fromtimestamp(entry['created_at']).strftime("%Y-%m-%d %H:%M:%S")
+            with st.expander(f"🕐 {timestamp} - {entry['command'][:50]}{'...' if len(entry['command']) > 50 else ''}"):
                 col_hist1, col_hist2 = st.columns(2)
                 
                 with col_hist1:
@@ -264,16 +271,21 @@ def main():
                 
                 with col_hist2:
                     st.markdown("**Parsed Action:**")
-                    if entry['parsed_action']:
-                        st.json(entry['parsed_action'])
+                    if entry['instruction']:
+                        st.json(entry['instruction'])
                     else:
                         st.text("No parsed action")
                     
-                    if 'screenshot' in entry and entry['screenshot']:
+                    if entry.get('screenshot_id'):
                         st.markdown("**Screenshot:**")
                         try:
-                            image = Image.open(BytesIO(entry['screenshot']))
-                            st.image(image, use_column_width=True)
+                            # Expander bodies run on every rerun, so only read the full image on request
+                            if st.checkbox("Show full screenshot", key=f"full_{entry['screenshot_id']}_{i}"):
+                                image = load_screenshot(entry['screenshot_id'])
+                            else:
+                                image = load_thumbnail(entry['screenshot_id'])
+                            if image:
+                                st.image(image, use_column_width=True)
                         except Exception as e:
                             st.error(f"Error displaying screenshot: {e}")
     else:
@@ -283,15 +295,15 @@ def test_command(user_input):
     """Test a command without executing it"""
     with st.spinner("🧪 Testing command..."):
         try:
-            # Get Ollama response
-            ollama_output = call_ollama_model(user_input)
+            # Get the instruction (prompt cache, or Ollama + parser)
+            parsed_instruction, ollama_output, source = resolve_instruction(user_input)
             
-            if not ollama_output:
+            if source == "llm" and not ollama_output:
                 st.error("❌ No response from Ollama model")
                 return
             
-            # Parse response
-            parsed_instruction = parse_response(ollama_output)
+            if source != "llm":
+                ollama_output = f"(served by the {source} fast path, Ollama was not called)"
             
             if not parsed_instruction:
                 st.error("❌ Could not parse instruction")
@@ -316,121 +328,73 @@ def test_command(user_input):
             st.error(f"❌ Error testing command: {str(e)}")
 
 def execute_automation(user_input):
-    """Execute automation with full workflow"""
-    st.session_state.current_action = user_input
-    
-    # Create containers for progress
-    progress_container = st.container()
-    
-    with progress_container:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-    
-    try:
-        # Step 1: Call Ollama
-        status_text.text("🤖 Sending command to Ollama...")
-        progress_bar.progress(20)
-        time.sleep(0.5)
-        
-        ollama_output = call_ollama_model(user_input)
-        
-        if not ollama_output:
-            st.error("❌ No response from Ollama model")
-            log_automation(user_input, None, "error", "No response from Ollama model")
-            return
-        
-        # Step 2: Parse response
-        status_text.text("🔍 Parsing response...")
-        progress_bar.progress(40)
-        time.sleep(0.5)
-        
-        parsed_instruction = parse_response(ollama_output)
-        
-        if not parsed_instruction:
-            st.error("❌ Could not parse instruction")
-            log_automation(user_input, None, "error", "Could not parse instruction", ollama_output)
-            return
-        
-        # Step 3: Execute action
-        status_text.text("🎬 Executing automation...")
-        progress_bar.progress(60)
-        time.sleep(0.5)
-        
-        # Execute the action
-        result, screenshot = execute_playwright_action(parsed_instruction)
-        
-        # Step 4: Complete
-        status_text.text("✅ Automation completed!")
-        progress_bar.progress(100)
-        time.sleep(0.5)
-        
-        # Log success
-        log_automation(user_input, parsed_instruction, "success", result, ollama_output, screenshot)
-        
-        st.success(f"✅ Automation completed: {result}")
-        
-        # Clean up progress indicators
-        time.sleep(1)
-        progress_container.empty()
-        
-    except Exception as e:
-        st.error(f"❌ Error during automation: {str(e)}")
-        log_automation(user_input, parsed_instruction if 'parsed_instruction' in locals() else None, "error", str(e))
-        progress_container.empty()
-    
-    finally:
-        st.session_state.current_action = None
+    """Submit the full workflow (command -> instruction -> browser) as a background job"""
+    job_id = get_job_runner().submit(user_input, run_id=st.session_state.run_id)
+    st.session_state.active_jobs.append(job_id)
 
 def execute_direct_action(action_dict):
-    """Execute a direct action dictionary"""
-    try:
-        result, screenshot = execute_playwright_action(action_dict)
-        st.success(f"✅ Action completed: {result}")
-        log_automation("Direct custom action", action_dict, "success", result, None, screenshot)
-    except Exception as e:
-        st.error(f"❌ Error executing action: {str(e)}")
-        log_automation("Direct custom action", action_dict, "error", str(e))
+    """Submit a ready instruction dictionary as a background job"""
+    job_id = get_job_runner().submit("Direct custom action", instruction=action_dict, run_id=st.session_state.run_id)
+    st.session_state.active_jobs.append(job_id)
 
-def execute_playwright_action(instruction):
-    """Execute playwright action and handle screenshots"""
-    try:
-        result, screenshot = perform_action(instruction)
-        
-        if screenshot:
-            # Store screenshot in session state
-            screenshot_entry = {
-                'image': screenshot,
-                'action': instruction.get('action', 'unknown'),
-                'timestamp': datetime.now().strftime("%H:%M:%S")
-            }
-            st.session_state.screenshots.append(screenshot_entry)
-            
-            # Keep only last 10 screenshots
-            if len(st.session_state.screenshots) > 10:
-                st.session_state.screenshots = st.session_state.screenshots[-10:]
-        
-        return result, screenshot
-        
-    except Exception as e:
-        st.error(f"Error in playwright action: {e}")
-        return str(e), None
+def show_active_jobs():
+    """Render job progress, polling only while this session has jobs running"""
+    run_every = JOB_POLL_SECONDS if st.session_state.active_jobs else None
+    st.fragment(run_every=run_every)(render_active_jobs)()
 
-def log_automation(command, parsed_action, status, result, raw_output=None, screenshot=None):
-    """Log automation attempt to history"""
-    entry = {
-        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'command': command,
-        'parsed_action': parsed_action,
-        'status': status,
-        'result': result,
-        'raw_output': raw_output
-    }
+def render_active_jobs():
+    runner = get_job_runner()
+    finished = []
     
-    # Add screenshot if available
-    if screenshot:
-        entry['screenshot'] = screenshot
+    for job_id in st.session_state.active_jobs:
+        job = runner.get(job_id)
+        if job is None or job.done:
+            finished.append(job_id)
+            if job is not None:
+                finish_job(job)
+            continue
+        command = job.command[:50] + ('...' if len(job.command) > 50 else '')
+        st.progress(job.progress, text=f"🔄 {command}: {job.message}")
     
-    st.session_state.automation_history.append(entry)
+    if finished:
+        st.session_state.active_jobs = [j for j in st.session_state.active_jobs if j not in finished]
+        # Full rerun so the history and screenshot panels pick up the result
+        st.rerun()
+
+def finish_job(job):
+    """Move a finished job into the session's history and screenshot list"""
+    if job.screenshot_id:
+        record_screenshot(job.screenshot_id, job.instruction.get('action', 'unknown'))
+    log_automation(job.command, job.instruction, job.status, job.result, job.raw_output, job.screenshot_id, job.id)
+    
+    if job.status == "success":
+        st.toast(f"✅ Automation completed: {job.result}")
+    else:
+        st.toast(f"❌ {job.result}")
+
+def record_screenshot(screenshot_id, action):
+    """Remember a stored screenshot; only its digest goes into session state"""
+    load_thumbnail(screenshot_id)  # Pre-generate while the bytes are in the page cache
+    
+    screenshot_entry = {
+        'id': screenshot_id,
+        'action': action,
+        'timestamp': datetime.now().strftime("%H:%M:%S")
+    }
+    st.session_state.screenshots.append(screenshot_entry)
+    
+    # Keep only last 10 screenshots
+    if len(st.session_state.screenshots) > 10:
+        st.session_state.screenshots = st.session_state.screenshots[-10:]
+
+def log_automation(command, parsed_action, status, result, raw_output=None, screenshot_id=None, job_id=None):
+    """Log automation attempt to the shared history; the session only keeps the row id"""
+    action = parsed_action.get('action') if parsed_action else None
+    entry_id = get_history_store().append(
+        command, action, status, result, source="app", job_id=job_id, screenshot_id=screenshot_id,
+        instruction=parsed_action, raw_output=raw_output
+    )
+    st.session_state.automation_history.append(entry_id)
     
     # Keep only last 50 entries
     if len(st.session_state.automation_history) > 50:
@@ -0,0 +1,238 @@
+#artifact_store.py
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from io import BytesIO
+
+from PIL import Image
+
+from config import CONFIG
+
+SIGNATURES = [(b"\x89PNG", "png"), (b"\xff\xd8", "jpg"), (b"RIFF", "webp")]
+
+
+def guess_extension(data):
+    for signature, extension in SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    return "bin"
+
+
+def perceptual_hash(data):
+    """64-bit difference hash: near-identical frames get (almost) the same value"""
+    image = Image.open(BytesIO(data)).convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = image.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+class ArtifactStore:
+    """Content-addressed, deduplicating store for screenshots.
+
+    Blobs live under <root>/blobs/<2 hex>/<sha256>.<ext>, so identical
+    images are stored once. index.jsonl is an append-only log that maps
+    (run, step) to a blob; it is replayed into dictionaries on startup so
+    lookups by run/step or digest are O(1). With perceptual=True a frame
+    whose difference hash is within `threshold` bits of a recent blob is
+    stored as a reference to that blob instead. When the blobs exceed
+    max_bytes the least recently used ones are evicted.
+    """
+
+    def __init__(self, root=None, max_bytes=None, perceptual=None, threshold=None, recent_window=256):
+        settings = CONFIG.get("artifact_store", {})
+        self.root = root or settings.get("root", "screenshots")
+        self.max_bytes = max_bytes or settings.get("max_bytes", 500 * 1024 * 1024)
+        self.perceptual = settings.get("perceptual", False) if perceptual is None else perceptual
+        self.threshold = settings.get("phash_threshold", 4) if threshold is None else threshold
+
+        self.index_path = os.path.join(self.root, "index.jsonl")
+        self._lock = threading.Lock()
+        self._blobs = {}  # digest -> {"size", "ext", "last_used", "phash"}
+        self._steps = {}  # (run, step) -> digest
+        self._recent = deque(maxlen=recent_window)  # (phash, digest) for near-duplicate checks
+        self._log_lines = 0
+        self.total_bytes = 0
+
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+        self._load_index()
+
+    def put(self, data, run_id, step):
+        """Store image bytes for a run step and return the blob digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            if digest not in self._blobs:
+                phash = perceptual_hash(data) if self.perceptual else None
+                similar = self._find_similar(phash) if phash is not None else None
+                if similar is not None:
+                    digest = similar
+                else:
+                    self._write_blob(digest, data, phash, now)
+            self._blobs[digest]["last_used"] = now
+            self._steps[(run_id, step)] = digest
+            self._append({"op": "put", "run": run_id, "step": step, "blob": digest, "ts": now})
+            self._evict_if_needed(keep=digest)
+        return digest
+
+    def get(self, digest):
+        """Blob bytes, or None if the blob is unknown, evicted or gone from disk"""
+        # Under the lock so a put() on another thread cannot evict the blob between lookup and read
+        with self._lock:
+            path = self.path(digest)
+            if path is None:
+                return None
+            self._blobs[digest]["last_used"] = time.time()
+            try:
+                with open(path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                return None
+
+    def lookup(self, run_id, step):
+        """Digest stored for a run step, or None"""
+        return self._steps.get((run_id, step))
+
+    def steps(self, run_id):
+        return {step: digest for (run, step), digest in self._steps.items() if run == run_id}
+
+    def path(self, digest):
+        blob = self._blobs.get(digest)
+        if blob is None:
+            return None
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.{blob['ext']}")
+
+    def thumbnail(self, digest, width=320):
+        """JPEG thumbnail of a blob, generated once and kept next to it on disk"""
+        path = self.path(digest)
+        if path is None:
+            return None
+        thumb_path = self._thumbnail_path(digest, width)
+        try:
+            if not os.path.exists(thumb_path):
+                image = Image.open(path)
+                image.thumbnail((width, width * 4))
+                image.convert("RGB").save(thumb_path, format="JPEG", quality=75)
+            with open(thumb_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None  # Evicted while the thumbnail was being made
+
+    def compact(self):
+        """Rewrite index.jsonl with only the live blobs and run/step entries"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for digest, blob in self._blobs.items():
+                f.write(json.dumps({"op": "blob", "blob": digest, "size": blob["size"],
+                                    "ext": blob["ext"], "phash": blob["phash"]}) + "\n")
+            for (run, step), digest in self._steps.items():
+                f.write(json.dumps({"op": "put", "run": run, "step": step, "blob": digest,
+                                    "ts": self._blobs[digest]["last_used"]}) + "\n")
+        os.replace(tmp_path, self.index_path)
+        self._log_lines = len(self._blobs) + len(self._steps)
+
+    def _thumbnail_path(self, digest, width):
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.thumb{width}.jpg")
+
+    def _write_blob(self, digest, data, phash, now):
+        ext = guess_extension(data)
+        self._blobs[digest] = {"size": len(data), "ext": ext, "last_used": now, "phash": phash}
+        path = self.path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        self.total_bytes += len(data)
+        if phash is not None:
+            self._recent.append((phash, digest))
+        self._append({"op": "blob", "blob": digest, "size": len(data), "ext": ext, "phash": phash})
+
+    def _find_similar(self, phash):
+        for other_hash, digest in reversed(self._recent):
+            if digest in self._blobs and bin(phash ^ other_hash).count("1") <= self.threshold:
+                return digest
+        return None
+
+    def _evict_if_needed(self, keep=None):
+        if self.total_bytes <= self.max_bytes:
+            return
+        for digest in sorted(self._blobs, key=lambda d: self._blobs[d]["last_used"]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            self._remove_blob(digest)
+        # Evictions leave dead lines behind; rewrite once they dominate the log
+        if self._log_lines > 2 * (len(self._blobs) + len(self._steps)) + 100:
+            self._compact()
+
+    def _remove_blob(self, digest):
+        path = self.path(digest)
+        blob = self._blobs.pop(digest)
+        self.total_bytes -= blob["size"]
+        for key in [key for key, value in self._steps.items() if value == digest]:
+            del self._steps[key]
+        for stale in [path] + glob.glob(self._thumbnail_path(digest, "*")):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+        self._append({"op": "evict", "blob": digest})
+
+    def _append(self, record):
+        with open(self.index_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        self._log_lines += 1
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path) as f:
+            for line in f:
+                self._log_lines += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a torn write at the end of the log
+                op = record.get("op")
+                digest = record.get("blob")
+                if op == "blob":
+                    self._blobs[digest] = {"size": record["size"], "ext": record["ext"],
+                                           "last_used": 0, "phash": record.get("phash")}
+                elif op == "put" and digest in self._blobs:
+                    self._steps[(record["run"], record["step"])] = digest
+                    self._blobs[digest]["last_used"] = record.get("ts", 0)
+                elif op == "evict":
+                    self._blobs.pop(digest, None)
+                    for key in [key for key, value in self._steps.items() if value == digest]:
+                        del self._steps[key]
+
+        # Drop index entries whose file has gone missing
+        for digest in [d for d in self._blobs if not os.path.exists(self.path(d))]:
+            del self._blobs[digest]
+        self._steps = {key: d for key, d in self._steps.items() if d in self._blobs}
+        self.total_bytes = sum(blob["size"] for blob in self._blobs.values())
+        for digest, blob in self._blobs.items():
+            if blob["phash"] is not None:
+                self._recent.append((blob["phash"], digest))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
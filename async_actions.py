@@ -0,0 +1,164 @@
+#async_actions.py
+import asyncio
+
+from playwright.async_api import async_playwright
+
+from action_steps import action_steps, plan_step_failed, plan_step_line
+from config import CONFIG
+from launch_profiles import ResourceBlocker, browser_type, launch_options
+from playwright_actions import site_url
+from screenshot_pipeline import ScreenshotOptions, ScreenshotRecorder
+from site_mirror import new_context_async
+from tracing import span
+from wait_strategies import (
+    WaitRecorder, get_wait_until, wait_for_page_ready_async, wait_for_new_page_async,
+    go_to_section_async, scroll_into_view_async, click_and_capture_dialog_async,
+    wait_for_form_cleared_async,
+)
+
+async def perform_action_async(instruction, browser=None):
+    """Async counterpart of perform_action with the same instruction contract.
+
+    When no browser is given a private one is launched and closed again,
+    otherwise the instruction runs in a fresh context on the shared browser.
+    Returns (result_message, screenshot).
+    """
+    if browser is None:
+        async with async_playwright() as p:
+            own_browser = await browser_type(p).launch(**launch_options())
+            try:
+                return await perform_action_async(instruction, own_browser)
+            finally:
+                await own_browser.close()
+
+    context = await new_context_async(browser)
+    try:
+        return await _perform_action_in_context(context, instruction)
+    finally:
+        await context.close()
+
+async def _perform_action_in_context(context, instruction):
+    """Same flow as playwright_actions._perform_action_on_page, on a fresh page"""
+    screenshots = ScreenshotRecorder(ScreenshotOptions.for_instruction(instruction))
+    # LazyScreenshot.start_encoding() can block while the encoder pool is full,
+    # which must not happen on the event loop; main_image() encodes in a thread instead
+    screenshots.options.background_encode = False
+    result_message = ""
+    waits = WaitRecorder()
+    wait_until = get_wait_until(instruction)
+
+    page = await context.new_page()
+    # Installed before goto, so the page load itself is lean too
+    blocker = ResourceBlocker.for_action(instruction, screenshots.options)
+    if blocker is not None:
+        await blocker.install_async(page)
+    try:
+        with span("page.goto", url=site_url(), wait_until=wait_until):
+            await page.goto(site_url(), wait_until=wait_until)
+        await wait_for_page_ready_async(page, wait_until, waits)
+
+        await screenshots.capture_async(page, "Initial page load", kind="initial")
+
+        try:
+            result_message = await execute_instruction_async(page, instruction, screenshots, waits)
+        except Exception as e:
+            await screenshots.capture_async(page, f"Error occurred: {str(e)}", kind="error")
+            result_message = f"Error: {str(e)}"
+
+        await screenshots.capture_fallback_async(page, "Final state")
+    finally:
+        await page.close()
+        print(f"⏱️ {instruction.get('action')}: {waits.summary()}")
+        if blocker is not None:
+            print(f"🚫 Blocked {blocker.blocked} requests")
+
+    # Only the returned screenshot is resized and encoded
+    main_screenshot = await asyncio.to_thread(screenshots.main_image)
+
+    return result_message, main_screenshot
+
+async def execute_instruction_async(page, instruction, screenshots, waits=None):
+    """execute_instruction for an async_api page, running the same action_steps"""
+    waits = waits if waits is not None else WaitRecorder()
+
+    if instruction.get("action") == "run_plan":
+        results = []
+        for index, step in enumerate(instruction["steps"], start=1):
+            try:
+                step_result = await execute_instruction_async(page, step, screenshots, waits)
+            except Exception as e:
+                raise plan_step_failed(index, step, e) from e
+            results.append(plan_step_line(index, step, step_result))
+        return "\n".join(results)
+
+    steps, message = action_steps(instruction)
+    wait_until = get_wait_until(instruction)
+    values = {}
+    for step in steps:
+        with span(f"step.{step[0]}", args=step[1:]):
+            values.update(await _run_step_async(page, step, screenshots, waits, wait_until) or {})
+    return message(values)
+
+async def _run_step_async(page, step, screenshots, waits, wait_until):
+    """playwright_actions._run_step, awaited"""
+    op, args = step[0], step[1:]
+    if op == "section":
+        await go_to_section_async(page, args[0], waits)
+    elif op == "scroll":
+        await scroll_into_view_async(page, args[0], waits)
+    elif op == "capture":
+        await screenshots.capture_async(page, *args)
+    elif op == "fill":
+        await page.locator(args[0]).fill(args[1])
+    elif op == "select":
+        await page.locator(args[0]).select_option(args[1])
+    elif op == "check":
+        await page.locator(args[0]).check()
+    elif op == "click":
+        await page.locator(args[0]).click()
+    elif op == "form_cleared":
+        await wait_for_form_cleared_async(page, waits)
+    elif op == "dialog":
+        return {args[1]: await click_and_capture_dialog_async(page, page.locator(args[0]), waits)}
+    elif op == "text":
+        return {args[1]: await page.locator(args[0]).text_content()}
+    elif op == "popup":
+        selector, description, name = args
+        async with page.context.expect_page() as new_page_info:
+            await page.locator(selector).click()
+        new_page = await new_page_info.value
+        await wait_for_new_page_async(new_page, wait_until, waits)
+        await screenshots.capture_async(new_page, description, kind="result")
+        url = new_page.url
+        await new_page.close()
+        return {name: url}
+    else:
+        raise ValueError(f"Unknown step: {op}")
+
+async def run_instructions_async(instructions, concurrency=None):
+    """Run many instructions concurrently on one browser and event loop.
+
+    At most `concurrency` contexts are open at the same time. Results come
+    back in the same order as the instructions.
+    """
+    concurrency = concurrency or CONFIG.get("async_concurrency", 4)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with async_playwright() as p:
+        browser = await browser_type(p).launch(**launch_options())
+
+        async def run_one(instruction):
+            async with semaphore:
+                try:
+                    return await perform_action_async(instruction, browser)
+                except Exception as e:
+                    return f"Error: {str(e)}", None
+
+        try:
+            return await asyncio.gather(*(run_one(i) for i in instructions))
+        finally:
+            await browser.close()
+
+def run_instructions(instructions, concurrency=None):
+    """Blocking wrapper around run_instructions_async for non-async callers"""
+    return asyncio.run(run_instructions_async(instructions, concurrency))
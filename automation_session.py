@@ -0,0 +1,126 @@
+#automation_session.py
+import time
+
+from browser_pool import get_browser_pool
+from launch_profiles import ResourceBlocker, wants_blocking
+from playwright_actions import open_site, execute_instruction
+from screenshot_pipeline import ScreenshotOptions, ScreenshotRecorder
+from site_mirror import new_context
+from wait_strategies import WaitRecorder
+
+
+class AutomationSession:
+    """Runs several instructions against one page that stays open.
+
+    The site is opened once, so chained flows such as
+    fill_booking_form -> submit_booking see each other's state and only
+    pay for the browser, navigation and settle wait a single time.
+
+        with AutomationSession() as session:
+            steps = session.run_steps([fill_action, submit_action])
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool or get_browser_pool()
+        self._browser = None
+        self._context = None
+        self._page = None
+        self._blocker = None
+        self.open_duration = 0.0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        if self._browser is not None:
+            return
+        start = time.perf_counter()
+        self._browser = self.pool.acquire()
+        try:
+            self._browser.run_raw(self._open_page)
+        except Exception:
+            self.pool.release(self._browser)
+            self._browser = None
+            raise
+        self.open_duration = time.perf_counter() - start
+
+    def close(self):
+        if self._browser is None:
+            return
+        try:
+            self._browser.run_raw(self._close_page)
+        finally:
+            self.pool.release(self._browser)
+            self._browser = None
+
+    def run_step(self, instruction):
+        """Run a single instruction on the session page and return its step result"""
+        if self._browser is None:
+            self.open()
+        return self._browser.run_raw(self._run_step, instruction)
+
+    def run_steps(self, instructions, stop_on_error=True, on_step=None):
+        """Run instructions in order and return one result dict per executed step.
+
+        on_step(step), if given, is called after each step finishes.
+        """
+        results = []
+        for index, instruction in enumerate(instructions, start=1):
+            step = self.run_step(instruction)
+            step["step"] = index
+            results.append(step)
+            print(f"⏱️ Step {index} ({step['action']}): {step['status']} in {step['duration']:.2f}s")
+            if on_step:
+                on_step(step)
+            if step["status"] != "success" and stop_on_error:
+                break
+        return results
+
+    def _open_page(self, browser):
+        self._context = new_context(browser)
+        self._page = open_site(self._context)
+
+    def _close_page(self, browser):
+        try:
+            self._context.close()
+        except Exception:
+            pass
+        self._context = None
+        self._page = None
+        self._blocker = None
+
+    def _run_step(self, browser, instruction):
+        screenshots = ScreenshotRecorder(ScreenshotOptions.for_instruction(instruction))
+        waits = WaitRecorder()
+        # Blocking only starts once a step needs it and is reconfigured per step after that
+        if self._blocker is None and wants_blocking(instruction, screenshots.options):
+            self._blocker = ResourceBlocker().install(self._page)
+        if self._blocker is not None:
+            self._blocker.configure(instruction, screenshots.options)
+        start = time.perf_counter()
+        try:
+            result_message = execute_instruction(self._page, instruction, screenshots, waits)
+            status = "success"
+        except Exception as e:
+            screenshots.capture(self._page, f"Error occurred: {str(e)}", kind="error")
+            result_message = f"Error: {str(e)}"
+            status = "error"
+
+        return {
+            "action": instruction.get("action", "unknown"),
+            "status": status,
+            "result": result_message,
+            "screenshot": screenshots.main_image(),
+            "duration": time.perf_counter() - start,
+            "wait_ms": waits.total_ms,
+        }
+
+
+def run_session(instructions, stop_on_error=True, on_step=None):
+    """Open the site once and run every instruction on the same page"""
+    with AutomationSession() as session:
+        return session.run_steps(instructions, stop_on_error=stop_on_error, on_step=on_step)
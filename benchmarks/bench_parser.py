@@ -0,0 +1,105 @@
+"""Microbenchmark for parser.extract_json_objects_with_offsets.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parser [--repeat 5] [--json results.json]
+
+The legacy brace-counting extractor is kept here only as a reference
+point for the comparison.
+"""
+import argparse
+import json
+import time
+
+from parser import extract_json_objects_with_offsets, select_best_json
+
+ACTION = '{"action": "fill_booking_form", "form_data": {"name": "John Doe", "email": "john@example.com", ' \
+         '"start_date": "2025-08-01", "end_date": "2025-08-07", "car_type": "VAN", "cdw": true, "terms": true}}'
+
+
+def legacy_extract_all_json_objects(text):
+    """The previous nested-loop implementation, for comparison"""
+    json_objects = []
+    i = 0
+    while i < len(text):
+        if text[i] == '{':
+            brace_count = 0
+            start = i
+            while i < len(text):
+                if text[i] == '{':
+                    brace_count += 1
+                elif text[i] == '}':
+                    brace_count -= 1
+                    if brace_count == 0:
+                        try:
+                            json_objects.append(json.loads(text[start:i + 1]))
+                        except json.JSONDecodeError:
+                            pass
+                        break
+                i += 1
+        else:
+            i += 1
+    return json_objects
+
+
+def build_cases():
+    rambling = ("Here is an example of the format you asked for. " * 20 + ACTION + "\n") * 20
+    return {
+        "single_object": "Sure! " + ACTION,
+        "rambling_examples_40kb": rambling,
+        "unbalanced_braces_8kb": "{" * 8000 + ACTION,
+        "braces_in_strings": '{"action": "search_car", "query": "' + "}{" * 2000 + '"} ' + ACTION,
+        "unterminated_strings_16kb": '{"note": "' * 1600 + ACTION,
+        "invalid_candidates_16kb": '{"action": "x" oops} ' * 800 + ACTION,
+    }
+
+
+def time_call(fn, text, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return min(samples)
+
+
+def new_parse(text):
+    matches = extract_json_objects_with_offsets(text)
+    if len(matches) > 1:
+        select_best_json(text, matches)
+    return matches
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--json", help="write results to this file")
+    args = arg_parser.parse_args()
+
+    # select_best_json prints its scoring; keep the benchmark output readable
+    import builtins
+    real_print = builtins.print
+    results = {}
+    for name, text in build_cases().items():
+        builtins.print = lambda *a, **k: None
+        try:
+            legacy_ms = time_call(legacy_extract_all_json_objects, text, args.repeat)
+            new_ms = time_call(new_parse, text, args.repeat)
+            found = len(extract_json_objects_with_offsets(text))
+            legacy_found = len(legacy_extract_all_json_objects(text))
+        finally:
+            builtins.print = real_print
+        results[name] = {
+            "bytes": len(text), "objects": found, "legacy_objects": legacy_found,
+            "legacy_ms": legacy_ms, "new_ms": new_ms,
+        }
+        print(f"{name:28} {len(text):>8} B  objects new/legacy={found}/{legacy_found:<3} "
+              f"legacy={legacy_ms:9.2f} ms  new={new_ms:8.3f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Per-stage latency benchmark for the command -> browser pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline [--iterations 20] [--ollama-latency 0.2]
+        [--skip-browser] [--json results.json] [--baseline benchmarks/baseline.json]
+        [--tolerance 0.2] [--update-baseline]
+
+Every stage is timed on its own against local stand-ins: a fake Ollama
+server with configurable latency and a static copy of the demo site
+(benchmarks/site), so results do not depend on the network or a model.
+Results are reported as p50/p95/p99 and compared with the baseline file;
+the exit code is 1 when a stage regressed by more than the tolerance.
+Baselines are machine specific, create one with --update-baseline.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import client
+from benchmarks.local_servers import fake_ollama, site_server
+from benchmarks.stats import compare, summarize
+from config import CONFIG
+from parser import parse_response
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# A typical small-model reply: prose, an example object, then the answer
+MODEL_REPLY = (
+    'Sure! For example {"action": "search_car", "query": "BMW"} searches for a car. '
+    'For your command the instruction is: {"action": "check_pricing", "car_type": "SUV"}'
+)
+
+ACTIONS = {
+    "search_car": {"action": "search_car", "query": "BMW"},
+    "fill_booking_form": {"action": "fill_booking_form", "form_data": {
+        "name": "John Doe", "email": "john@example.com", "start_date": "2025-08-01",
+        "end_date": "2025-08-07", "car_type": "VAN", "cdw": True, "terms": True}},
+    "submit_booking": {"action": "submit_booking"},
+    "reset_form": {"action": "reset_form"},
+    "navigate_to_section": {"action": "navigate_to_section", "section": "#price"},
+    "test_contact_links": {"action": "test_contact_links"},
+    "check_pricing": {"action": "check_pricing", "car_type": "SUV"},
+    "validate_empty_form": {"action": "validate_empty_form"},
+    "check_car_details": {"action": "check_car_details", "car_type": "Luxury"},
+}
+
+
+def timed(samples, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    samples.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def bench_llm(iterations, ollama_url):
+    CONFIG["ollama_api_url"] = ollama_url + "/api/generate"
+    client._client = None  # Pick up the fake server's URL
+    samples = []
+    for _ in range(iterations):
+        if not timed(samples, client.call_ollama_model, "check SUV pricing"):
+            raise RuntimeError("fake Ollama server did not answer")
+    return samples
+
+
+def bench_parse(iterations):
+    samples = []
+    for _ in range(iterations):
+        timed(samples, parse_response, MODEL_REPLY)
+    return samples
+
+
+def bench_browser(iterations):
+    """Browser launch, navigation, every perform_action branch and capture_screenshot"""
+    from playwright.sync_api import sync_playwright
+    from launch_profiles import browser_type, launch_options
+    from playwright_actions import open_site, execute_instruction, capture_screenshot
+    from screenshot_pipeline import ScreenshotOptions, ScreenshotRecorder
+    from wait_strategies import WaitRecorder
+
+    stages = {}
+    with sync_playwright() as p:
+        engine = browser_type(p)
+        options = launch_options(headless=True)
+
+        samples = stages.setdefault("browser_launch", [])
+        for _ in range(iterations):
+            timed(samples, lambda: engine.launch(**options)).close()
+
+        browser = engine.launch(**options)
+        try:
+            samples = stages.setdefault("navigation", [])
+            for _ in range(iterations):
+                context = browser.new_context()
+                timed(samples, open_site, context)
+                context.close()
+
+            # Actions only: the page is opened untimed and no screenshots are taken
+            no_screenshots = ScreenshotOptions(capture="none")
+            for name, instruction in ACTIONS.items():
+                samples = stages.setdefault(f"action:{name}", [])
+                for _ in range(iterations):
+                    context = browser.new_context()
+                    page = open_site(context)
+                    timed(samples, execute_instruction, page, instruction,
+                          ScreenshotRecorder(no_screenshots), WaitRecorder())
+                    context.close()
+
+            context = browser.new_context()
+            page = open_site(context)
+            samples = stages.setdefault("capture_screenshot", [])
+            for _ in range(iterations):
+                timed(samples, capture_screenshot, page)
+            context.close()
+        finally:
+            browser.close()
+    return stages
+
+
+def run(args):
+    raw = {}
+    with fake_ollama(latency=args.ollama_latency, token_delay=args.token_delay, reply=MODEL_REPLY) as ollama, \
+            site_server() as site:
+        CONFIG["base_url"] = site.url + "/index.html"
+        CONFIG["headless"] = True
+        # The pipeline logs heavily to stdout; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            raw["call_ollama_model"] = bench_llm(args.iterations, ollama.url)
+            raw["parse_response"] = bench_parse(args.iterations)
+            if not args.skip_browser:
+                raw.update(bench_browser(args.iterations))
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "iterations": args.iterations,
+            "ollama_latency_s": args.ollama_latency,
+            "token_delay_s": args.token_delay,
+            "browser": None if args.skip_browser else CONFIG.get("browser", "chromium"),
+            "launch_profile": CONFIG.get("launch_profile", "standard"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": {stage: summarize(samples) for stage, samples in raw.items()},
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    arg_parser.add_argument("--ollama-latency", type=float, default=0.2, help="seconds before the first token")
+    arg_parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between tokens")
+    arg_parser.add_argument("--skip-browser", action="store_true", help="only time the LLM and parse stages")
+    arg_parser.add_argument("--json", help="write results to this file")
+    arg_parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    arg_parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    args = arg_parser.parse_args()
+
+    results = run(args)
+
+    print(f"{'stage':32} {'n':>4} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for stage, summary in results["stages"].items():
+        print(f"{stage:32} {summary['n']:>4} {summary['p50_ms']:>10.2f} "
+              f"{summary['p95_ms']:>10.2f} {summary['p99_ms']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results["stages"], baseline.get("stages", {}), tolerance=args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['stage']} {r['metric']}: {r['baseline']:.2f} -> {r['current']:.2f} ms "
+              f"(x{r['ratio']:.2f})")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
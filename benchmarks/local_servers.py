@@ -0,0 +1,109 @@
+"""Local stand-ins used by the benchmarks: a fake Ollama server and a static copy of the demo site.
+
+    with fake_ollama(latency=0.2) as ollama, site_server() as site:
+        CONFIG["ollama_api_url"] = ollama.url + "/api/generate"
+        CONFIG["base_url"] = site.url
+"""
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+SITE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site")
+
+DEFAULT_REPLY = '{"action": "check_pricing", "car_type": "SUV"}'
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Streams a canned reply for /api/generate and /api/chat.
+
+    `latency` is slept before the first token (model load + prompt eval),
+    `token_delay` between tokens; the reply is split on spaces.
+    """
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    token_delay = 0.0
+    reply = DEFAULT_REPLY
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path not in ("/api/generate", "/api/chat"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        tokens = [word + " " for word in self.reply.split(" ")]
+        tokens[-1] = tokens[-1].rstrip()
+        time.sleep(self.latency)
+
+        if not body.get("stream", True):
+            payload = json.dumps(self._chunk(self.reply, done=True)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for index, token in enumerate(tokens):
+                if index and self.token_delay:
+                    time.sleep(self.token_delay)
+                self._write_chunk(self._chunk(token))
+            self._write_chunk(self._chunk("", done=True))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client stopped reading early (streaming parse)
+
+    def _chunk(self, text, done=False):
+        if self.path == "/api/chat":
+            return {"message": {"role": "assistant", "content": text}, "done": done}
+        return {"response": text, "done": done}
+
+    def _write_chunk(self, obj):
+        data = json.dumps(obj).encode() + b"\n"
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+class QuietSiteHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """Runs an HTTP server on a free localhost port in a background thread"""
+
+    def __init__(self, handler):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def fake_ollama(latency=0.0, token_delay=0.0, reply=DEFAULT_REPLY):
+    handler = type("ConfiguredOllamaHandler", (FakeOllamaHandler,),
+                   {"latency": latency, "token_delay": token_delay, "reply": reply})
+    return LocalServer(handler)
+
+
+def site_server(directory=SITE_DIR):
+    return LocalServer(functools.partial(QuietSiteHandler, directory=directory))
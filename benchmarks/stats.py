@@ -0,0 +1,49 @@
+"""Percentile summaries and baseline comparison shared by the benchmarks."""
+import math
+
+
+def percentile(samples, pct):
+    """Linearly interpolated percentile (0-100) of a list of numbers"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples, unit="ms"):
+    """n, mean, min, p50/p95/p99 and max; keys end in the unit, e.g. "p95_ms" or "p95_bytes" """
+    return {
+        "n": len(samples),
+        f"mean_{unit}": sum(samples) / len(samples),
+        f"min_{unit}": min(samples),
+        f"p50_{unit}": percentile(samples, 50),
+        f"p95_{unit}": percentile(samples, 95),
+        f"p99_{unit}": percentile(samples, 99),
+        f"max_{unit}": max(samples),
+    }
+
+
+def compare(stages, baseline_stages, tolerance=0.2, min_delta=1.0, metrics=("p50_ms", "p95_ms")):
+    """Return the regressions of `stages` against `baseline_stages`.
+
+    A metric regresses when it is more than `tolerance` (relative) and more
+    than `min_delta` (absolute, in the metric's unit, to ignore noise)
+    above the baseline. Stages missing on either side are skipped.
+    """
+    regressions = []
+    for stage, summary in stages.items():
+        base = baseline_stages.get(stage)
+        if not base:
+            continue
+        for metric in metrics:
+            current, previous = summary.get(metric), base.get(metric)
+            if current is None or previous is None:
+                continue
+            if current > previous * (1 + tolerance) and current - previous > min_delta:
+                regressions.append({
+                    "stage": stage, "metric": metric, "baseline": previous,
+                    "current": current, "ratio": current / previous if previous else math.inf,
+                })
+    return regressions
@@ -0,0 +1,259 @@
+#browser_pool.py
+import atexit
+import contextvars
+import queue
+import threading
+from concurrent.futures import Future
+
+from playwright.sync_api import sync_playwright
+
+from config import CONFIG
+from launch_profiles import browser_name, browser_type, launch_options as configured_launch_options
+from site_mirror import new_context
+from tracing import span
+from warm_pages import WarmPagePool
+
+
+class PooledBrowser:
+    """A long-lived browser owned by one worker thread.
+
+    Sync Playwright objects can only be used from the thread that created
+    them, so every piece of work is handed to the owning thread through
+    run() and the caller blocks on the result. Whenever the queue is empty
+    the worker prepares warm pages for run_warm().
+    """
+
+    def __init__(self, slot, launch_options=None, warm_pages=None):
+        self.slot = slot
+        self.launch_options = launch_options or configured_launch_options()
+        self.launch_count = 0
+        self.warm_pages = WarmPagePool(warm_pages)
+        self._tasks = queue.Queue()
+        self._browser = None
+        self._playwright = None
+        self._start_error = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._worker_loop, name=f"browser-pool-{slot}", daemon=True
+        )
+        self._thread.start()
+        self._ready.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn(context, *args, **kwargs) in a fresh BrowserContext"""
+        return self.submit(self._in_new_context, fn, *args, **kwargs).result()
+
+    def run_raw(self, fn, *args, **kwargs):
+        """Run fn(browser, *args, **kwargs) on the owning thread"""
+        return self.submit(self._with_browser, fn, *args, **kwargs).result()
+
+    def run_warm(self, fn, *args, profile=None, **kwargs):
+        """Run fn(page, *args, **kwargs) on a page that is already on the site.
+
+        `profile` (warm_pages.page_profile) picks pages opened with the
+        right load state and blocking rules; None means the defaults.
+        """
+        return self.submit(self._on_warm_page, fn, profile, *args, **kwargs).result()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        # Run in a copy of the caller's context so tracing spans keep their parent across the thread hop
+        self._tasks.put((fn, args, kwargs, future, contextvars.copy_context()))
+        return future
+
+    def is_healthy(self):
+        return self.submit(self._check_health).result()
+
+    def restart(self):
+        """Close the browser and launch a new one; returns whether it is healthy afterwards"""
+        return self.submit(self._restart).result()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._tasks.put(None)
+            self._thread.join(timeout=10)
+
+    def _worker_loop(self):
+        try:
+            self._playwright = sync_playwright().start()
+        except Exception as e:
+            self._start_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            while True:
+                # Idle: reset or open one warm page at a time, then check the queue again
+                if self._tasks.empty() and self._browser is not None and self.warm_pages.needs_work():
+                    self.warm_pages.do_idle_work(self._browser)
+                    continue
+                task = self._tasks.get()
+                if task is None:
+                    break
+                fn, args, kwargs, future, context = task
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(context.run(fn, *args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+                self.warm_pages.resume()
+        finally:
+            self._shutdown_browser()
+            self._playwright.stop()
+
+    def _ensure_browser(self):
+        """Launch the browser, or relaunch it if it crashed or was closed"""
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        if self._browser is not None:
+            print(f"♻️ Browser slot {self.slot} disconnected, restarting...")
+            self._shutdown_browser()
+        with span("browser.launch", browser=browser_name(), slot=self.slot):
+            self._browser = browser_type(self._playwright).launch(**self.launch_options)
+        self.launch_count += 1
+        return self._browser
+
+    def _shutdown_browser(self):
+        self.warm_pages.clear()
+        if self._browser is None:
+            return
+        try:
+            self._browser.close()
+        except Exception:
+            pass
+        self._browser = None
+
+    def _restart(self):
+        print(f"♻️ Restarting browser slot {self.slot}...")
+        self._shutdown_browser()
+        return self._check_health()
+
+    def _check_health(self):
+        try:
+            return self._ensure_browser().is_connected()
+        except Exception as e:
+            print(f"Browser slot {self.slot} failed health check: {e}")
+            return False
+
+    def _with_browser(self, fn, *args, **kwargs):
+        return fn(self._ensure_browser(), *args, **kwargs)
+
+    def _on_warm_page(self, fn, profile, *args, **kwargs):
+        warm = self.warm_pages.take(self._ensure_browser(), profile)
+        try:
+            return fn(warm.page, *args, **kwargs)
+        finally:
+            self.warm_pages.give_back(warm)
+
+    def _in_new_context(self, fn, *args, **kwargs):
+        browser = self._ensure_browser()
+        context = new_context(browser)
+        try:
+            return fn(context, *args, **kwargs)
+        finally:
+            try:
+                context.close()
+            except Exception:
+                # The browser may have died mid-task; the next task relaunches it
+                pass
+
+
+class BrowserPool:
+    """Fixed-size pool of long-lived browsers shared by every entry point"""
+
+    def __init__(self, size=None, launch_options=None, warm_pages=None):
+        self.size = size or CONFIG.get("browser_pool_size", 1)
+        self.launch_options = launch_options
+        self.warm_pages = warm_pages
+        self._idle = queue.Queue()
+        self._browsers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _grow(self):
+        """Start another browser slot if the pool is not full yet"""
+        with self._lock:
+            if self._closed or len(self._browsers) >= self.size:
+                return None
+            browser = PooledBrowser(len(self._browsers), self.launch_options, self.warm_pages)
+            self._browsers.append(browser)
+            return browser
+
+    def acquire(self, timeout=None):
+        """Take a browser out of the pool, waiting if all are busy"""
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        try:
+            browser = self._idle.get_nowait()
+        except queue.Empty:
+            browser = self._grow()
+            if browser is None:
+                try:
+                    browser = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise TimeoutError("Timed out waiting for a free browser") from None
+        if not browser.is_healthy() and not browser.restart():
+            # Keep the slot so a later acquire() can try again, but do not hand out a dead browser
+            self._idle.put(browser)
+            raise RuntimeError(f"Browser slot {browser.slot} is unhealthy and could not be restarted")
+        return browser
+
+    def release(self, browser):
+        """Return a browser to the pool"""
+        if self._closed:
+            browser.close()
+            return
+        self._idle.put(browser)
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn(context, ...) in a fresh context on a pooled browser"""
+        browser = self.acquire()
+        try:
+            return browser.run(fn, *args, **kwargs)
+        finally:
+            self.release(browser)
+
+    def run_warm(self, fn, *args, profile=None, **kwargs):
+        """Run fn(page, ...) on a warm page of a pooled browser"""
+        browser = self.acquire()
+        try:
+            return browser.run_warm(fn, *args, profile=profile, **kwargs)
+        finally:
+            self.release(browser)
+
+    def warm_up(self):
+        """Launch the first browser (which then opens its warm pages) so the first action is fast"""
+        self.release(self.acquire())
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            browsers = list(self._browsers)
+            self._browsers.clear()
+        for browser in browsers:
+            browser.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide browser pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def shutdown_browser_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -1,10 +1,15 @@
 #client.py
-import subprocess
+import hashlib
+import json
+import threading
 
-def call_ollama_model(user_prompt):
-    print("Sending prompt to Ollama...")
-    
-    system_prompt = f"""
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import CONFIG
+from tracing import span
+
+SYSTEM_PROMPT_TEMPLATE = """
 You are a task instruction generator for car rental automation testing.
 
 Your job is to convert the user's natural language prompt into a strict JSON instruction based on the intent.
@@ -52,20 +57,145 @@ Use only one of the following formats:
 9. For checking car details:
 {{ "action": "check_car_details", "car_type": "SUV" }}
 
-Now read the user's instruction below and reply **only** with a valid JSON object matching one of the above formats. Do not add any explanation or comments.
+10. When the user asks for several of these in one instruction, an ordered plan of the actions above:
+{{
+  "plan": [
+    {{ "action": "fill_booking_form", "form_data": {{ "car_type": "VAN" }} }},
+    {{ "action": "submit_booking" }},
+    {{ "action": "check_pricing", "car_type": "SUV" }}
+  ]
+}}
+
+Now read the user's instruction below and reply **only** with a valid JSON object matching one of the above formats. Use a plan only if the instruction asks for more than one action. Do not add any explanation or comments.
 
 If dates or car type are not mentioned, you can use default values.
 
 User Instruction: {user_prompt}
-""" 
-    result = subprocess.run(
-        ["ollama", "run", "tinyllama", system_prompt],
-        capture_output=True,
-        text=True,
-        encoding='utf-8',
-        errors='ignore'
-    )
+"""
+
+# Changes whenever the prompt text changes, so cached answers from an older prompt are not reused
+SYSTEM_PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:12]
+
+
+def build_prompt(user_prompt):
+    """Fill the user's instruction into the system prompt"""
+    return SYSTEM_PROMPT_TEMPLATE.format(user_prompt=user_prompt)
+
+
+class OllamaClient:
+    """Talks to the Ollama HTTP API over a pooled keep-alive session"""
+
+    def __init__(self, base_url=None, model=None, timeout=None, pool_size=4):
+        self.base_url = (base_url or _base_url_from_config()).rstrip("/")
+        self.model = model or CONFIG["ollama_model"]
+        self.timeout = timeout or CONFIG.get("ollama_timeout", 120)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def generate(self, prompt, model=None, timeout=None, options=None):
+        """Return the full completion for a prompt via /api/generate"""
+        return "".join(self.generate_stream(prompt, model, timeout, options))
+
+    def generate_stream(self, prompt, model=None, timeout=None, options=None):
+        """Yield completion tokens from /api/generate as they arrive"""
+        payload = {"model": model or self.model, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+        for chunk in self._stream("/api/generate", payload, timeout):
+            yield chunk.get("response", "")
+
+    def chat(self, messages, model=None, timeout=None, options=None):
+        """Return the assistant reply for a list of chat messages via /api/chat"""
+        return "".join(self.chat_stream(messages, model, timeout, options))
+
+    def chat_stream(self, messages, model=None, timeout=None, options=None):
+        """Yield assistant reply tokens from /api/chat as they arrive"""
+        payload = {"model": model or self.model, "messages": messages, "stream": True}
+        if options:
+            payload["options"] = options
+        for chunk in self._stream("/api/chat", payload, timeout):
+            yield chunk.get("message", {}).get("content", "")
+
+    def _stream(self, path, payload, timeout=None):
+        """POST a streaming request and yield each decoded JSON line.
+
+        Closing the generator early closes the response, which makes
+        Ollama stop generating.
+        """
+        response = self.session.post(
+            self.base_url + path, json=payload, stream=True, timeout=timeout or self.timeout
+        )
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                yield chunk
+                if chunk.get("done"):
+                    break
+        finally:
+            response.close()
+
+    def close(self):
+        self.session.close()
+
+
+def _base_url_from_config():
+    """CONFIG stores the /api/generate URL; the client needs the server root"""
+    url = CONFIG["ollama_api_url"]
+    for suffix in ("/api/generate", "/api/chat"):
+        if url.endswith(suffix):
+            return url[: -len(suffix)]
+    return url
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client():
+    """Return the shared client so every call reuses the same connections"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient()
+        return _client
+
+
+def call_ollama_model(user_prompt, timeout=None, on_token=None, stop_when=None):
+    """Send the prompt to Ollama and return the generated text.
+
+    on_token is called with every streamed token. If stop_when(token)
+    returns something truthy the stream is closed, which cancels the rest
+    of the generation.
+    """
+    print("Sending prompt to Ollama...")
+    
+    tokens = []
+    prompt = build_prompt(user_prompt)
+    with span("llm.generate", model=CONFIG["ollama_model"], prompt_bytes=len(prompt)) as trace:
+        stream = get_ollama_client().generate_stream(prompt, timeout=timeout)
+        try:
+            for token in stream:
+                tokens.append(token)
+                if on_token:
+                    on_token(token)
+                if stop_when and stop_when(token):
+                    print("Stopping generation early, a complete action was received.")
+                    trace.set(stopped_early=True)
+                    break
+        except (requests.RequestException, RuntimeError, ValueError) as e:  # ValueError: a line that is not JSON
+            print(f"Error calling Ollama: {e}")
+            trace.set(error=str(e))
+            return ""
+        finally:
+            stream.close()
+            trace.set(tokens=len(tokens), response_bytes=sum(len(token) for token in tokens))
     
     print("Response received from Ollama.")
-    return result.stdout.strip()
-
+    return "".join(tokens).strip()
@@ -1,7 +1,92 @@
 CONFIG = {
     "ollama_model": "tinyllama",  # Or mistral, phi3, etc.
     "ollama_api_url": "http://localhost:11434/api/generate",
+    "ollama_timeout": 120,  # Seconds; can be overridden per call
     "server_url": "http://localhost:3000/messages",
+    "base_url": None,  # Site under test; None means the public demo site (playwright_actions.BASE_URL)
+    # "live" (network), "replay" (from the recorded HAR) or "local" (static copy of the site), see site_mirror.py
+    "site_mode": "live",
+    "site_mirror": {
+        "har_path": "mirror/automationdemo.har",  # Written by `python site_mirror.py record`
+        "not_found": "abort",  # Replay: "abort" requests missing from the HAR, or "fallback" to the network
+        "local_dir": "benchmarks/site",  # Relative to the repository root
+    },
     "browser": "chromium",
     "headless": False,
+    "launch_profile": "standard",  # "lean" adds low-overhead Chromium flags, see launch_profiles.py
+    # Per-action request blocking to speed up actions whose pages are not photographed
+    "resource_blocking": {
+        "mode": "auto",  # "auto" (full blocking only for actions that take no screenshots), "always" or "never"
+        "resource_types": ["image", "font", "media"],
+        "third_party": True,  # Also block other origins, e.g. the embedded Google Maps frame
+        "always_block": [],  # Blocked in "auto" mode even when screenshots are taken, e.g. ["media"]
+    },
+    "browser_pool_size": 2,  # Long-lived browsers shared by gui.py, app.py and entry.py
+    # Pages each pooled browser keeps open on the site, reset and refilled while it is idle
+    "warm_pages": {
+        "size": 1,  # 0 opens a new page for every action
+        "max_uses": 20,  # A page is replaced after this many actions
+        "max_profiles": 2,  # Load state/blocking combinations that keep warm pages, see warm_pages.page_profile
+    },
+    "async_concurrency": 4,  # Max parallel contexts for async_actions.run_instructions
+    "job_workers": 2,  # Background threads running automation jobs for app.py and gui.py
+    # Load state to wait for after navigation, per action ("load", "domcontentloaded", "networkidle").
+    # An instruction can override it with its own "wait_until" key.
+    "wait_until": {
+        "default": "domcontentloaded",
+        "search_car": "domcontentloaded",
+        "submit_booking": "load",
+    },
+    "wait_timeout_ms": 10000,
+    # capture: "none" | "final" (only the returned image) | "key" | "all"
+    # An instruction can override any of these with {"screenshots": {...}}
+    "screenshots": {
+        "capture": "final",
+        "format": "png",  # png | jpeg | webp
+        "quality": 80,  # jpeg/webp only
+        "full_page": True,  # False = viewport only
+        "max_width": 1200,
+        "clip_selector": None,  # e.g. "#booking" to capture a single element
+        "background_encode": True,  # Resize/encode on screenshot_encoder's pool while the browser keeps going
+    },
+    "screenshot_encoder": {
+        "kind": "thread",  # "thread" or "process"
+        "workers": 2,
+        "max_pending": 8,  # Submits block once this many images are queued
+    },
+    # Content-addressed screenshot store used by save_screenshot_to_file
+    "artifact_store": {
+        "root": "screenshots",
+        "max_bytes": 500 * 1024 * 1024,  # Least recently used blobs are evicted past this
+        "perceptual": False,  # Also dedupe near-identical frames by difference hash
+        "phash_threshold": 4,  # Max differing bits (of 64) to count as the same frame
+    },
+    # GUI execution log: lines kept per widget, batching interval and optional full log file
+    "gui_log": {
+        "max_lines": 2000,
+        "flush_ms": 100,
+        "spill_path": None,  # e.g. "logs/gui.log"
+    },
+    # Run history shared by gui.py, app.py and entry.py
+    "history": {
+        "path": "cache/history.sqlite3",
+        "page_size": 100,  # Rows the GUI History tab loads per scroll step
+    },
+    # Hierarchical timing spans (LLM call, parse, launch, goto, locators, screenshots)
+    "tracing": {
+        "enabled": False,  # Off: span() returns a shared no-op object
+        "chrome_path": "traces/trace.json",  # Chrome trace format, open in Perfetto
+        "jsonl_path": "traces/spans.jsonl",
+        "max_spans": 100000,  # Oldest spans are dropped past this
+    },
+    "intent_grammar": True,  # Rule-based fast path in front of the LLM
+    "stream_parse": True,  # Stop generation at the first complete, valid action object
+    # Natural language prompt -> parsed instruction cache (memory LRU + SQLite)
+    "prompt_cache": {
+        "enabled": True,
+        "path": "cache/prompt_cache.sqlite3",
+        "memory_size": 256,
+        "disk_size": 5000,
+        "ttl_seconds": 7 * 24 * 3600,
+    },
 }
@@ -0,0 +1,144 @@
+import json
+import threading
+
+import pytest
+
+from playwright_actions import site_url
+from site_mirror import apply_site_mode, site_mode
+
+# Response headers that no longer match once the body is kept decoded in memory
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+# nodeid -> {"setup": s, "call": s, "teardown": s}, and the ids of tests that use a browser
+_timings = {}
+_browser_tests = set()
+
+
+def pytest_addoption(parser):
+    parser.addoption("--shard", default=None,
+                     help="only run shard i of n (e.g. --shard=2/4); start one pytest process per shard")
+    parser.addoption("--timing-json", default=None, help="write per-test setup/call/teardown times to this file")
+    parser.addoption("--perf-iterations", type=int, default=5, help="loads/interactions per test in test_performance.py")
+    parser.addoption("--perf-baseline", default=None, help="baseline for test_performance.py")
+    parser.addoption("--update-perf-baseline", action="store_true",
+                     help="store test_performance.py results as the new baseline instead of comparing")
+
+
+class AssetCache:
+    """Session-wide in-memory copy of the site's static files.
+
+    The template page fills it, so every later test context gets CSS,
+    scripts, images and fonts without going to the network again.
+    """
+
+    CACHED_TYPES = {"stylesheet", "script", "image", "font"}
+
+    def __init__(self):
+        self.hits = 0
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def install(self, context):
+        context.route("**/*", self._handle)
+
+    def _handle(self, route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.CACHED_TYPES:
+            return route.fallback()
+        with self._lock:
+            cached = self._responses.get(request.url)
+        if cached is None:
+            response = route.fetch()
+            if response.status != 200:
+                return route.fulfill(response=response)
+            cached = {
+                "status": response.status,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+                "body": response.body(),
+            }
+            with self._lock:
+                self._responses[request.url] = cached
+        else:
+            self.hits += 1
+        return route.fulfill(**cached)
+
+
+@pytest.fixture(scope="session")
+def site_template(browser, browser_context_args):
+    """Load the site once per session; test contexts start from its storage state and asset cache"""
+    # Replay and local modes are served from disk already
+    cache = AssetCache() if site_mode() == "live" else None
+    context = browser.new_context(**browser_context_args)
+    apply_site_mode(context)
+    if cache is not None:
+        cache.install(context)
+    page = context.new_page()
+    page.goto(site_url(), wait_until="load")
+    page.locator("h1.welcome").wait_for(state="visible")
+    template = {"storage_state": context.storage_state(), "asset_cache": cache}
+    context.close()
+    return template
+
+
+@pytest.fixture
+def context(browser, browser_context_args, site_template):
+    """A fresh context per test, cloned from the session template (replaces pytest-playwright's)"""
+    context = browser.new_context(**dict(browser_context_args, storage_state=site_template["storage_state"]))
+    apply_site_mode(context)
+    if site_template["asset_cache"] is not None:
+        site_template["asset_cache"].install(context)
+    yield context
+    context.close()
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if {"page", "context", "browser"} & set(getattr(item, "fixturenames", ())):
+            _browser_tests.add(item.nodeid)
+
+    shard = config.getoption("shard")
+    if not shard:
+        return
+    try:
+        index, total = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise pytest.UsageError(f"--shard expects i/n, got {shard!r}") from None
+    if not 1 <= index <= total:
+        raise pytest.UsageError(f"--shard index must be between 1 and {total}")
+
+    # Deal browser tests and the rest out separately so every shard gets its share of the slow ones
+    selected, deselected = [], []
+    positions = {True: 0, False: 0}
+    for item in items:
+        is_browser_test = item.nodeid in _browser_tests
+        keep = positions[is_browser_test] % total == index - 1
+        positions[is_browser_test] += 1
+        (selected if keep else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def pytest_runtest_logreport(report):
+    _timings.setdefault(report.nodeid, {})[report.when] = report.duration
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    rows = sorted(
+        ((sum(times.values()), nodeid, times) for nodeid, times in _timings.items() if nodeid in _browser_tests),
+        reverse=True,
+    )
+    if rows:
+        terminalreporter.section("browser test timing")
+        terminalreporter.write_line(f"{'total s':>8} {'setup':>7} {'call':>7} {'teardown':>8}  test")
+        for total, nodeid, times in rows:
+            terminalreporter.write_line(
+                f"{total:8.2f} {times.get('setup', 0):7.2f} {times.get('call', 0):7.2f} "
+                f"{times.get('teardown', 0):8.2f}  {nodeid}"
+            )
+        terminalreporter.write_line(f"{sum(row[0] for row in rows):8.2f} s in {len(rows)} browser tests")
+
+    path = config.getoption("timing_json")
+    if path:
+        with open(path, "w") as f:
+            json.dump(_timings, f, indent=2)
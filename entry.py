@@ -1,25 +1,40 @@
-from client import call_ollama_model
-from parser import parse_response
-from playwright_actions import perform_action
+from history_store import get_history_store
+from instruction_pipeline import resolve_instruction
+from playwright_actions import is_error_result, perform_action
 
 def main():
     user_prompt = input(" What do you want to automate?\n> ")
 
-    ollama_output = call_ollama_model(user_prompt)
-    if not ollama_output:
+    history = get_history_store()
+
+    parsed_instruction, ollama_output, source = resolve_instruction(user_prompt)
+    if source == "llm" and not ollama_output:
         print(" No response from model.")
+        history.append(user_prompt, None, "error", "No response from model", source="entry")
         return
 
-    print("\n Raw Output from Ollama:\n", ollama_output)
+    if ollama_output:
+        print("\n Raw Output from Ollama:\n", ollama_output)
 
-    parsed_instruction = parse_response(ollama_output)
     if not parsed_instruction:
         print(" Couldn't parse instruction.")
+        history.append(user_prompt, None, "error", "Could not parse instruction",
+                       source="entry", raw_output=ollama_output)
         return
 
-    print("\n Parsed instruction:\n", parsed_instruction)
+    print(f"\n Parsed instruction ({source}):\n", parsed_instruction)
 
-    perform_action(parsed_instruction)
+    status = "error"
+    result = "Interrupted"
+    try:
+        result, _ = perform_action(parsed_instruction)
+        status = "error" if is_error_result(result) else "success"
+    except Exception as e:
+        result = str(e)
+        raise
+    finally:
+        history.append(user_prompt, parsed_instruction.get("action"), status, result,
+                       source="entry", instruction=parsed_instruction, raw_output=ollama_output)
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
-import json
 from datetime import datetime, timedelta
 from PIL import Image, ImageTk
 import io
-import base64
 import queue
-import os
+import time
 
 # Import your existing modules
-from client import call_ollama_model
-from parser import parse_response
-from playwright_actions import perform_action
+from artifact_store import get_artifact_store
+from browser_pool import get_browser_pool
+from config import CONFIG
+from history_store import get_history_store
+from job_runner import get_job_runner
+from log_view import LogView
+
+JOB_STATUS = {"queued": "⏳ Queued", "running": "🔄 Running", "success": "✅ Success", "error": "❌ Failed"}
+# How often the Tk thread picks up job updates queued by worker threads
+JOB_POLL_MS = 100
+STATUS_FILTERS = {"All": None, "Success": "success", "Failed": "error"}
+TIME_RANGES = {"All time": None, "Last hour": 3600, "Last 24 hours": 24 * 3600,
+               "Last 7 days": 7 * 24 * 3600, "Last 30 days": 30 * 24 * 3600}
 
 class CarRentalAutomationGUI:
     def __init__(self, root):
@@ -21,15 +29,21 @@ class CarRentalAutomationGUI:
         self.root.geometry("1400x900")
         self.root.configure(bg='#2c3e50')
         
-        # Queue for thread communication
-        self.result_queue = queue.Queue()
+        # Job updates from worker threads, drained on the Tk thread by dispatch_job_events
+        self.job_events = queue.Queue()
+        self.jobs = {}  # job id -> Job, for the jobs this window submitted
+        self.job_runner = get_job_runner()
+        self.job_runner.add_listener(self.on_job_event)
+        self.root.after(JOB_POLL_MS, self.dispatch_job_events)
         
         # Variables
-        self.is_running = False
         self.current_screenshot = None
         
         self.setup_ui()
         
+        # Launch the shared browser in the background so the first action is fast
+        threading.Thread(target=get_browser_pool().warm_up, daemon=True).start()
+        
     def setup_ui(self):
         # Main container
         main_frame = ttk.Frame(self.root)
@@ -58,6 +72,9 @@ class CarRentalAutomationGUI:
         # Tab 5: Test History
         self.create_history_tab(notebook)
         
+        # Execution log shown in both the natural language and results tabs
+        self.log_view = LogView(self.root, [self.output_text, self.results_text])
+        
     def create_natural_language_tab(self, notebook):
         frame = ttk.Frame(notebook)
         notebook.add(frame, text="🤖 Natural Language")
@@ -281,24 +298,53 @@ class CarRentalAutomationGUI:
                                font=('Arial', 16, 'bold'))
         title_label.pack(pady=10)
         
+        # Filters
+        filter_frame = ttk.Frame(frame)
+        filter_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        ttk.Label(filter_frame, text="Action:").pack(side=tk.LEFT)
+        self.history_action = ttk.Combobox(filter_frame, values=["All"], width=22, state='readonly')
+        self.history_action.set("All")
+        self.history_action.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(filter_frame, text="Status:").pack(side=tk.LEFT)
+        self.history_status = ttk.Combobox(filter_frame, values=list(STATUS_FILTERS), width=10, state='readonly')
+        self.history_status.set("All")
+        self.history_status.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(filter_frame, text="Time:").pack(side=tk.LEFT)
+        self.history_range = ttk.Combobox(filter_frame, values=list(TIME_RANGES), width=14, state='readonly')
+        self.history_range.set("All time")
+        self.history_range.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+        self.history_search = ttk.Entry(filter_frame, width=25)
+        self.history_search.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(filter_frame, text="🔍 Apply", command=self.reload_history).pack(side=tk.LEFT, padx=5)
+        for combobox in (self.history_action, self.history_status, self.history_range):
+            combobox.bind("<<ComboboxSelected>>", lambda event: self.reload_history())
+        self.history_search.bind("<Return>", lambda event: self.reload_history())
+        
         # History table
         history_frame = ttk.LabelFrame(frame, text="Recent Tests", padding=10)
         history_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
-        # Treeview for history
-        columns = ('Time', 'Command', 'Action', 'Status', 'Result')
+        # Treeview for history; each job gets a row as soon as it is queued,
+        # stored runs are loaded a page at a time as the list is scrolled
+        columns = ('Job', 'Time', 'Command', 'Action', 'Status', 'Result')
         self.history_tree = ttk.Treeview(history_frame, columns=columns, show='headings', height=15)
         
         for col in columns:
             self.history_tree.heading(col, text=col)
-            self.history_tree.column(col, width=150)
+            self.history_tree.column(col, width=100 if col == 'Job' else 150)
         
         # Scrollbar for treeview
-        history_scrollbar = ttk.Scrollbar(history_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
-        self.history_tree.configure(yscrollcommand=history_scrollbar.set)
+        self.history_scrollbar = ttk.Scrollbar(history_frame, orient=tk.VERTICAL, command=self.history_tree.yview)
+        self.history_tree.configure(yscrollcommand=self.on_history_scroll)
         
         self.history_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        history_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.history_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # History controls
         history_controls = ttk.Frame(frame)
@@ -309,42 +355,27 @@ class CarRentalAutomationGUI:
         ttk.Button(history_controls, text="💾 Export History", 
                   command=self.export_history).pack(side=tk.LEFT, padx=5)
         
-        # Initialize history list
-        self.test_history = []
+        self.history_count_var = tk.StringVar(value="")
+        ttk.Label(history_controls, textvariable=self.history_count_var).pack(side=tk.RIGHT, padx=5)
+        
+        # Persistent history shared with app.py and entry.py
+        self.history_store = get_history_store()
+        self.history_page_size = CONFIG.get("history", {}).get("page_size", 100)
+        self.history_oldest_id = None
+        self.history_has_more = False
+        self.history_cleared_at = None  # Clear History hides older runs in this window only
+        self.reload_history()
         
     def execute_natural_command(self):
-        if self.is_running:
-            return
-            
         command = self.natural_input.get(1.0, tk.END).strip()
         if not command:
             messagebox.showwarning("Warning", "Please enter a command!")
             return
             
-        self.start_execution()
-        self.log_output(f"🤖 Processing command: {command}")
-        
-        # Run in separate thread
-        thread = threading.Thread(target=self.run_automation, args=(command, "natural"))
-        thread.daemon = True
-        thread.start()
-        
-        # Start checking for results
-        self.check_result()
+        self.submit_job(command)
         
     def execute_quick_action(self, action):
-        if self.is_running:
-            return
-            
-        self.start_execution()
-        self.log_output(f"⚡ Executing quick action: {action}")
-        
-        # Run in separate thread
-        thread = threading.Thread(target=self.run_automation_direct, args=(action, "quick"))
-        thread.daemon = True
-        thread.start()
-        
-        self.check_result()
+        self.submit_job(str(action), instruction=action)
         
     def fill_booking_form(self):
         form_data = self.get_form_data()
@@ -357,18 +388,10 @@ class CarRentalAutomationGUI:
     def fill_and_submit_form(self):
         form_data = self.get_form_data()
         
-        if self.is_running:
-            return
-            
-        self.start_execution()
-        self.log_output("📝➡️📤 Filling form and submitting...")
-        
-        # Run both actions in sequence
-        thread = threading.Thread(target=self.run_form_sequence, args=(form_data,))
-        thread.daemon = True
-        thread.start()
-        
-        self.check_result()
+        # Fill and submit on the same page so the submit sees the filled form
+        fill_action = {"action": "fill_booking_form", "form_data": form_data}
+        submit_action = {"action": "submit_booking"}
+        self.submit_job("Fill and Submit Form", steps=[fill_action, submit_action])
         
     def get_form_data(self):
         return {
@@ -394,110 +417,82 @@ class CarRentalAutomationGUI:
         self.form_cdw.set(True)
         self.form_terms.set(True)
         
-    def run_automation(self, command, source):
-        try:
-            # Step 1: Call Ollama
-            self.update_progress("Calling Ollama model...")
-            ollama_output = call_ollama_model(command)
-            
-            if not ollama_output:
-                self.result_queue.put(("error", "No response from Ollama model", None, source))
-                return
-                
-            # Step 2: Parse response
-            self.update_progress("Parsing response...")
-            parsed_instruction = parse_response(ollama_output)
-            
-            if not parsed_instruction:
-                self.result_queue.put(("error", "Could not parse instruction", None, source))
-                return
-                
-            # Step 3: Execute action
-            self.update_progress("Executing browser automation...")
-            result_message, screenshot = perform_action(parsed_instruction)
-            
-            self.result_queue.put(("success", result_message, screenshot, source, command, parsed_instruction))
-            
-        except Exception as e:
-            self.result_queue.put(("error", str(e), None, source))
-            
-    def run_automation_direct(self, action, source):
-        try:
-            self.update_progress("Executing browser automation...")
-            result_message, screenshot = perform_action(action)
-            self.result_queue.put(("success", result_message, screenshot, source, str(action), action))
-        except Exception as e:
-            self.result_queue.put(("error", str(e), None, source))
-            
-    def run_form_sequence(self, form_data):
-        try:
-            # Fill form first
-            self.update_progress("Filling booking form...")
-            fill_action = {"action": "fill_booking_form", "form_data": form_data}
-            result1, screenshot1 = perform_action(fill_action)
-            
-            # Then submit
-            self.update_progress("Submitting booking...")
-            submit_action = {"action": "submit_booking"}
-            result2, screenshot2 = perform_action(submit_action)
-            
-            combined_result = f"Fill Result: {result1}\nSubmit Result: {result2}"
-            final_screenshot = screenshot2 if screenshot2 else screenshot1
-            
-            self.result_queue.put(("success", combined_result, final_screenshot, "form_sequence", 
-                                 "Fill and Submit Form", submit_action))
-            
-        except Exception as e:
-            self.result_queue.put(("error", str(e), None, "form_sequence"))
+    def submit_job(self, command, instruction=None, steps=None):
+        """Queue a job; commands issued while others run simply wait for a free worker"""
+        job_id = self.job_runner.submit(command, instruction=instruction, steps=steps)
+        job = self.job_runner.get(job_id)
+        self.jobs[job_id] = job
+        
+        action = (instruction or {}).get('action', '') if not steps else "run_session"
+        self.history_tree.insert('', 0, iid=job_id, values=(
+            job_id,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            command[:50] + "..." if len(command) > 50 else command,
+            action,
+            JOB_STATUS["queued"],
+            ""
+        ))
+        self.log_output(f"📥 Job {job_id} queued: {command}")
+        self.update_progress_summary()
+        
+    def on_job_event(self, job, stage, message):
+        """Called on a worker thread; Tk is not thread safe, so only queue the update"""
+        self.job_events.put((job.id, stage, message))
             
-    def start_execution(self):
-        self.is_running = True
-        self.execute_btn.configure(state='disabled')
-        self.progress_bar.start()
-        self.progress_var.set("Executing...")
-        
-    def finish_execution(self):
-        self.is_running = False
-        self.execute_btn.configure(state='normal')
-        self.progress_bar.stop()
-        self.progress_var.set("Ready")
-        
-    def update_progress(self, message):
-        self.root.after(0, lambda: self.progress_var.set(message))
-        
-    def check_result(self):
+    def dispatch_job_events(self):
+        """Apply every pending job update on the Tk thread; the single place results reach the UI"""
         try:
-            result = self.result_queue.get_nowait()
-            status, message, screenshot, source = result[:4]
-            
-            if status == "success":
-                command = result[4] if len(result) > 4 else "Unknown"
-                action = result[5] if len(result) > 5 else {}
-                
-                self.log_output(f"✅ SUCCESS: {message}")
-                self.display_screenshot(screenshot)
-                self.add_to_history(command, action.get('action', 'Unknown'), "Success", message)
-                
-            else:
-                self.log_output(f"❌ ERROR: {message}")
-                self.add_to_history("Error", "Error", "Failed", message)
+            self.apply_job_events()
+        finally:
+            self.root.after(JOB_POLL_MS, self.dispatch_job_events)
+        
+    def apply_job_events(self):
+        if self.job_events.empty():
+            return
+        while True:
+            try:
+                job_id, stage, message = self.job_events.get_nowait()
+            except queue.Empty:
+                break
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue  # Submitted by someone else sharing the runner
                 
-            self.finish_execution()
-            
-        except queue.Empty:
-            # Check again in 100ms
-            self.root.after(100, self.check_result)
+            if stage in ("done", "error"):
+                self.finish_job(job)
+            elif stage != "queued" and self.history_tree.exists(job_id):
+                self.history_tree.set(job_id, 'Status', f"{JOB_STATUS['running']}: {message}"[:60])
+                if job.instruction:
+                    self.history_tree.set(job_id, 'Action', job.instruction.get('action', ''))
+        self.update_progress_summary()
+        
+    def finish_job(self, job):
+        del self.jobs[job.id]
+        result = job.result or ""
+        if job.status == "success":
+            self.log_output(f"✅ Job {job.id} SUCCESS: {result}")
+            if job.screenshot_id:
+                self.display_screenshot(get_artifact_store().get(job.screenshot_id))
+        else:
+            self.log_output(f"❌ Job {job.id} ERROR: {result}")
+        action = job.instruction.get('action', 'Unknown') if job.instruction else "Error"
+        self.add_to_history(job, action, result)
+        
+    def update_progress_summary(self):
+        running = sum(1 for job in self.jobs.values() if job.status == "running")
+        queued = len(self.jobs) - running
+        if self.jobs:
+            self.progress_bar.start()
+            self.progress_var.set(f"{running} running, {queued} queued")
+        else:
+            self.progress_bar.stop()
+            self.progress_var.set("Ready")
             
     def log_output(self, message):
         timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}\n"
         
-        self.output_text.insert(tk.END, formatted_message)
-        self.output_text.see(tk.END)
-        
-        # Also log to results tab
-        self.results_text.insert(tk.END, formatted_message)
-        self.results_text.see(tk.END)
+        # Batched: lines reach output_text and results_text on the next flush, capped in length
+        self.log_view.write(f"[{timestamp}] {message}")
         
     def display_screenshot(self, screenshot_bytes):
         if not screenshot_bytes:
@@ -552,52 +547,101 @@ class CarRentalAutomationGUI:
     def clear_natural_input(self):
         self.natural_input.delete(1.0, tk.END)
         
-    def add_to_history(self, command, action, status, result):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def add_to_history(self, job, action, result):
+        self.history_store.append(
+            job.command, action, job.status, result, source="gui", job_id=job.id,
+            screenshot_id=job.screenshot_id, instruction=job.instruction, raw_output=job.raw_output
+        )
         
-        # Add to treeview
-        self.history_tree.insert('', 0, values=(
-            timestamp, 
-            command[:50] + "..." if len(command) > 50 else command,
+        # Update the job's treeview row (re-added if the history view was reloaded meanwhile)
+        values = (
+            job.id,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 
+            job.command[:50] + "..." if len(job.command) > 50 else job.command,
             action,
-            status,
+            JOB_STATUS[job.status],
             result[:50] + "..." if len(result) > 50 else result
-        ))
+        )
+        if self.history_tree.exists(job.id):
+            self.history_tree.item(job.id, values=values)
+        else:
+            self.history_tree.insert('', 0, iid=job.id, values=values)
+            
+    def history_filters(self):
+        window = TIME_RANGES[self.history_range.get()]
+        action = self.history_action.get()
+        since = [start for start in (time.time() - window if window else None, self.history_cleared_at) if start]
+        return {
+            "action": None if action == "All" else action,
+            "status": STATUS_FILTERS[self.history_status.get()],
+            "since": max(since) if since else None,
+            "search": self.history_search.get().strip() or None,
+        }
         
-        # Add to history list
-        self.test_history.insert(0, {
-            'timestamp': timestamp,
-            'command': command,
-            'action': action,
-            'status': status,
-            'result': result
-        })
-        
-        # Keep only last 100 entries
-        if len(self.test_history) > 100:
-            self.test_history.pop()
+    def reload_history(self):
+        """Reload stored runs from the first page; rows of jobs still in flight stay on top"""
+        for item in self.history_tree.get_children():
+            if item not in self.jobs:
+                self.history_tree.delete(item)
+        self.history_action.configure(values=["All"] + self.history_store.actions())
+        self.history_oldest_id = None
+        self.history_has_more = True
+        self.history_count_var.set(f"{self.history_store.count(**self.history_filters())} runs")
+        self.load_history_page()
+        
+    def load_history_page(self):
+        if not self.history_has_more:
+            return
+        rows = self.history_store.page(self.history_page_size, before_id=self.history_oldest_id,
+                                       **self.history_filters())
+        for row in rows:
+            iid = row['job_id'] or f"run-{row['id']}"
+            if self.history_tree.exists(iid):
+                continue  # Finished in this session and already shown on top
+            command = row['command']
+            result = row['result'] or ""
+            self.history_tree.insert('', tk.END, iid=iid, values=(
+                row['job_id'] or "",
+                datetime.fromtimestamp(row['created_at']).strftime("%Y-%m-%d %H:%M:%S"),
+                command[:50] + "..." if len(command) > 50 else command,
+                row['action'] or "",
+                JOB_STATUS.get(row['status'], row['status']),
+                result[:50] + "..." if len(result) > 50 else result
+            ))
+        if rows:
+            self.history_oldest_id = rows[-1]['id']
+        self.history_has_more = len(rows) == self.history_page_size
+        
+    def on_history_scroll(self, first, last):
+        """Scrollbar callback; fetches the next page once the view nears the bottom"""
+        self.history_scrollbar.set(first, last)
+        if self.history_has_more and float(last) > 0.9:
+            self.root.after_idle(self.load_history_page)
             
     def clear_history(self):
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        self.test_history.clear()
+        # The store is shared with app.py and entry.py, so only this window's view is cleared
+        if not messagebox.askyesno("Clear History", "Hide all earlier runs from this list? They stay stored."):
+            return
+        self.history_cleared_at = time.time()
+        self.reload_history()
         
     def export_history(self):
-        if not self.test_history:
+        filters = self.history_filters()
+        if not self.history_store.count(**filters):
             messagebox.showinfo("Info", "No history to export!")
             return
             
         filename = filedialog.asksaveasfilename(
-            defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
-            initialfile=f"test_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines files", "*.jsonl"), ("All files", "*.*")],
+            initialfile=f"test_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
         )
         
         if filename:
             try:
-                with open(filename, 'w') as f:
-                    json.dump(self.test_history, f, indent=2)
-                messagebox.showinfo("Success", f"History exported to {filename}")
+                # Streams the rows matching the current filters, never holding them all in memory
+                written = self.history_store.export_jsonl(filename, **filters)
+                messagebox.showinfo("Success", f"Exported {written} runs to {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export history: {e}")
 
@@ -0,0 +1,160 @@
+#history_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import CONFIG
+
+
+class HistoryStore:
+    """Append-only SQLite history of automation runs, shared by gui.py, app.py and entry.py.
+
+    Rows are only ever inserted. Reads are paged newest-first by id
+    (keyset paging, so deep pages cost the same as the first one) and can
+    be filtered by action, status, source, time range and command text;
+    the filters are backed by indexes so months of runs stay fast.
+    """
+
+    def __init__(self, path=None):
+        settings = CONFIG.get("history", {})
+        self.path = path or settings.get("path", "cache/history.sqlite3")
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        # WAL lets the GUI, Streamlit and CLI processes read while another one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT,
+                created_at REAL NOT NULL,
+                source TEXT NOT NULL,
+                command TEXT NOT NULL,
+                action TEXT,
+                status TEXT NOT NULL,
+                result TEXT,
+                screenshot_id TEXT,
+                instruction TEXT,
+                raw_output TEXT
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_created_at ON history(created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_action ON history(action, id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_status ON history(status, id)")
+        self._db.commit()
+
+    def append(self, command, action, status, result, source="gui", job_id=None,
+               screenshot_id=None, instruction=None, raw_output=None, created_at=None):
+        """Record one run and return its row id"""
+        with self._lock:
+            cursor = self._db.execute(
+                """INSERT INTO history (job_id, created_at, source, command, action, status,
+                                        result, screenshot_id, instruction, raw_output)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, created_at or time.time(), source, command, action, status, result,
+                 screenshot_id, json.dumps(instruction) if instruction is not None else None, raw_output),
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def page(self, limit=50, before_id=None, **filters):
+        """Newest-first rows older than before_id; pass the last row's id to get the next page"""
+        where, params = self._where(before_id=before_id, **filters)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM history {where} ORDER BY id DESC LIMIT ?", params + [limit]
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def get_many(self, ids):
+        """Rows for the given ids, in the order of ids (missing ones are skipped)"""
+        ids = list(ids)
+        if not ids:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM history WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        by_id = {row["id"]: self._to_dict(row) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM history {where}", params).fetchone()[0]
+
+    def actions(self):
+        """Distinct recorded actions, for filter drop-downs"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT action FROM history WHERE action IS NOT NULL ORDER BY action"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def export_jsonl(self, path, batch_size=500, **filters):
+        """Stream matching rows (oldest first) to a JSONL file; returns the number written"""
+        where, params = self._where(**filters)
+        written = 0
+        last_id = 0
+        with open(path, "w", encoding="utf-8") as f:
+            while True:
+                clause = f"{where} AND id > ?" if where else "WHERE id > ?"
+                with self._lock:
+                    rows = self._db.execute(
+                        f"SELECT * FROM history {clause} ORDER BY id LIMIT ?", params + [last_id, batch_size]
+                    ).fetchall()
+                if not rows:
+                    break
+                for row in rows:
+                    f.write(json.dumps(self._to_dict(row)) + "\n")
+                written += len(rows)
+                last_id = rows[-1]["id"]
+        return written
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _where(before_id=None, action=None, status=None, source=None, since=None, until=None, search=None):
+        clauses, params = [], []
+        for column, value in (("action", action), ("status", status), ("source", source)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        if search:
+            clauses.append("command LIKE ?")
+            params.append(f"%{search}%")
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _to_dict(row):
+        entry = dict(row)
+        if entry["instruction"]:
+            entry["instruction"] = json.loads(entry["instruction"])
+        return entry
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
@@ -0,0 +1,77 @@
+#instruction_pipeline.py
+import threading
+
+from client import call_ollama_model, SYSTEM_PROMPT_VERSION
+from config import CONFIG
+from intent_grammar import match_intent
+from parser import parse_response, StreamingActionExtractor, validate_instruction
+from prompt_cache import get_prompt_cache
+from tracing import span
+
+# How many commands were answered by each path, to measure avoided LLM traffic
+PATH_STATS = {"grammar": 0, "cache": 0, "llm": 0}
+_stats_lock = threading.Lock()
+
+
+def resolve_instruction(user_prompt):
+    """Turn a natural language command into an instruction dict.
+
+    Returns (instruction, raw_output, source). source is "grammar" when
+    the rule-based matcher recognized the command, "cache" when the answer
+    came from the prompt cache (raw_output is None in both cases) and
+    "llm" when the model was called. instruction is None if nothing could
+    be parsed; an empty raw_output means the model did not answer.
+    """
+    if CONFIG.get("intent_grammar", True):
+        matched = match_intent(user_prompt)
+        if matched is not None:
+            _count("grammar")
+            print(f"⚡ Fast path (grammar): {matched}")
+            return matched, None, "grammar"
+
+    cache = get_prompt_cache() if CONFIG.get("prompt_cache", {}).get("enabled", True) else None
+    model = CONFIG["ollama_model"]
+
+    if cache is not None:
+        cached = cache.get(user_prompt, model, SYSTEM_PROMPT_VERSION)
+        if cached is not None:
+            _count("cache")
+            print(f"⚡ Prompt cache hit: {cached}")
+            return cached, None, "cache"
+
+    _count("llm")
+    extractor = StreamingActionExtractor() if CONFIG.get("stream_parse", True) else None
+    ollama_output = call_ollama_model(user_prompt, stop_when=extractor.feed if extractor else None)
+    if not ollama_output:
+        return None, ollama_output, "llm"
+
+    # The streaming extractor already has the action if generation was cut short
+    with span("parse", response_bytes=len(ollama_output)) as trace:
+        if extractor and extractor.result:
+            parsed_instruction = extractor.result
+            trace.set(streamed=True)
+        else:
+            parsed_instruction = parse_response(ollama_output)
+        trace.set(action=(parsed_instruction or {}).get("action"))
+    # Only answers that pass the schema are cached, so a bad answer is not repeated for every later identical prompt
+    if cache is not None and validate_instruction(parsed_instruction):
+        cache.put(user_prompt, model, SYSTEM_PROMPT_VERSION, parsed_instruction)
+
+    return parsed_instruction, ollama_output, "llm"
+
+
+def get_path_stats():
+    """Return a copy of the per-path counters plus the share that skipped the LLM"""
+    with _stats_lock:
+        stats = dict(PATH_STATS)
+    total = sum(stats.values())
+    stats["llm_avoided_ratio"] = (total - stats["llm"]) / total if total else 0.0
+    return stats
+
+
+def _count(path):
+    with _stats_lock:
+        PATH_STATS[path] += 1
+    stats = get_path_stats()
+    print(f"📊 Commands by path: grammar {stats['grammar']}, cache {stats['cache']}, llm {stats['llm']} "
+          f"({stats['llm_avoided_ratio']:.0%} without the LLM)")
@@ -0,0 +1,159 @@
+#intent_grammar.py
+import re
+
+# Rule-based fast path for the common commands. Each rule recognizes one
+# of the nine actions from client.py's system prompt and pulls out its
+# slots; anything that matches zero or several rules, chains two commands
+# or negates one goes to the model.
+
+CAR_TYPES = {"suv": "SUV", "van": "VAN", "luxury": "Luxury"}
+
+SECTIONS = [
+    (re.compile(r"\b(home|top|start)\b"), "#home"),
+    (re.compile(r"\b(available cars|cars?|vehicles?|fleet)\b"), "#cars"),
+    (re.compile(r"\b(pricing|prices?|price list|rates?)\b"), "#price"),
+    (re.compile(r"\bbooking( form)?\b|\breservation\b"), "#booking"),
+    (re.compile(r"\bcontacts?( us)?\b|\bfooter\b"), "#contact"),
+]
+
+CAR_TYPE_RE = re.compile(r"\b(suv|van|luxury)\b")
+DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# "named John Smith" / "name is John Smith" in the original (not lowercased) text; "for Monday" is not a name
+NAME_RE = re.compile(r"\b(?:named|name is)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)")
+CALENDAR_WORDS = {"monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+                  "january", "february", "march", "april", "may", "june", "july", "august",
+                  "september", "october", "november", "december", "today", "tomorrow"}
+COMPOUND_RE = re.compile(r"\b(and then|then|after that|and also)\b|;")
+# "open the form and reset it": an action verb on both sides of "and" is two commands
+AND_RE = re.compile(r"\band\b|,")
+ACTION_VERB_RE = re.compile(
+    r"\b(go|navigate|jump|scroll|take|move|open|show|visit|search|find|look|fill|book|reserve|rent|"
+    r"submit|send|reset|clear|validate|test|check|click|try)\b"
+)
+# "do not submit the form" must not run the action it names
+NEGATION_RE = re.compile(r"\b(don'?t|do not|does not|never|not|stop|cancel)\b")
+
+NAVIGATE_RE = re.compile(r"\b(go|navigate|jump|scroll|take me|move|open|show|visit)\b( me)?( to| the)?")
+SEARCH_RE = re.compile(r"^\s*(?:please\s+)?(?:search|find|look)(?:\s+(?:up|for))?\s+(?:for\s+)?(?P<query>.+?)\s*$")
+SEARCH_FILLER_RE = re.compile(r"\b(the|a|an|some|cars?|vehicles?|models?|on the site|please)\b")
+# Left in a query these mean it is a sentence ("find me a car for Monday"), not a car name
+SEARCH_REJECT_RE = re.compile(r"\b(me|my|us|our|i|you|it|them|for|on|at|in|to|from|with|by|next|this)\b")
+
+RULES = [
+    ("reset_form", re.compile(r"\b(reset|clear)\b.*\b(form|fields?|booking)\b|\breset\b\s*$")),
+    ("validate_empty_form", re.compile(r"\b(validat\w*|empty)\b.*\b(form|fields?|validation)\b|\bempty form\b")),
+    ("submit_booking", re.compile(r"\bsubmit\b")),
+    ("fill_booking_form", re.compile(r"\b(fill|book|reserve|rent)\b")),
+    ("test_contact_links", re.compile(r"\b(test|check|click|try)\b.*\bcontact\b.*\b(links?|emails?|dialog)\b|\bcontact links?\b")),
+    ("check_pricing", re.compile(r"\b(price|prices|pricing|cost|costs|rate|rates|how much)\b")),
+    ("check_car_details", re.compile(r"\b(details?|specs?|specifications?|features?|info|information)\b")),
+    ("search_car", SEARCH_RE),
+    ("navigate_to_section", NAVIGATE_RE),
+]
+
+
+def match_intent(user_prompt):
+    """Return an instruction dict for an unambiguous command, otherwise None"""
+    text = user_prompt.strip()
+    lowered = text.lower()
+    if not lowered or COMPOUND_RE.search(lowered) or NEGATION_RE.search(lowered) or _is_compound(lowered):
+        return None
+
+    matched = [action for action, pattern in RULES if pattern.search(lowered)]
+    if not matched:
+        return None
+
+    # Resolve the well-known overlaps between rules before calling it ambiguous
+    if "navigate_to_section" in matched and len(matched) > 1:
+        # "go to pricing" matches check_pricing only through the section's own name;
+        # anything else ("go check SUV pricing") is more than navigation
+        without_section = _strip_sections(lowered)
+        others = [action for action, pattern in RULES
+                  if action in matched and action != "navigate_to_section" and pattern.search(without_section)]
+        if others or CAR_TYPE_RE.search(lowered) or not _section_for(lowered):
+            return None
+        matched = ["navigate_to_section"]
+    if "validate_empty_form" in matched and "submit_booking" in matched:
+        matched.remove("submit_booking")
+    if "reset_form" in matched and "fill_booking_form" in matched:
+        matched.remove("fill_booking_form")
+    if "test_contact_links" in matched and "check_car_details" in matched:
+        matched.remove("check_car_details")
+    if "fill_booking_form" in matched and "submit_booking" in matched:
+        # "fill and submit" is a two step flow
+        return None
+
+    if len(matched) != 1:
+        return None
+    return _build_instruction(matched[0], text, lowered)
+
+
+def _build_instruction(action, text, lowered):
+    if action == "search_car":
+        query = SEARCH_FILLER_RE.sub(" ", SEARCH_RE.search(lowered).group("query"))
+        query = " ".join(query.split())
+        if not query or SEARCH_REJECT_RE.search(query):
+            return None
+        # Keep the user's capitalization for the query (BMW, Mercedes)
+        original = re.search(re.escape(query).replace(r"\ ", r"\s+"), text, re.IGNORECASE)
+        return {"action": "search_car", "query": original.group(0) if original else query}
+
+    if action == "fill_booking_form":
+        return {"action": "fill_booking_form", "form_data": _form_slots(text, lowered)}
+
+    if action in ("check_pricing", "check_car_details"):
+        car_type = _car_type_for(lowered)
+        if car_type is None:
+            return None
+        return {"action": action, "car_type": car_type}
+
+    if action == "navigate_to_section":
+        section = _section_for(lowered)
+        if section is None:
+            return None
+        return {"action": "navigate_to_section", "section": section}
+
+    return {"action": action}
+
+
+def _form_slots(text, lowered):
+    form_data = {}
+    name = NAME_RE.search(text)
+    if name and not set(name.group(1).lower().split()) & (set(CAR_TYPES) | CALENDAR_WORDS):
+        form_data["name"] = name.group(1)
+    email = EMAIL_RE.search(text)
+    if email:
+        form_data["email"] = email.group(0)
+    dates = DATE_RE.findall(text)
+    if dates:
+        form_data["start_date"] = dates[0]
+    if len(dates) > 1:
+        form_data["end_date"] = dates[1]
+    car_type = _car_type_for(lowered)
+    if car_type:
+        form_data["car_type"] = car_type
+    if re.search(r"\b(no|without)\s+(cdw|insurance|collision)", lowered):
+        form_data["cdw"] = False
+    return form_data
+
+
+def _is_compound(lowered):
+    parts = AND_RE.split(lowered)
+    return sum(1 for part in parts if ACTION_VERB_RE.search(part)) > 1
+
+
+def _strip_sections(lowered):
+    for pattern, _ in SECTIONS:
+        lowered = pattern.sub(" ", lowered)
+    return lowered
+
+
+def _car_type_for(lowered):
+    found = {CAR_TYPES[m] for m in CAR_TYPE_RE.findall(lowered)}
+    return found.pop() if len(found) == 1 else None
+
+
+def _section_for(lowered):
+    found = {section for pattern, section in SECTIONS if pattern.search(lowered)}
+    return found.pop() if len(found) == 1 else None
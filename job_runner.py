@@ -0,0 +1,211 @@
+#job_runner.py
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from artifact_store import get_artifact_store
+from automation_session import run_session
+from config import CONFIG
+from instruction_pipeline import resolve_instruction
+from playwright_actions import is_error_result, perform_action
+from tracing import span
+
+# Progress (0-100) reported when a job reaches each stage
+STAGE_PROGRESS = {
+    "queued": 0,
+    "llm_started": 10,
+    "llm_finished": 35,
+    "parsed": 45,
+    "browser_started": 55,
+    "page_ready": 65,
+    "screenshot": 80,
+    "step": 80,
+    "done": 100,
+    "error": 100,
+}
+
+
+class Job:
+    """One automation run: a command, an instruction or a list of steps plus the stage events it went through"""
+
+    def __init__(self, command, instruction=None, run_id=None, steps=None, listener=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.command = command
+        self.instruction = instruction
+        self.steps = steps  # Instructions run in order on one page, see automation_session
+        self.run_id = run_id or self.id
+        self.status = "queued"  # queued -> running -> success | error
+        self.events = []
+        self.raw_output = None
+        self.source = None
+        self.result = None
+        self.screenshot_id = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._listener = listener
+        self.emit("queued", "Waiting for a worker")
+
+    def emit(self, stage, message=""):
+        with self._lock:
+            self.events.append((time.time(), stage, message))
+            if stage in ("done", "error"):
+                self.finished_at = self.events[-1][0]
+        if self._listener:
+            self._listener(self, stage, message)
+
+    @property
+    def stage(self):
+        return self.events[-1][1]
+
+    @property
+    def message(self):
+        return self.events[-1][2]
+
+    @property
+    def progress(self):
+        return max(STAGE_PROGRESS.get(stage, 0) for _, stage, _ in list(self.events))
+
+    @property
+    def done(self):
+        return self.status in ("success", "error")
+
+
+class JobRunner:
+    """Runs automation jobs on background threads so UIs never block on the LLM or browser.
+
+    submit() returns a job id right away. Callers either poll get(job_id)
+    or register a listener with add_listener(fn), which is called as
+    fn(job, stage, message) from the worker thread on every stage event.
+    """
+
+    def __init__(self, workers=None, max_jobs=200):
+        self.workers = workers or CONFIG.get("job_workers", 2)
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-runner")
+        self._jobs = OrderedDict()
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def submit(self, command, instruction=None, run_id=None, steps=None):
+        """Queue a natural language command, a ready instruction dict or a list of steps; returns the job id"""
+        job = Job(command, instruction, run_id, steps, listener=self._notify)
+        with self._lock:
+            self._jobs[job.id] = job
+            # Forget the oldest finished jobs
+            for old_id in list(self._jobs):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if self._jobs[old_id].done:
+                    del self._jobs[old_id]
+        self._executor.submit(self._traced_run, job)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    @property
+    def pending(self):
+        """Number of jobs that are queued or running"""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.done)
+
+    def add_listener(self, fn):
+        with self._lock:
+            self._listeners.append(fn)
+
+    def remove_listener(self, fn):
+        with self._lock:
+            if fn in self._listeners:
+                self._listeners.remove(fn)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _notify(self, job, stage, message):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(job, stage, message)
+            except Exception as e:
+                print(f"Job listener failed: {e}")
+
+    def _traced_run(self, job):
+        with span("job", job_id=job.id, command=job.command) as trace:
+            self._run(job)
+            trace.set(status=job.status, source=job.source)
+
+    def _run(self, job):
+        job.status = "running"
+        try:
+            if job.steps:
+                return self._run_steps(job)
+            if job.instruction is None:
+                job.emit("llm_started", "Resolving command")
+                job.instruction, job.raw_output, job.source = resolve_instruction(job.command)
+                if job.source == "llm" and not job.raw_output:
+                    return self._fail(job, "No response from Ollama model")
+                job.emit("llm_finished", f"Served by {job.source}")
+                if not job.instruction:
+                    return self._fail(job, "Could not parse instruction")
+                job.emit("parsed", job.instruction.get("action", "unknown"))
+                if job.instruction.get("action") == "run_plan":
+                    # One inference, then every step on one page with per-step progress
+                    job.steps = job.instruction["steps"]
+                    return self._run_steps(job)
+
+            job.emit("browser_started", "Running in the browser")
+            job.result, screenshot = perform_action(job.instruction, on_event=job.emit)
+            if screenshot:
+                step = f"{job.id}_{job.instruction.get('action', 'unknown')}"
+                job.screenshot_id = get_artifact_store().put(screenshot, job.run_id, step)
+            if is_error_result(job.result):
+                return self._fail(job, job.result)
+
+            job.status = "success"
+            job.emit("done", "Automation completed")
+        except Exception as e:
+            self._fail(job, str(e))
+
+    def _run_steps(self, job):
+        job.emit("browser_started", f"Running {len(job.steps)} steps on one page")
+        steps = run_session(
+            job.steps,
+            on_step=lambda step: job.emit("step", f"Step {step['step']} ({step['action']}): {step['status']}"),
+        )
+        if job.instruction is None:
+            job.instruction = job.steps[-1]
+        job.result = "\n".join(
+            f"{step['action']} ({step['duration']:.2f}s): {step['result']}" for step in steps
+        )
+        screenshots = [step["screenshot"] for step in steps if step["screenshot"]]
+        if screenshots:
+            job.screenshot_id = get_artifact_store().put(screenshots[-1], job.run_id, f"{job.id}_steps")
+        if any(step["status"] != "success" for step in steps):
+            job.status = "error"
+            job.emit("error", "A step failed")
+        else:
+            job.status = "success"
+            job.emit("done", "Automation completed")
+
+    @staticmethod
+    def _fail(job, message):
+        job.result = message
+        job.status = "error"
+        job.emit("error", message)
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,146 @@
+#launch_profiles.py
+from urllib.parse import urlparse
+
+from config import CONFIG
+
+BROWSERS = ("chromium", "firefox", "webkit")
+
+# Chromium switches that turn off background work an automation browser never needs
+LEAN_CHROMIUM_ARGS = [
+    "--disable-extensions",
+    "--disable-component-update",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--disable-dev-shm-usage",
+    "--disable-renderer-backgrounding",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--metrics-recording-only",
+]
+
+# CONFIG["launch_profile"] -> extra launch options per engine
+LAUNCH_PROFILES = {
+    "standard": {},
+    "lean": {"chromium": {"args": LEAN_CHROMIUM_ARGS}},
+}
+
+
+def browser_name():
+    name = CONFIG.get("browser", "chromium")
+    if name not in BROWSERS:
+        raise ValueError(f"Unknown browser: {name}")
+    return name
+
+
+def browser_type(playwright):
+    """The BrowserType for CONFIG["browser"]; works for the sync and async APIs"""
+    return getattr(playwright, browser_name())
+
+
+def launch_options(headless=None, profile=None):
+    """Keyword arguments for BrowserType.launch() from CONFIG["headless"] and the launch profile"""
+    profile = profile or CONFIG.get("launch_profile", "standard")
+    if profile not in LAUNCH_PROFILES:
+        raise ValueError(f"Unknown launch profile: {profile}")
+    options = {"headless": CONFIG.get("headless", False) if headless is None else headless}
+    extra = LAUNCH_PROFILES[profile].get(browser_name(), {})
+    options.update({key: list(value) if isinstance(value, list) else value for key, value in extra.items()})
+    return options
+
+
+def blocking_rules(instruction, screenshot_options, settings=None):
+    """What an action blocks, as (resource_types, third_party), or None to block nothing.
+
+    CONFIG["resource_blocking"]["mode"] is "auto", "always" or "never"; an
+    instruction can force full blocking or none with {"block_resources": true/false}.
+    Full blocking drops `resource_types` and other origins. In "auto" mode
+    that only happens for actions that take no screenshots; the others
+    only drop `always_block`, which is empty by default so screenshots
+    look like the real site.
+    """
+    settings = settings if settings is not None else CONFIG.get("resource_blocking", {})
+    forced = (instruction or {}).get("block_resources")
+    mode = settings.get("mode", "auto")
+    if forced is False or (forced is None and mode == "never"):
+        return None
+    if forced or mode == "always" or screenshot_options.capture == "none":
+        return set(settings.get("resource_types", ["image", "font", "media"])), settings.get("third_party", True)
+    always = set(settings.get("always_block", []))
+    return (always, False) if always else None
+
+
+def wants_blocking(instruction, screenshot_options):
+    """Whether an action should run with a ResourceBlocker at all"""
+    return blocking_rules(instruction, screenshot_options) is not None
+
+
+class ResourceBlocker:
+    """page.route() rule that aborts the requests an action does not need.
+
+    Install it on a page once, then call configure() before each action
+    on that page: it switches the blocked types to what blocking_rules()
+    gives for the action, or makes the blocker inactive. While inactive
+    every request falls through to the context's own routes (site_mirror).
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings if settings is not None else CONFIG.get("resource_blocking", {})
+        self.resource_types = set(self.settings.get("resource_types", ["image", "font", "media"]))
+        self.third_party = self.settings.get("third_party", True)
+        self.active = True
+        self.blocked = 0
+        self._origin = None
+
+    @classmethod
+    def for_action(cls, instruction, screenshot_options):
+        """A blocker configured for one action, or None if the action blocks nothing"""
+        blocker = cls()
+        return blocker if blocker.configure(instruction, screenshot_options) else None
+
+    def configure(self, instruction, screenshot_options):
+        rules = blocking_rules(instruction, screenshot_options, self.settings)
+        self.active = rules is not None
+        if rules is not None:
+            self.resource_types, self.third_party = rules
+        return self.active
+
+    def install(self, page):
+        from playwright_actions import site_url
+        self._origin = _origin(site_url())
+        page.route("**/*", self._handle)
+        return self
+
+    async def install_async(self, page):
+        from playwright_actions import site_url
+        self._origin = _origin(site_url())
+
+        async def handler(route):
+            await self._handle(route)
+        await page.route("**/*", handler)
+        return self
+
+    def should_block(self, resource_type, url):
+        if resource_type in self.resource_types:
+            return True
+        origin = _origin(url)
+        # Third-party frames (the embedded map), scripts and fonts; data: and blob: URLs are left alone
+        return self.third_party and origin is not None and origin != self._origin
+
+    def _handle(self, route):
+        request = route.request
+        if self.active and self.should_block(request.resource_type, request.url):
+            self.blocked += 1
+            return route.abort()
+        return route.fallback()
+
+
+def _origin(url):
+    parts = urlparse(url)
+    if parts.scheme not in ("http", "https"):
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
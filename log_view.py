@@ -0,0 +1,100 @@
+#log_view.py
+import os
+import threading
+from collections import deque
+
+import tkinter as tk
+
+from config import CONFIG
+
+
+class LogBuffer:
+    """Ring buffer of log lines with an optional spill file for the full log.
+
+    Only the last `max_lines` lines are kept in memory. Lines that have not
+    been shown yet are collected separately so a view can pick them up in
+    one batch with drain().
+    """
+
+    def __init__(self, max_lines=None, spill_path=None):
+        settings = CONFIG.get("gui_log", {})
+        self.max_lines = max_lines or settings.get("max_lines", 2000)
+        self.spill_path = spill_path if spill_path is not None else settings.get("spill_path")
+        self._lines = deque(maxlen=self.max_lines)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._spill = None
+
+    def append(self, line):
+        with self._lock:
+            self._lines.append(line)
+            self._pending.append(line)
+            if self.spill_path:
+                self._spill_line(line)
+
+    def drain(self):
+        """Return the lines added since the last drain"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def lines(self):
+        with self._lock:
+            return list(self._lines)
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
+            self._pending = []
+
+    def close(self):
+        with self._lock:
+            if self._spill:
+                self._spill.close()
+                self._spill = None
+
+    def _spill_line(self, line):
+        if self._spill is None:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            self._spill = open(self.spill_path, "a", encoding="utf-8", buffering=1)
+        self._spill.write(line + "\n")
+
+
+class LogView:
+    """Feeds a LogBuffer into Text widgets in batches.
+
+    write() only records the line and arms a single after() timer; when it
+    fires, everything written meanwhile is inserted with one insert() per
+    widget, old lines beyond the cap are trimmed and the view scrolls once.
+    Call write() from the Tk thread.
+    """
+
+    def __init__(self, root, widgets, buffer=None, flush_ms=None):
+        self.root = root
+        self.widgets = list(widgets)
+        self.buffer = buffer or LogBuffer()
+        self.flush_ms = flush_ms or CONFIG.get("gui_log", {}).get("flush_ms", 100)
+        self._scheduled = None
+
+    def write(self, line):
+        self.buffer.append(line)
+        if self._scheduled is None:
+            self._scheduled = self.root.after(self.flush_ms, self.flush)
+
+    def flush(self):
+        self._scheduled = None
+        lines = self.buffer.drain()
+        if not lines:
+            return
+        text = "\n".join(lines) + "\n"
+        for widget in self.widgets:
+            widget.insert(tk.END, text)
+            self._trim(widget)
+            widget.see(tk.END)
+
+    def _trim(self, widget):
+        # The Text widget always ends with an empty line after the last newline
+        line_count = int(widget.index("end-1c").split(".")[0]) - 1
+        excess = line_count - self.buffer.max_lines
+        if excess > 0:
+            widget.delete("1.0", f"{excess + 1}.0")
@@ -1,29 +1,63 @@
 import re
 import json
 
+# Required keys (and their types) for each action the automation understands
+# Fields each action needs and their types; a field listed in OPTIONAL_FIELDS
+# may be left out, since action_steps fills in a default for it
+ACTION_SCHEMAS = {
+    "search_car": {"query": str},
+    "fill_booking_form": {"form_data": dict},
+    "submit_booking": {},
+    "reset_form": {},
+    "navigate_to_section": {"section": str},
+    "test_contact_links": {},
+    "check_pricing": {"car_type": str},
+    "validate_empty_form": {},
+    "check_car_details": {"car_type": str},
+    "run_plan": {"steps": list},  # Several of the actions above, run in order on one page
+}
+
+OPTIONAL_FIELDS = {"form_data", "section", "car_type"}
+
+# Longest plan accepted from the model
+MAX_PLAN_STEPS = 10
+
 def parse_response(response):
     """
     Parse Ollama response and extract the most relevant JSON based on context
     """
     try:
-        # Find all JSON objects in the response
-        json_objects = extract_all_json_objects(response)
+        # Find all JSON objects in the response, with their positions
+        matches = extract_json_objects_with_offsets(response)
         
-        if not json_objects:
+        # An ordered plan ({"plan": [...]} or a bare list of actions) wins over single objects
+        plans = ([match for match in matches if _plan_steps(match[0]) is not None]
+                 or extract_json_lists_with_offsets(response))
+        if plans:
+            obj, _, _ = plans[-1]
+            plan = compile_plan(_plan_steps(obj) if isinstance(obj, dict) else obj)
+            if plan is not None:
+                return plan
+            # Fall back to the single objects outside every plan; running some steps of a plan is never right
+            print("Plan rejected, a step is not a valid action")
+            matches = [match for match in matches
+                       if not any(start <= match[1] and match[2] <= end for _, start, end in plans)]
+        
+        if not matches:
             print("No JSON objects found in response")
             return None
         
-        print(f"🔍 Found {len(json_objects)} JSON objects")
-        for i, obj in enumerate(json_objects):
-            print(f"  {i+1}: {obj}")
+        print(f"🔍 Found {len(matches)} JSON objects")
+        for i, (obj, start, _) in enumerate(matches):
+            print(f"  {i+1} @ {start}: {obj}")
         
         # If only one JSON object, return it
-        if len(json_objects) == 1:
-            return json_objects[0]
+        if len(matches) == 1:
+            return matches[0][0]
         
         # Multiple JSON objects - pick the most relevant one
         # Look for context clues in the response text
-        best_json = select_best_json(response, json_objects)
+        best_json = select_best_json(response, matches)
         
         return best_json
         
@@ -31,81 +65,130 @@ def parse_response(response):
         print(" JSON extraction error:", e)
         return None
 
+_decoder = json.JSONDecoder()
+# An object can only start with '{' followed by a key or the closing brace
+_OBJECT_START = re.compile(r'\{\s*["}]')
+# A list can only hold a plan if its first element is an object
+_LIST_START = re.compile(r'\[\s*\{')
+_CLOSERS = {"}": "{", "]": "["}
+_BRACKET_RE = re.compile(r'[{}\[\]"]')
+# The rest of a JSON string after its opening quote, escapes included
+_STRING_REST_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+def extract_json_objects_with_offsets(text):
+    """Extract all valid top-level JSON objects as (object, start, end) tuples.
+
+    One pass over the text pairs up brackets (skipping brackets inside
+    JSON strings); only balanced spans are handed to the decoder, and each
+    on its own, so a malformed candidate costs its own length rather than
+    the length of everything before it.
+    """
+    return [(obj, start, end) for obj, start, end in _decode_spans(text, "{", _OBJECT_START)
+            if isinstance(obj, dict)]
+
+def extract_json_lists_with_offsets(text):
+    """Extract top-level JSON lists of objects (e.g. a plan written as a bare list) as (list, start, end)"""
+    return [(obj, start, end) for obj, start, end in _decode_spans(text, "[", _LIST_START)
+            if all(isinstance(item, dict) for item in obj)]
+
+def extract_json_lists(text):
+    return [obj for obj, _, _ in extract_json_lists_with_offsets(text)]
+
+def _decode_spans(text, opener, start_pattern):
+    """Decode the outermost balanced spans opened by `opener`; a span that is
+    not valid JSON is skipped so the spans nested in it still get a chance"""
+    decoded = []
+    covered_until = 0
+    for start, end in _balanced_spans(text, opener):
+        if start < covered_until or not start_pattern.match(text, start):
+            continue
+        try:
+            obj = _decoder.decode(text[start:end])
+        except json.JSONDecodeError:
+            continue
+        decoded.append((obj, start, end))
+        covered_until = end
+    return decoded
+
+def _balanced_spans(text, opener):
+    """(start, end) of every bracket pair whose opening bracket is `opener`, sorted by start.
+
+    Quotes only count inside brackets, so apostrophes and quotes in the
+    surrounding prose do not confuse the scan. A closing bracket that does
+    not match drops every bracket still open.
+    """
+    spans = []
+    stack = []
+    pos = 0
+    while True:
+        match = _BRACKET_RE.search(text, pos)
+        if match is None:
+            break
+        char, pos = match.group(), match.end()
+        if char == '"':
+            if stack:
+                string_end = _STRING_REST_RE.match(text, pos)
+                if string_end is None:
+                    break  # Unterminated string: nothing after it can close a bracket
+                pos = string_end.end()
+        elif char in "{[":
+            stack.append((char, match.start()))
+        elif stack and stack[-1][0] == _CLOSERS[char]:
+            bracket, start = stack.pop()
+            if bracket == opener:
+                spans.append((start, pos))
+        else:
+            stack.clear()
+    spans.sort()
+    return spans
+
 def extract_all_json_objects(text):
     """Extract all valid JSON objects from text"""
-    json_objects = []
-    
-    # Find all potential JSON objects with proper brace matching
-    i = 0
-    while i < len(text):
-        if text[i] == '{':
-            # Found start of JSON object
-            brace_count = 0
-            start = i
-            
-            # Find matching closing brace
-            while i < len(text):
-                if text[i] == '{':
-                    brace_count += 1
-                elif text[i] == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        # Found complete JSON object
-                        json_str = text[start:i+1]
-                        try:
-                            parsed = json.loads(json_str)
-                            json_objects.append(parsed)
-                        except json.JSONDecodeError:
-                            pass  # Skip invalid JSON
-                        break
-                i += 1
-        else:
-            i += 1
-    
-    return json_objects
+    return [obj for obj, _, _ in extract_json_objects_with_offsets(text)]
+
+def select_best_json(response_text, matches):
+    """Select the most appropriate JSON object based on context.
 
-def select_best_json(response_text, json_objects):
-    """Select the most appropriate JSON object based on context"""
+    `matches` are (object, start, end) tuples from
+    extract_json_objects_with_offsets, so the text preceding each object
+    is known without searching for it again.
+    """
     
     # Look for context indicators in the response text
     response_lower = response_text.lower()
+    second_half = len(response_text) * 0.5
     
     # Score each JSON object
     scored_objects = []
     
-    for json_obj in json_objects:
+    for json_obj, json_position, _ in matches:
         score = 0
         action = json_obj.get('action', '')
         
-        # Check if this JSON appears after relevant context keywords
-        json_str = json.dumps(json_obj)
-        json_position = response_text.find(json_str)
+        # Look at text before this JSON object
+        preceding_text = response_lower[:json_position]
+        
+        # Score based on preceding context
+        if action == 'fill_booking_form':
+            if any(phrase in preceding_text for phrase in ['filling booking', 'booking form', 'for filling']):
+                score += 10
+            # Check if it's the last occurrence (usually the actual response)
+            if json_position > second_half:  # Second half of response
+                score += 5
         
-        if json_position > -1:
-            # Look at text before this JSON object
-            preceding_text = response_text[:json_position].lower()
-            
-            # Score based on preceding context
-            if action == 'fill_booking_form':
-                if any(phrase in preceding_text for phrase in ['filling booking', 'booking form', 'for filling']):
-                    score += 10
-                # Check if it's the last occurrence (usually the actual response)
-                if json_position > len(response_text) * 0.5:  # Second half of response
-                    score += 5
-            
-            elif action == 'search_car':
-                if any(phrase in preceding_text for phrase in ['searching cars', 'search car', 'for searching']):
-                    score += 10
-                if json_position > len(response_text) * 0.5:
-                    score += 5
-            
-            # Penalize if it appears in example context
-            if any(phrase in preceding_text for phrase in ['example', 'format', 'use only']):
-                score -= 5
+        elif action == 'search_car':
+            if any(phrase in preceding_text for phrase in ['searching cars', 'search car', 'for searching']):
+                score += 10
+            if json_position > second_half:
+                score += 5
+        
+        # Penalize if it appears in example context
+        if any(phrase in preceding_text for phrase in ['example', 'format', 'use only']):
+            score -= 5
         
         scored_objects.append((score, json_obj))
     
-    # Sort by score and return best match
+    # Sort by score and return best match (ties keep their original order)
     scored_objects.sort(key=lambda x: x[0], reverse=True)
     
     print(f" JSON scoring results:")
@@ -113,3 +196,112 @@ def select_best_json(response_text, json_objects):
         print(f"  Score {score}: {obj}")
     
     return scored_objects[0][1]  # Return highest scored JSON
+
+def validate_instruction(instruction):
+    """Check that an object is a known action with its required fields, and that the fields it has are well typed"""
+    if not isinstance(instruction, dict):
+        return False
+    schema = ACTION_SCHEMAS.get(instruction.get("action"))
+    if schema is None:
+        return False
+    if not all(isinstance(instruction[key], kind) if key in instruction else key in OPTIONAL_FIELDS
+               for key, kind in schema.items()):
+        return False
+    return instruction["action"] != "run_plan" or validate_plan(instruction["steps"])
+
+def validate_plan(steps):
+    """A plan is 1..MAX_PLAN_STEPS valid actions, none of them a plan itself"""
+    if not isinstance(steps, list) or not 0 < len(steps) <= MAX_PLAN_STEPS:
+        return False
+    return all(validate_instruction(step) and step["action"] != "run_plan" for step in steps)
+
+def compile_plan(steps):
+    """Turn a list of actions into a run_plan instruction.
+
+    A one-step plan is returned as that single action; an invalid plan
+    gives None, since running only part of it could leave the site in a
+    state the user did not ask for.
+    """
+    if not validate_plan(steps):
+        return None
+    if len(steps) == 1:
+        return steps[0]
+    return {"action": "run_plan", "steps": steps}
+
+def _plan_steps(obj):
+    """The steps of a {"plan": [...]} or {"action": "run_plan", "steps": [...]} object, else None"""
+    if isinstance(obj.get("plan"), list):
+        return obj["plan"]
+    if obj.get("action") == "run_plan":
+        return obj.get("steps")
+    return None
+
+class StreamingActionExtractor:
+    """Finds the first complete, schema-valid action object or plan in a token stream.
+
+    Feed tokens as they arrive; feed() returns the instruction as soon as
+    the closing brace of a valid action object (or the closing bracket of
+    a plan list) has been seen, so the caller can stop generation instead
+    of waiting for the model to finish. Objects inside a list are not
+    candidates on their own, so a plan is never cut after its first step.
+    Braces and brackets inside JSON strings are ignored.
+    """
+
+    def __init__(self):
+        self.buffer = []
+        self.result = None
+        self._text_length = 0
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, token):
+        if self.result is not None:
+            return self.result
+
+        offset = self._text_length
+        self.buffer.append(token)
+        self._text_length += len(token)
+
+        for i, char in enumerate(token, start=offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._depth:
+                    self._in_string = True
+            elif char in '{[':
+                if self._depth == 0:
+                    self._start = i
+                self._depth += 1
+            elif char in '}]' and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = self._candidate(self._start, i + 1)
+                    if candidate is not None:
+                        self.result = candidate
+                        return candidate
+        return None
+
+    @property
+    def text(self):
+        return "".join(self.buffer)
+
+    def _candidate(self, start, end):
+        try:
+            obj = json.loads(self.text[start:end])
+        except json.JSONDecodeError:
+            return None
+        if isinstance(obj, list):
+            return compile_plan(obj)
+        if not isinstance(obj, dict):
+            return None
+        steps = _plan_steps(obj)
+        if steps is not None:
+            return compile_plan(steps)
+        return obj if validate_instruction(obj) else None
@@ -1,292 +1,168 @@
-from playwright.sync_api import sync_playwright
-import base64
-from io import BytesIO
-from PIL import Image
-import os
 from datetime import datetime
 
-def perform_action (instruction):
-    """Enhanced perform_action that captures and returns screenshots"""
-    action = instruction.get("action")
-    query = instruction.get("query")
-    screenshots = []
+from action_steps import action_steps, plan_step_failed, plan_step_line
+from artifact_store import get_artifact_store
+from browser_pool import get_browser_pool
+from config import CONFIG
+from launch_profiles import blocking_rules
+from screenshot_pipeline import ScreenshotOptions, ScreenshotRecorder, process_screenshot
+from tracing import span
+from wait_strategies import (
+    WaitRecorder, get_wait_until, wait_for_page_ready, wait_for_new_page,
+    go_to_section, scroll_into_view, click_and_capture_dialog, wait_for_form_cleared,
+)
+from warm_pages import page_profile
+
+BASE_URL = "https://automationdemo.vercel.app/"
+
+def site_url():
+    """URL of the site under test; CONFIG["base_url"] can point at a local copy"""
+    return CONFIG.get("base_url") or BASE_URL
+
+def perform_action (instruction, on_event=None):
+    """Enhanced perform_action that captures and returns screenshots.
+
+    on_event(stage, message), if given, is called from the browser thread
+    as the action makes progress ("page_ready", "screenshot").
+    """
+    with span("perform_action", action=instruction.get("action")):
+        # Warm pages were opened with this action's load state and blocking rules
+        rules = blocking_rules(instruction, ScreenshotOptions.for_instruction(instruction))
+        profile = page_profile(get_wait_until(instruction), rules)
+        return get_browser_pool().run_warm(_perform_action_on_page, instruction, on_event, profile=profile)
+
+def is_error_result(result_message):
+    """perform_action reports a failed action as an "Error: ..." message rather than raising"""
+    return (result_message or "").startswith("Error:")
+
+def open_site(context, wait_until=None, waits=None, blocker=None):
+    """Open the demo site in a new page of the given context; a ResourceBlocker is installed before goto"""
+    wait_until = wait_until or get_wait_until()
+    waits = waits if waits is not None else WaitRecorder()
+    page = context.new_page()
+    if blocker is not None:
+        blocker.install(page)
+    with span("page.goto", url=site_url(), wait_until=wait_until):
+        page.goto(site_url(), wait_until=wait_until)
+    
+    # Wait until the page is actually usable instead of sleeping
+    wait_for_page_ready(page, wait_until, waits)
+    
+    return page
+
+def _perform_action_on_page(page, instruction, on_event=None):
+    """Run one instruction on a warm page of a pooled browser (already on the site)"""
+    on_capture = (lambda shot: on_event("screenshot", shot.description)) if on_event else None
+    screenshots = ScreenshotRecorder(ScreenshotOptions.for_instruction(instruction), on_capture)
     result_message = ""
+    waits = WaitRecorder()
+    if on_event:
+        on_event("page_ready", "Site loaded")
+    
+    # Take initial screenshot
+    screenshots.capture(page, "Initial page load", kind="initial")
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
-        page.goto("https://automationdemo.vercel.app/")
+    try:
+        result_message = execute_instruction(page, instruction, screenshots, waits)
         
-        # Wait for page to load
-        page.wait_for_timeout(2000)
+    except Exception as e:
+        screenshots.capture(page, f"Error occurred: {str(e)}", kind="error")
+        result_message = f"Error: {str(e)}"
         
-        # Take initial screenshot
-        initial_screenshot = capture_screenshot(page, "Initial page load")
-        screenshots.append(initial_screenshot)
+    finally:
+        # Take final screenshot
+        screenshots.capture_fallback(page, "Final state")
         
-        try:
-            if action == "search_car":
-                # Test search bar functionality
-                search_input = page.locator('form.search-bar input[name="search"]')
-                search_button = page.locator('form.search-bar button')
-                
-                # Fill search input
-                search_input.fill(query)
-                page.wait_for_timeout(500)
-                
-                # Take screenshot before search
-                before_search = capture_screenshot(page, f"Before searching for '{query}'")
-                screenshots.append(before_search)
-                
-                # Listen for new page opening
-                with page.context.expect_page() as new_page_info:
-                    search_button.click()
-                new_page = new_page_info.value
-                
-                # Take screenshot of search results
-                new_page.wait_for_timeout(2000)
-                search_result = capture_screenshot(new_page, f"Search results for '{query}'")
-                screenshots.append(search_result)
-                
-                result_message = f"Search completed for '{query}'. New page: {new_page.url}"
-                new_page.close()
-                
-            elif action == "fill_booking_form":
-                # Navigate to booking section
-                page.locator('a[href="#booking"]').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot of empty form
-                empty_form = capture_screenshot(page, "Empty booking form")
-                screenshots.append(empty_form)
-                
-                # Fill form with provided data
-                form_data = instruction.get("form_data", {})
-                page.locator('#fn').fill(form_data.get("name", "John Doe"))
-                page.locator('#email').fill(form_data.get("email", "john@example.com"))
-                page.locator('input[name="start"]').fill(form_data.get("start_date", "2025-08-01"))
-                page.locator('input[name="end"]').fill(form_data.get("end_date", "2025-08-07"))
-                page.locator('#type').select_option(form_data.get("car_type", "SUV"))
-                
-                if form_data.get("cdw", True):
-                    page.locator('#cdw').check()
-                if form_data.get("terms", True):
-                    page.locator('#term1').check()
-                
-                page.wait_for_timeout(500)
-                
-                # Take screenshot of filled form
-                filled_form = capture_screenshot(page, "Filled booking form")
-                screenshots.append(filled_form)
-                
-                result_message = "Booking form filled successfully"
-                
-            elif action == "submit_booking":
-                # Navigate to booking section
-                page.locator('a[href="#booking"]').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot before submit
-                before_submit = capture_screenshot(page, "Before submitting booking")
-                screenshots.append(before_submit)
-                
-                with page.context.expect_page() as new_page_info:
-                    page.locator('#submit').click()
-                new_page = new_page_info.value
-                
-                # Take screenshot of submission result
-                new_page.wait_for_timeout(2000)
-                submit_result = capture_screenshot(new_page, "Booking submission result")
-                screenshots.append(submit_result)
-                
-                result_message = f"Booking submitted. Redirect page: {new_page.url}"
-                new_page.close()
-                
-            elif action == "reset_form":
-                # Navigate to booking section
-                page.locator('a[href="#booking"]').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot before reset
-                before_reset = capture_screenshot(page, "Before form reset")
-                screenshots.append(before_reset)
-                
-                page.locator('#reset').click()
-                page.wait_for_timeout(500)
-                
-                # Take screenshot after reset
-                after_reset = capture_screenshot(page, "After form reset")
-                screenshots.append(after_reset)
-                
-                result_message = "Form reset completed"
-                
-            elif action == "navigate_to_section":
-                section = instruction.get("section", "#home")
-                
-                # Take screenshot before navigation
-                before_nav = capture_screenshot(page, f"Before navigating to {section}")
-                screenshots.append(before_nav)
-                
-                page.locator(f'a[href="{section}"]').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot after navigation
-                after_nav = capture_screenshot(page, f"After navigating to {section}")
-                screenshots.append(after_nav)
-                
-                result_message = f"Navigated to section: {section}"
-                
-            elif action == "test_contact_links":
-                # Scroll to contact section
-                page.locator('#contact').scroll_into_view_if_needed()
-                page.wait_for_timeout(500)
-                
-                # Take screenshot of contact section
-                contact_section = capture_screenshot(page, "Contact section")
-                screenshots.append(contact_section)
-                
-                dialog_message = ""
-                def handle_dialog(dialog):
-                    nonlocal dialog_message
-                    dialog_message = dialog.message
-                    dialog.accept()
-                
-                page.on('dialog', handle_dialog)
-                page.locator('.footer-section a').first.click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot after dialog
-                after_dialog = capture_screenshot(page, "After contact dialog")
-                screenshots.append(after_dialog)
-                
-                result_message = f"Contact link tested. Dialog: {dialog_message}"
-                
-            elif action == "check_pricing":
-                # Navigate to pricing section
-                page.locator('a[href="#price"]').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot of pricing table
-                pricing_table = capture_screenshot(page, "Pricing table")
-                screenshots.append(pricing_table)
-                
-                car_type = instruction.get("car_type", "SUV")
-                rows = page.locator('tbody tr')
-                
-                price_per_day = ""
-                if car_type == "SUV":
-                    price_per_day = rows.nth(0).locator('td').nth(1).text_content()
-                elif car_type == "VAN":
-                    price_per_day = rows.nth(1).locator('td').nth(1).text_content()
-                elif car_type == "Luxury":
-                    price_per_day = rows.nth(2).locator('td').nth(1).text_content()
-                
-                result_message = f"{car_type} price per day: {price_per_day}"
-                
-            elif action == "validate_empty_form":
-                # Navigate to booking section
-                page.locator('a[href="#booking"]').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot of empty form
-                empty_form = capture_screenshot(page, "Empty form for validation")
-                screenshots.append(empty_form)
-                
-                validation_message = ""
-                def handle_dialog(dialog):
-                    nonlocal validation_message
-                    validation_message = dialog.message
-                    dialog.accept()
-                
-                page.on('dialog', handle_dialog)
-                page.locator('#submit').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot after validation
-                after_validation = capture_screenshot(page, "After validation attempt")
-                screenshots.append(after_validation)
-                
-                result_message = f"Empty form validation tested. Message: {validation_message}"
-                
-            elif action == "check_car_details":
-                # Navigate to cars section
-                page.locator('a[href="#cars"]').click()
-                page.wait_for_timeout(1000)
-                
-                # Take screenshot of cars section
-                cars_section = capture_screenshot(page, "Cars section")
-                screenshots.append(cars_section)
-                
-                car_type = instruction.get("car_type", "SUV")
-                car_items = page.locator('.car-item')
-                
-                car_name = ""
-                if car_type == "SUV":
-                    car_name = car_items.nth(0).locator('p').text_content()
-                elif car_type == "VAN":
-                    car_name = car_items.nth(1).locator('p').text_content()
-                elif car_type == "Luxury":
-                    car_name = car_items.nth(2).locator('p').text_content()
-                
-                result_message = f"Car type: {car_name}"
-                
-            else:
-                result_message = f"Unsupported action: {action}"
-                
-        except Exception as e:
-            error_screenshot = capture_screenshot(page, f"Error occurred: {str(e)}")
-            screenshots.append(error_screenshot)
-            result_message = f"Error: {str(e)}"
-            
-        finally:
-            # Take final screenshot
-            final_screenshot = capture_screenshot(page, "Final state")
-            screenshots.append(final_screenshot)
-            
-            browser.close()
-    
-    # Return the most relevant screenshot (usually the last meaningful one)
-    main_screenshot = screenshots[-2] if len(screenshots) > 1 else screenshots[0] if screenshots else None
+        print(f"⏱️ {instruction.get('action')}: {waits.summary()}")
+
+    # Return the most relevant screenshot; only this one gets resized and encoded
+    main_screenshot = screenshots.main_image()
     
     return result_message, main_screenshot
 
+def execute_instruction(page, instruction, screenshots, waits=None):
+    """Run one instruction against an already opened page.
+
+    Screenshots go through the `screenshots` ScreenshotRecorder (which
+    decides what the capture policy keeps) and time spent waiting is
+    recorded in `waits`; errors are raised to the caller. The steps of
+    each action come from action_steps, shared with async_actions.
+    """
+    waits = waits if waits is not None else WaitRecorder()
+    
+    if instruction.get("action") == "run_plan":
+        # Every step runs on this page, so later steps see the state earlier ones left
+        results = []
+        for index, step in enumerate(instruction["steps"], start=1):
+            try:
+                step_result = execute_instruction(page, step, screenshots, waits)
+            except Exception as e:
+                raise plan_step_failed(index, step, e) from e
+            results.append(plan_step_line(index, step, step_result))
+        return "\n".join(results)
+    
+    steps, message = action_steps(instruction)
+    wait_until = get_wait_until(instruction)
+    values = {}
+    for step in steps:
+        with span(f"step.{step[0]}", args=step[1:]):
+            values.update(_run_step(page, step, screenshots, waits, wait_until) or {})
+    return message(values)
+
+def _run_step(page, step, screenshots, waits, wait_until):
+    """Run one (op, *args) step; returns the values it read from the page, if any"""
+    op, args = step[0], step[1:]
+    if op == "section":
+        go_to_section(page, args[0], waits)
+    elif op == "scroll":
+        scroll_into_view(page, args[0], waits)
+    elif op == "capture":
+        screenshots.capture(page, *args)
+    elif op == "fill":
+        page.locator(args[0]).fill(args[1])
+    elif op == "select":
+        page.locator(args[0]).select_option(args[1])
+    elif op == "check":
+        page.locator(args[0]).check()
+    elif op == "click":
+        page.locator(args[0]).click()
+    elif op == "form_cleared":
+        wait_for_form_cleared(page, waits)
+    elif op == "dialog":
+        return {args[1]: click_and_capture_dialog(page, page.locator(args[0]), waits)}
+    elif op == "text":
+        return {args[1]: page.locator(args[0]).text_content()}
+    elif op == "popup":
+        selector, description, name = args
+        with page.context.expect_page() as new_page_info:
+            page.locator(selector).click()
+        new_page = new_page_info.value
+        wait_for_new_page(new_page, wait_until, waits)
+        screenshots.capture(new_page, description, kind="result")
+        url = new_page.url
+        new_page.close()
+        return {name: url}
+    else:
+        raise ValueError(f"Unknown step: {op}")
+
 def capture_screenshot(page, description="Screenshot"):
-    """Capture screenshot and return as base64 encoded image"""
+    """Capture a full-page screenshot and return it resized and encoded"""
     try:
         # Take screenshot as bytes
         screenshot_bytes = page.screenshot(full_page=True)
-        
-        # Convert to PIL Image
-        image = Image.open(BytesIO(screenshot_bytes))
-        
-        # Resize if too large (optional)
-        if image.width > 1200:
-            ratio = 1200 / image.width
-            new_height = int(image.height * ratio)
-            image = image.resize((1200, new_height), Image.Resampling.LANCZOS)
-        
-        # Convert back to bytes
-        img_buffer = BytesIO()
-        image.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        return img_buffer.getvalue()
+        return process_screenshot(screenshot_bytes)
         
     except Exception as e:
         print(f"Error capturing screenshot: {e}")
         return None
 
-def save_screenshot_to_file(screenshot_bytes, filename):
-    """Save screenshot to file (optional)"""
+def save_screenshot_to_file(screenshot_bytes, filename, run_id=None):
+    """Save screenshot into the artifact store and return its blob path (optional)"""
     try:
-        os.makedirs("screenshots", exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = f"screenshots/{timestamp}_{filename}.png"
-        
-        with open(filepath, "wb") as f:
-            f.write(screenshot_bytes)
-        
-        return filepath
+        run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        store = get_artifact_store()
+        digest = store.put(screenshot_bytes, run_id, filename)
+        return store.path(digest)
     except Exception as e:
         print(f"Error saving screenshot: {e}")
         return None
\ No newline at end of file
@@ -0,0 +1,139 @@
+#prompt_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import CONFIG
+
+
+def normalize_prompt(prompt):
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    prompt = re.sub(r"\s+", " ", prompt.strip().lower())
+    return prompt.rstrip(".!? ")
+
+
+class PromptCache:
+    """Two-tier cache from natural language prompt to parsed instruction.
+
+    Entries are keyed on the normalized prompt, the model name and the
+    system prompt version, so changing either invalidates old answers.
+    The in-memory tier is an LRU; the on-disk tier is a SQLite table
+    that survives restarts and is shared by gui.py, app.py and entry.py.
+    """
+
+    def __init__(self, path=None, memory_size=None, disk_size=None, ttl=None):
+        settings = CONFIG.get("prompt_cache", {})
+        self.path = path or settings.get("path", "cache/prompt_cache.sqlite3")
+        self.memory_size = memory_size or settings.get("memory_size", 256)
+        self.disk_size = disk_size or settings.get("disk_size", 5000)
+        self.ttl = ttl if ttl is not None else settings.get("ttl_seconds", 7 * 24 * 3600)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS prompt_cache (
+                key TEXT PRIMARY KEY,
+                instruction TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_prompt_cache_last_used ON prompt_cache(last_used)")
+        self._db.commit()
+
+    @staticmethod
+    def make_key(prompt, model, version):
+        raw = f"{model}\0{version}\0{normalize_prompt(prompt)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, prompt, model, version):
+        """Return a copy of the cached instruction, or None on a miss"""
+        key = self.make_key(prompt, model, version)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return json.loads(entry[0])
+            self._memory.pop(key, None)
+
+            row = self._db.execute(
+                "SELECT instruction, created_at FROM prompt_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._db.execute("DELETE FROM prompt_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                self.stats["misses"] += 1
+                return None
+
+            self._db.execute("UPDATE prompt_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self._remember(key, row[0], row[1])
+            self.stats["disk_hits"] += 1
+            return json.loads(row[0])
+
+    def put(self, prompt, model, version, instruction):
+        key = self.make_key(prompt, model, version)
+        now = time.time()
+        serialized = json.dumps(instruction, sort_keys=True)
+        with self._lock:
+            self._remember(key, serialized, now)
+            self._db.execute(
+                "INSERT OR REPLACE INTO prompt_cache (key, instruction, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, serialized, now, now),
+            )
+            self._evict_disk(now)
+            self._db.commit()
+            self.stats["writes"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._db.execute("DELETE FROM prompt_cache")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _expired(self, created_at, now):
+        return bool(self.ttl) and now - created_at > self.ttl
+
+    def _remember(self, key, serialized, created_at):
+        self._memory[key] = (serialized, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        if self.ttl:
+            self._db.execute("DELETE FROM prompt_cache WHERE created_at < ?", (now - self.ttl,))
+        self._db.execute(
+            """DELETE FROM prompt_cache WHERE key IN (
+                SELECT key FROM prompt_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.disk_size,),
+        )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prompt_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PromptCache()
+        return _cache
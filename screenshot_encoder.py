@@ -0,0 +1,56 @@
+#screenshot_encoder.py
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import CONFIG
+from screenshot_pipeline import process_screenshot
+
+
+class ScreenshotEncoder:
+    """Resizes and encodes screenshots away from the thread driving the browser.
+
+    submit() hands raw page.screenshot() bytes to a thread or process pool
+    and returns a Future for the processed image. At most `max_pending`
+    images can be queued or in flight; further submits block until one
+    finishes, which caps memory under bursty load.
+    """
+
+    def __init__(self, workers=None, max_pending=None, kind=None):
+        settings = CONFIG.get("screenshot_encoder", {})
+        self.workers = workers or settings.get("workers", 2)
+        self.max_pending = max_pending or settings.get("max_pending", 8)
+        self.kind = kind or settings.get("kind", "thread")
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="screenshot-encoder")
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, raw_bytes, max_width=1200, image_format="png", quality=80):
+        """Queue one image; blocks while max_pending images are already queued"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(process_screenshot, raw_bytes, max_width, image_format, quality)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_screenshot_encoder():
+    """Return the shared encoder, creating it on first use"""
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            _encoder = ScreenshotEncoder()
+            atexit.register(_encoder.shutdown)
+        return _encoder
@@ -0,0 +1,202 @@
+#screenshot_pipeline.py
+from io import BytesIO
+
+from PIL import Image
+
+from config import CONFIG
+from tracing import span
+
+# Which captures are taken under each policy. "result" is the capture an
+# action returns (search results, filled form, ...), "error" is taken when
+# an action fails; everything else is an intermediate "step" or the
+# "initial"/"final" page state.
+CAPTURE_KINDS = {
+    "none": set(),
+    "final": {"result", "error"},
+    "key": {"result", "error", "final"},
+    "all": {"initial", "step", "result", "error", "final"},
+}
+
+FORMATS = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP"}
+
+
+class ScreenshotOptions:
+    """Capture policy and encoding settings, from CONFIG["screenshots"] plus overrides"""
+
+    def __init__(self, **overrides):
+        settings = dict(CONFIG.get("screenshots", {}))
+        settings.update({k: v for k, v in overrides.items() if v is not None})
+        self.capture = settings.get("capture", "final")
+        self.format = settings.get("format", "png").lower()
+        self.quality = settings.get("quality", 80)
+        self.full_page = settings.get("full_page", True)
+        self.max_width = settings.get("max_width", 1200)
+        self.clip_selector = settings.get("clip_selector")
+        self.background_encode = settings.get("background_encode", True)
+        if self.capture not in CAPTURE_KINDS:
+            raise ValueError(f"Unknown screenshot capture policy: {self.capture}")
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown screenshot format: {self.format}")
+
+    @classmethod
+    def for_instruction(cls, instruction):
+        """Instructions may carry their own {"screenshots": {...}} overrides"""
+        return cls(**(instruction or {}).get("screenshots", {}))
+
+    def wants(self, kind):
+        return kind in CAPTURE_KINDS[self.capture]
+
+
+class LazyScreenshot:
+    """Raw screenshot bytes; resizing and encoding only happen on first access.
+
+    With background encoding the work is started on the shared
+    ScreenshotEncoder right after capture, so it overlaps with whatever
+    the browser does next, and encode() just waits for the result.
+    """
+
+    def __init__(self, raw_bytes, description, kind, options):
+        self.raw_bytes = raw_bytes
+        self.description = description
+        self.kind = kind
+        self.options = options
+        self._encoded = None
+        self._future = None
+
+    def start_encoding(self):
+        if self._future is None and self._encoded is None:
+            from screenshot_encoder import get_screenshot_encoder
+            self._future = get_screenshot_encoder().submit(
+                self.raw_bytes, self.options.max_width, self.options.format, self.options.quality
+            )
+        return self._future
+
+    def encode(self):
+        if self._encoded is None:
+            with span("screenshot.encode", format=self.options.format, bytes_in=len(self.raw_bytes),
+                      background=self._future is not None) as trace:
+                if self._future is not None:
+                    self._encoded = self._future.result()
+                else:
+                    self._encoded = process_screenshot(
+                        self.raw_bytes, self.options.max_width, self.options.format, self.options.quality
+                    )
+                trace.set(bytes_out=len(self._encoded or b""))
+        return self._encoded
+
+
+class ScreenshotRecorder:
+    """Collects the screenshots of one action according to the capture policy"""
+
+    def __init__(self, options=None, on_capture=None):
+        self.options = options or ScreenshotOptions()
+        self.on_capture = on_capture  # Called with each LazyScreenshot, e.g. for progress reporting
+        self.shots = []
+
+    def capture(self, page, description="Screenshot", kind="step"):
+        """Take a screenshot if the policy wants this kind; returns the LazyScreenshot or None"""
+        if not self.options.wants(kind):
+            return None
+        with span("screenshot.capture", kind=kind, description=description) as trace:
+            raw_bytes = take_raw_screenshot(page, self.options)
+            trace.set(bytes=len(raw_bytes or b""))
+        return self.add(raw_bytes, description, kind)
+
+    async def capture_async(self, page, description="Screenshot", kind="step"):
+        """capture() for an async_api page"""
+        if not self.options.wants(kind):
+            return None
+        with span("screenshot.capture", kind=kind, description=description) as trace:
+            raw_bytes = await take_raw_screenshot_async(page, self.options)
+            trace.set(bytes=len(raw_bytes or b""))
+        return self.add(raw_bytes, description, kind)
+
+    def add(self, raw_bytes, description, kind):
+        """Keep bytes taken by capture()/capture_async(); returns the LazyScreenshot or None"""
+        if raw_bytes is None:
+            return None
+        shot = LazyScreenshot(raw_bytes, description, kind, self.options)
+        if self.options.background_encode:
+            shot.start_encoding()
+        self.shots.append(shot)
+        if self.on_capture:
+            self.on_capture(shot)
+        return shot
+
+    def capture_fallback(self, page, description="Final state"):
+        """Under the "final" policy, make sure an action without a result capture still returns an image"""
+        return self.capture(page, description, kind=self.fallback_kind())
+
+    async def capture_fallback_async(self, page, description="Final state"):
+        return await self.capture_async(page, description, kind=self.fallback_kind())
+
+    def fallback_kind(self):
+        return "result" if self.options.capture == "final" and not self.shots else "final"
+
+    def main_shot(self):
+        """The screenshot an action returns: its last result/error capture, else the last capture"""
+        for shot in reversed(self.shots):
+            if shot.kind in ("result", "error"):
+                return shot
+        return self.shots[-1] if self.shots else None
+
+    def main_image(self):
+        """Encoded bytes of main_shot(); the only image that gets encoded for a normal action"""
+        shot = self.main_shot()
+        return shot.encode() if shot else None
+
+
+def take_raw_screenshot(page, options):
+    """Grab screenshot bytes from Playwright with as little post-processing as possible"""
+    try:
+        if options.clip_selector:
+            return page.locator(options.clip_selector).first.screenshot(**_screenshot_kwargs(options))
+        return page.screenshot(full_page=options.full_page, **_screenshot_kwargs(options))
+    except Exception as e:
+        print(f"Error capturing screenshot: {e}")
+        return None
+
+
+async def take_raw_screenshot_async(page, options):
+    try:
+        if options.clip_selector:
+            return await page.locator(options.clip_selector).first.screenshot(**_screenshot_kwargs(options))
+        return await page.screenshot(full_page=options.full_page, **_screenshot_kwargs(options))
+    except Exception as e:
+        print(f"Error capturing screenshot: {e}")
+        return None
+
+
+def _screenshot_kwargs(options):
+    # Playwright encodes JPEG natively, which is much cheaper than a PIL round trip
+    if options.format in ("jpeg", "jpg"):
+        return {"type": "jpeg", "quality": options.quality}
+    return {}
+
+
+def process_screenshot(screenshot_bytes, max_width=1200, image_format="png", quality=80):
+    """Resize raw screenshot bytes if needed and encode them in the requested format"""
+    try:
+        target = FORMATS[image_format.lower()]
+        image = Image.open(BytesIO(screenshot_bytes))
+
+        # Already the right size and format: hand the bytes back untouched
+        if (not max_width or image.width <= max_width) and image.format == target:
+            return screenshot_bytes
+
+        if max_width and image.width > max_width:
+            ratio = max_width / image.width
+            new_height = int(image.height * ratio)
+            image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
+
+        if target == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+
+        img_buffer = BytesIO()
+        save_kwargs = {"quality": quality} if target in ("JPEG", "WEBP") else {}
+        image.save(img_buffer, format=target, **save_kwargs)
+        return img_buffer.getvalue()
+
+    except Exception as e:
+        print(f"Error processing screenshot: {e}")
+        return None
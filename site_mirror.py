@@ -0,0 +1,138 @@
+#site_mirror.py
+import argparse
+import os
+from urllib.parse import unquote, urlparse
+
+from config import CONFIG
+
+# CONFIG["site_mode"]:
+#   "live"   - use the real site over the network (default)
+#   "replay" - answer every request from the HAR recorded by `python site_mirror.py record`
+#   "local"  - answer requests for the site's origin from a static copy (CONFIG["site_mirror"]["local_dir"])
+SITE_MODES = ("live", "replay", "local")
+
+
+def site_mode():
+    mode = CONFIG.get("site_mode", "live")
+    if mode not in SITE_MODES:
+        raise ValueError(f"Unknown site_mode: {mode}")
+    return mode
+
+
+def _settings():
+    return CONFIG.get("site_mirror", {})
+
+
+def har_path():
+    return _settings().get("har_path", "mirror/automationdemo.har")
+
+
+def local_dir():
+    directory = _settings().get("local_dir", "benchmarks/site")
+    return directory if os.path.isabs(directory) else os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+
+
+def new_context(browser, **options):
+    """browser.new_context() that serves the site according to CONFIG["site_mode"]"""
+    context = browser.new_context(**options)
+    apply_site_mode(context)
+    return context
+
+
+def apply_site_mode(context):
+    """Install the replay or local routes on an existing context; a no-op for "live" """
+    mode = site_mode()
+    if mode == "replay":
+        context.route_from_har(har_path(), not_found=_settings().get("not_found", "abort"))
+    elif mode == "local":
+        context.route(_origin_pattern(), _fulfill_local)
+
+
+async def new_context_async(browser, **options):
+    context = await browser.new_context(**options)
+    mode = site_mode()
+    if mode == "replay":
+        await context.route_from_har(har_path(), not_found=_settings().get("not_found", "abort"))
+    elif mode == "local":
+        async def handler(route):
+            await _fulfill_local(route)
+        await context.route(_origin_pattern(), handler)
+    return context
+
+
+def _origin_pattern():
+    from playwright_actions import site_url
+    parts = urlparse(site_url())
+    return f"{parts.scheme}://{parts.netloc}/**"
+
+
+def _fulfill_local(route):
+    """Answer from local_dir(); returns the fulfill() result so async handlers can await it"""
+    relative = unquote(urlparse(route.request.url).path).lstrip("/") or "index.html"
+    path = os.path.normpath(os.path.join(local_dir(), relative))
+    if os.path.isdir(path):
+        path = os.path.join(path, "index.html")
+    if not path.startswith(os.path.normpath(local_dir())) or not os.path.isfile(path):
+        return route.fulfill(status=404, body="Not in the local mirror")
+    return route.fulfill(path=path)
+
+
+# Each flow runs on one page, so the submit sees a filled form
+RECORD_FLOWS = [
+    [{"action": "navigate_to_section", "section": "#cars"}],
+    [{"action": "check_pricing", "car_type": "SUV"}],
+    [{"action": "check_car_details", "car_type": "VAN"}],
+    [{"action": "search_car", "query": "BMW"}],
+    [{"action": "validate_empty_form"}],
+    [{"action": "test_contact_links"}],
+    [{"action": "fill_booking_form", "form_data": {}}, {"action": "reset_form"}],
+    [{"action": "fill_booking_form", "form_data": {}}, {"action": "submit_booking"}],
+]
+
+
+def record_site(path=None, url=None):
+    """Run every action once against site_url() and save all traffic to a HAR file.
+
+    Every page the actions open (search results, submit page) is captured,
+    because they all live in the one recorded context.
+    """
+    from playwright.sync_api import sync_playwright
+    from launch_profiles import browser_type, launch_options
+    from playwright_actions import open_site, execute_instruction, site_url
+    from screenshot_pipeline import ScreenshotOptions, ScreenshotRecorder
+
+    path = path or har_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if url:
+        CONFIG["base_url"] = url
+    no_screenshots = ScreenshotOptions(capture="none")
+
+    with sync_playwright() as p:
+        browser = browser_type(p).launch(**launch_options(headless=True))
+        context = browser.new_context(record_har_path=path, record_har_content="embed")
+        for flow in RECORD_FLOWS:
+            page = open_site(context)
+            for instruction in flow:
+                try:
+                    execute_instruction(page, instruction, ScreenshotRecorder(no_screenshots))
+                    print(f"✅ Recorded {instruction['action']}")
+                except Exception as e:
+                    print(f"⚠️ {instruction['action']} failed while recording: {e}")
+            page.close()
+        context.close()  # The HAR is written when the context closes
+        browser.close()
+    print(f"🪞 Recorded {site_url()} into {path}")
+    return path
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Record the demo site for offline replay")
+    arg_parser.add_argument("command", choices=["record"])
+    arg_parser.add_argument("--har", help=f"output HAR (default: {har_path()})")
+    arg_parser.add_argument("--url", help="site to record (default: CONFIG base_url or the demo site)")
+    args = arg_parser.parse_args()
+    record_site(args.har, args.url)
+
+
+if __name__ == "__main__":
+    main()
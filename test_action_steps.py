@@ -0,0 +1,165 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+
+import pytest
+
+import async_actions
+import playwright_actions
+from action_steps import ACTION_STEPS, STEP_OPS, action_steps
+from screenshot_pipeline import ScreenshotOptions, ScreenshotRecorder
+
+INSTRUCTIONS = [
+    {"action": "search_car", "query": "BMW"},
+    {"action": "fill_booking_form", "form_data": {"name": "Ann", "cdw": False}},
+    {"action": "submit_booking"},
+    {"action": "reset_form"},
+    {"action": "navigate_to_section", "section": "#cars"},
+    {"action": "test_contact_links"},
+    {"action": "check_pricing", "car_type": "VAN"},
+    {"action": "validate_empty_form"},
+    {"action": "check_car_details", "car_type": "Luxury"},
+    {"action": "run_plan", "steps": [{"action": "fill_booking_form"}, {"action": "submit_booking"}]},
+    {"action": "fly_to_moon"},
+]
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    def __getattr__(self, name):
+        def call(*args):
+            self.page.log.append((name, self.selector) + args)
+            if name == "click" and self.selector in ("form.search-bar button", "#submit"):
+                self.page.context.popups.append(FakePage(self.page.log, self.page.context, "https://popup/"))
+            return f"text of {self.selector}" if name == "text_content" else None
+        return call
+
+
+class FakeContext:
+    def __init__(self):
+        self.popups = []
+
+    @contextmanager
+    def expect_page(self):
+        info = type("Info", (), {})()
+        yield info
+        info.value = self.popups.pop()
+
+
+class FakePage:
+    def __init__(self, log, context=None, url="https://site/"):
+        self.log = log
+        self.context = context or FakeContext()
+        self.url = url
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    def close(self):
+        self.log.append(("close", self.url))
+
+
+class AsyncFakeLocator(FakeLocator):
+    def __getattr__(self, name):
+        call = FakeLocator.__getattr__(self, name)
+
+        async def awaited(*args):
+            return call(*args)
+        return awaited
+
+
+class AsyncFakeContext(FakeContext):
+    @asynccontextmanager
+    async def expect_page(self):
+        info = type("Info", (), {})()
+        yield info
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(AsyncFakePage(self.popups.pop().log, self, "https://popup/"))
+        info.value = future
+
+
+class AsyncFakePage(FakePage):
+    def __init__(self, log, context=None, url="https://site/"):
+        super().__init__(log, context or AsyncFakeContext(), url)
+
+    def locator(self, selector):
+        return AsyncFakeLocator(self, selector)
+
+    async def close(self):
+        FakePage.close(self)
+
+
+def record_waits(monkeypatch, module, suffix=""):
+    """Replace the wait helpers a module imported with ones that only log the call"""
+    def fake(name, returns=None):
+        def sync_helper(page, *args):
+            # The last argument is always the WaitRecorder
+            page.log.append((name,) + tuple(getattr(arg, "selector", arg) for arg in args[:-1]))
+            return returns
+
+        async def async_helper(page, *args):
+            return sync_helper(page, *args)
+        monkeypatch.setattr(module, name + suffix, async_helper if suffix else sync_helper)
+
+    fake("go_to_section")
+    fake("scroll_into_view")
+    fake("wait_for_new_page")
+    fake("wait_for_form_cleared")
+    fake("click_and_capture_dialog", returns="Thanks!")
+
+
+def recorder_logging_to(log):
+    recorder = ScreenshotRecorder(ScreenshotOptions(capture="all"))
+    recorder.capture = lambda page, description, kind="step": log.append(("capture", page.url, description, kind))
+
+    async def capture_async(page, description, kind="step"):
+        recorder.capture(page, description, kind)
+    recorder.capture_async = capture_async
+    return recorder
+
+
+def run_sync(instruction):
+    log = []
+    page = FakePage(log)
+    return playwright_actions.execute_instruction(page, instruction, recorder_logging_to(log)), log
+
+
+def run_async(instruction):
+    log = []
+    page = AsyncFakePage(log)
+    result = asyncio.run(async_actions.execute_instruction_async(page, instruction, recorder_logging_to(log)))
+    return result, log
+
+
+def test_every_action_only_uses_known_ops():
+    for action, build in ACTION_STEPS.items():
+        steps, message = build({"action": action})
+        assert {step[0] for step in steps} <= STEP_OPS, action
+
+
+@pytest.mark.parametrize("instruction", INSTRUCTIONS, ids=lambda i: i["action"])
+def test_sync_and_async_engines_do_the_same_thing(monkeypatch, instruction):
+    record_waits(monkeypatch, playwright_actions)
+    record_waits(monkeypatch, async_actions, suffix="_async")
+
+    sync_result, sync_log = run_sync(instruction)
+    async_result, async_log = run_async(instruction)
+    assert sync_result == async_result
+    assert sync_log == async_log
+
+
+def test_results_read_from_the_page(monkeypatch):
+    record_waits(monkeypatch, playwright_actions)
+    assert run_sync({"action": "search_car", "query": "BMW"})[0] == \
+        "Search completed for 'BMW'. New page: https://popup/"
+    assert run_sync({"action": "check_pricing", "car_type": "VAN"})[0] == \
+        "VAN price per day: text of tbody tr >> nth=1 >> td >> nth=1"
+    assert run_sync({"action": "check_pricing", "car_type": "Bus"})[0] == "Bus price per day: "
+    assert run_sync({"action": "fly_to_moon"})[0] == "Unsupported action: fly_to_moon"
+
+
+def test_optional_checkboxes_follow_form_data():
+    steps, _ = action_steps({"action": "fill_booking_form", "form_data": {"cdw": False}})
+    assert ("check", "#cdw") not in steps and ("check", "#term1") in steps
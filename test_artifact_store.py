@@ -0,0 +1,98 @@
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from artifact_store import ArtifactStore
+
+
+def make_png(color, size=(64, 48), dot=None, reverse=False):
+    image = Image.new("RGB", size, color)
+    # A horizontal gradient gives the difference hash something to see
+    for x in range(size[0]):
+        shade = (size[0] - x if reverse else x) * 3
+        for y in range(size[1]):
+            image.putpixel((x, y), (color[0], color[1], min(255, color[2] // 2 + shade)))
+    if dot:
+        image.putpixel(dot, (0, 0, 0))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_store(tmp_path, **kwargs):
+    return ArtifactStore(root=str(tmp_path / "screenshots"), **kwargs)
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    store = make_store(tmp_path)
+    image = make_png((200, 10, 10))
+
+    first = store.put(image, "run1", "initial")
+    second = store.put(image, "run2", "initial")
+
+    assert first == second
+    assert store.lookup("run2", "initial") == first
+    assert store.get(first) == image
+    assert store.path(first).endswith(".png")
+    assert store.total_bytes == len(image)
+
+
+def test_perceptual_mode_dedupes_near_identical_frames(tmp_path):
+    store = make_store(tmp_path, perceptual=True)
+    base = store.put(make_png((10, 120, 200)), "run", "before")
+    near = store.put(make_png((10, 120, 200), dot=(3, 3)), "run", "after")
+    other = store.put(make_png((10, 120, 200), reverse=True), "run", "other")
+
+    assert near == base
+    assert other != base
+    assert store.steps("run") == {"before": base, "after": base, "other": other}
+
+
+def test_least_recently_used_blobs_are_evicted(tmp_path):
+    images = [make_png((i * 40, 0, 0)) for i in range(3)]
+    store = make_store(tmp_path, max_bytes=len(images[0]) * 2)
+
+    old = store.put(images[0], "run", "a")
+    old_path = store.path(old)
+    store.put(images[1], "run", "b")
+    store.put(images[2], "run", "c")
+
+    assert store.get(old) is None
+    assert store.lookup("run", "a") is None
+    assert store.total_bytes <= store.max_bytes
+    assert not os.path.exists(old_path)
+
+
+def test_index_survives_restart_and_compaction(tmp_path):
+    store = make_store(tmp_path)
+    digest = store.put(make_png((0, 200, 0)), "run", "result")
+    store.compact()
+
+    reopened = make_store(tmp_path)
+
+    assert reopened.lookup("run", "result") == digest
+    assert reopened.total_bytes == store.total_bytes
+
+
+def test_thumbnails_are_cached_and_evicted_with_their_blob(tmp_path):
+    store = make_store(tmp_path)
+    digest = store.put(make_png((0, 0, 200), size=(640, 480)), "run", "result")
+
+    thumbnail = store.thumbnail(digest, width=160)
+    thumb_path = store._thumbnail_path(digest, 160)
+
+    assert Image.open(BytesIO(thumbnail)).width == 160
+    assert os.path.exists(thumb_path)
+    store._remove_blob(digest)
+    assert not os.path.exists(thumb_path)
+    assert store.thumbnail(digest) is None
+
+
+def test_missing_blob_file_reads_as_none(tmp_path):
+    store = make_store(tmp_path)
+    digest = store.put(make_png((0, 90, 0)), "run", "a")
+    os.remove(store.path(digest))
+
+    assert store.get(digest) is None
+    assert store.thumbnail(digest) is None
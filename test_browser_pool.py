@@ -0,0 +1,48 @@
+import pytest
+
+import browser_pool
+from browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    """Stands in for PooledBrowser; `restarts_ok` says whether restart() brings it back"""
+
+    def __init__(self, slot, launch_options=None, warm_pages=None, healthy=False, restarts_ok=True):
+        self.slot = slot
+        self.healthy = healthy
+        self.restarts_ok = restarts_ok
+        self.restarts = 0
+
+    def is_healthy(self):
+        return self.healthy
+
+    def restart(self):
+        self.restarts += 1
+        self.healthy = self.restarts_ok
+        return self.healthy
+
+    def close(self):
+        pass
+
+
+def test_unhealthy_browser_is_restarted_before_it_is_handed_out(monkeypatch):
+    monkeypatch.setattr(browser_pool, "PooledBrowser", FakeBrowser)
+    pool = BrowserPool(size=1)
+
+    browser = pool.acquire()
+
+    assert browser.restarts == 1 and browser.is_healthy()
+
+
+def test_browser_that_cannot_restart_is_not_handed_out(monkeypatch):
+    monkeypatch.setattr(browser_pool, "PooledBrowser",
+                        lambda *args: FakeBrowser(*args, restarts_ok=False))
+    pool = BrowserPool(size=1)
+
+    with pytest.raises(RuntimeError, match="could not be restarted"):
+        pool.acquire()
+
+    # The slot stays in the pool and is retried on the next acquire
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0.1)
+    assert pool._idle.get_nowait().restarts == 2
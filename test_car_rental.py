@@ -1,17 +1,25 @@
 import pytest
-import time
 import re
-from playwright.sync_api import Page, expect, BrowserContext
+from playwright.sync_api import Page, expect
+
+from playwright_actions import site_url
+from wait_strategies import WaitRecorder, go_to_section
+
+
+def go_to(page: Page, section):
+    """Click the navbar link and wait until the section has scrolled into place"""
+    go_to_section(page, section, WaitRecorder())
 
 
 class TestInfyCarRentApplication:
-    BASE_URL = 'https://automationdemo.vercel.app/'
+    BASE_URL = site_url()
 
     @pytest.fixture(autouse=True)
     def setup(self, page: Page):
         """Setup method that runs before each test"""
-        page.goto(self.BASE_URL)
-        page.wait_for_timeout(3000)
+        page.goto(self.BASE_URL, wait_until="domcontentloaded")
+        # Ready as soon as the page has rendered, instead of a fixed sleep
+        expect(page.locator('h1.welcome')).to_be_visible()
 
     def test_should_load_homepage_with_correct_title_and_navigation(self, page: Page):
         """Test homepage loading with correct title and navigation"""
@@ -60,8 +68,7 @@ class TestInfyCarRentApplication:
     def test_should_display_available_cars_section_correctly(self, page: Page):
         """Test available cars section display"""
         # Navigate to cars section
-        page.locator('a[href="#cars"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#cars')
         
         # Check section heading
         expect(page.locator('#cars h2')).to_have_text('Available Cars')
@@ -91,8 +98,7 @@ class TestInfyCarRentApplication:
     def test_should_display_pricing_table_correctly(self, page: Page):
         """Test pricing table display"""
         # Navigate to pricing section
-        page.locator('a[href="#price"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#price')
         
         # Check section heading
         expect(page.locator('#price h2')).to_have_text('Pricing Section')
@@ -126,26 +132,22 @@ class TestInfyCarRentApplication:
     def test_should_test_form_validation_with_empty_fields(self, page: Page):
         """Test form validation with empty fields"""
         # Navigate to booking section
-        page.locator('a[href="#booking"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#booking')
         
         submit_button = page.locator('#submit')
         
         # Handle alert dialog for validation
-        def handle_dialog(dialog):
-            assert 'Please fill in all required fields' in dialog.message
-            dialog.accept()
-        
-        page.on('dialog', handle_dialog)
+        page.on('dialog', lambda dialog: dialog.accept())
         
-        # Try to submit empty form
-        submit_button.click()
+        # Try to submit empty form and wait for the alert instead of returning before it shows
+        with page.expect_event('dialog') as dialog_info:
+            submit_button.click()
+        assert 'Please fill in all required fields' in dialog_info.value.message
 
     def test_should_test_form_submission_with_valid_data(self, page: Page):
         """Test form submission with valid data"""
         # Navigate to booking section
-        page.locator('a[href="#booking"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#booking')
         
         # Fill all required fields
         page.locator('#fn').fill('John Doe')
@@ -168,8 +170,7 @@ class TestInfyCarRentApplication:
     def test_should_test_reset_button_functionality(self, page: Page):
         """Test reset button functionality"""
         # Navigate to booking section
-        page.locator('a[href="#booking"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#booking')
         
         # Fill some fields
         page.locator('#fn').fill('Test User')
@@ -202,12 +203,10 @@ class TestInfyCarRentApplication:
         expect(contact_links).to_have_count(4)
         
         # Test email link click
-        def handle_dialog(dialog):
-            assert 'infycar' in dialog.message
-            dialog.accept()
-        
-        page.on('dialog', handle_dialog)
-        contact_links.nth(0).click()
+        page.on('dialog', lambda dialog: dialog.accept())
+        with page.expect_event('dialog') as dialog_info:
+            contact_links.nth(0).click()
+        assert 'infycar' in dialog_info.value.message
 
     def test_should_test_google_maps_iframe(self, page: Page):
         """Test Google Maps iframe"""
@@ -221,24 +220,19 @@ class TestInfyCarRentApplication:
     def test_should_test_navigation_anchor_links(self, page: Page):
         """Test navigation anchor links"""
         # Test navigation links scroll to sections
-        page.locator('a[href="#cars"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#cars')
         expect(page.locator('#cars')).to_be_in_viewport()
         
-        page.locator('a[href="#price"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#price')
         expect(page.locator('#price')).to_be_in_viewport()
         
-        page.locator('a[href="#booking"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#booking')
         expect(page.locator('#booking')).to_be_in_viewport()
         
-        page.locator('a[href="#contact"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#contact')
         expect(page.locator('#contact')).to_be_in_viewport()
         
-        page.locator('a[href="#home"]').click()
-        page.wait_for_timeout(500)
+        go_to(page, '#home')
         expect(page.locator('#home')).to_be_in_viewport()
 
     # def test_should_test_responsive_design(self, page: Page):
@@ -255,22 +249,3 @@ class TestInfyCarRentApplication:
     #     # Test mobile view
     #     page.set_viewport_size({"width": 375, "height": 667})
     #     expect(page.locator('h1.welcome')).to_be_visible()
-
-
-class TestPerformance:
-    """Performance tests"""
-    BASE_URL = 'https://automationdemo.vercel.app/'
-
-    def test_should_load_page_within_acceptable_time(self, page: Page):
-        """Test page load performance"""
-        start_time = time.time() * 1000  # Convert to milliseconds
-        page.goto(self.BASE_URL)
-        page.wait_for_load_state('networkidle')
-        load_time = time.time() * 1000 - start_time
-        
-        print(f"Page load time: {load_time:.0f}ms")
-        assert load_time < 10000, f"Page load time {load_time:.0f}ms exceeds 10 seconds"
-        
-        # Check if main elements are loaded
-        expect(page.locator('h1.welcome')).to_be_visible()
-        expect(page.locator('nav.navbar')).to_be_visible()
\ No newline at end of file
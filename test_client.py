@@ -0,0 +1,130 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import client
+from client import OllamaClient, call_ollama_model
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """Answers /api/generate and /api/chat with a canned streamed reply"""
+    protocol_version = "HTTP/1.1"
+    tokens = ['{"action": ', '"check_pricing", ', '"car_type": "SUV"}']
+    requests_seen = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append((self.path, body, self.client_address[1]))
+
+        if self.path == "/api/generate":
+            chunks = [{"response": t, "done": False} for t in self.tokens]
+        elif self.path == "/api/chat":
+            chunks = [{"message": {"role": "assistant", "content": t}, "done": False} for t in self.tokens]
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        chunks.append({"done": True})
+
+        payload = b"".join(json.dumps(c).encode() + b"\n" for c in chunks)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubOllamaHandler.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_generate_streams_tokens_and_uses_configured_model(stub_server):
+    client = OllamaClient(base_url=stub_server, model="stub-model")
+
+    tokens = list(client.generate_stream("check SUV pricing"))
+
+    assert "".join(tokens) == '{"action": "check_pricing", "car_type": "SUV"}'
+    path, body, _ = StubOllamaHandler.requests_seen[0]
+    assert path == "/api/generate"
+    assert body["model"] == "stub-model"
+    assert body["stream"] is True
+
+
+def test_chat_returns_assistant_content(stub_server):
+    client = OllamaClient(base_url=stub_server)
+
+    reply = client.chat([{"role": "user", "content": "check SUV pricing"}])
+
+    assert json.loads(reply) == {"action": "check_pricing", "car_type": "SUV"}
+    assert StubOllamaHandler.requests_seen[0][0] == "/api/chat"
+
+
+def test_connection_is_reused_between_calls(stub_server):
+    client = OllamaClient(base_url=stub_server)
+
+    client.generate("first")
+    client.generate("second")
+
+    ports = {port for _, _, port in StubOllamaHandler.requests_seen}
+    assert len(ports) == 1
+
+
+class FakeStreamingResponse:
+    """Streams NDJSON lines one at a time and remembers how far it was read"""
+
+    def __init__(self, tokens):
+        self.lines = [json.dumps({"response": t, "done": False}).encode() for t in tokens]
+        self.lines.append(json.dumps({"done": True}).encode())
+        self.read = 0
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        while self.read < len(self.lines) and not self.closed:
+            self.read += 1
+            yield self.lines[self.read - 1]
+
+    def close(self):
+        self.closed = True
+
+
+def test_stop_when_closes_the_stream_early(monkeypatch):
+    tokens = ['{"action": "reset_form"}', ' and', ' some', ' rambling']
+    response = FakeStreamingResponse(tokens)
+    fake_client = OllamaClient(base_url="http://ollama.invalid")
+    monkeypatch.setattr(fake_client.session, "post", lambda *args, **kwargs: response)
+    monkeypatch.setattr(client, "_client", fake_client)
+    seen = []
+
+    reply = call_ollama_model("reset the form", on_token=seen.append, stop_when=lambda token: token.endswith("}"))
+
+    assert reply == '{"action": "reset_form"}'
+    assert seen == tokens[:1]
+    assert response.closed
+    assert response.read == 1  # The remaining tokens were never pulled off the connection
+
+
+def test_garbage_line_in_the_stream_is_an_error(monkeypatch):
+    response = FakeStreamingResponse(['{"action":'])
+    response.lines.insert(1, b"<html>502 Bad Gateway</html>")
+    fake_client = OllamaClient(base_url="http://ollama.invalid")
+    monkeypatch.setattr(fake_client.session, "post", lambda *args, **kwargs: response)
+    monkeypatch.setattr(client, "_client", fake_client)
+
+    assert call_ollama_model("reset the form") == ""
+    assert response.closed
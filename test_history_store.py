@@ -0,0 +1,57 @@
+import json
+import time
+
+from history_store import HistoryStore
+
+
+def make_store(tmp_path):
+    return HistoryStore(path=str(tmp_path / "history.sqlite3"))
+
+
+def test_pages_are_newest_first_and_continue_from_the_last_id(tmp_path):
+    store = make_store(tmp_path)
+    ids = [store.append(f"command {i}", "search_car", "success", "ok") for i in range(5)]
+
+    first = store.page(limit=2)
+    second = store.page(limit=2, before_id=first[-1]["id"])
+
+    assert [row["id"] for row in first] == ids[:-3:-1]
+    assert [row["id"] for row in second] == [ids[2], ids[1]]
+
+
+def test_filters_by_action_status_time_and_search(tmp_path):
+    store = make_store(tmp_path)
+    now = time.time()
+    store.append("search BMW", "search_car", "success", "ok", created_at=now - 7200)
+    store.append("check SUV pricing", "check_pricing", "error", "boom", created_at=now - 60)
+    store.append("search Mercedes", "search_car", "success", "ok", created_at=now - 30,
+                 instruction={"action": "search_car", "query": "Mercedes"})
+
+    assert store.count(action="search_car") == 2
+    assert store.count(status="error") == 1
+    assert store.count(since=now - 3600) == 2
+    assert [row["command"] for row in store.page(search="merc")] == ["search Mercedes"]
+    assert store.page(search="merc")[0]["instruction"]["query"] == "Mercedes"
+    assert store.actions() == ["check_pricing", "search_car"]
+
+
+def test_export_streams_matching_rows_as_jsonl(tmp_path):
+    store = make_store(tmp_path)
+    for i in range(7):
+        store.append(f"command {i}", "reset_form", "success" if i % 2 else "error", "done", source="entry")
+
+    path = tmp_path / "history.jsonl"
+    written = store.export_jsonl(str(path), batch_size=2, status="success")
+
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert written == 3
+    assert [row["command"] for row in rows] == ["command 1", "command 3", "command 5"]
+
+
+def test_history_survives_restart_and_get_many_keeps_order(tmp_path):
+    first_id = make_store(tmp_path).append("reset the form", "reset_form", "success", "ok")
+    second_id = make_store(tmp_path).append("submit booking", "submit_booking", "success", "ok")
+
+    rows = make_store(tmp_path).get_many([second_id, first_id])
+
+    assert [row["action"] for row in rows] == ["submit_booking", "reset_form"]
@@ -0,0 +1,65 @@
+import pytest
+
+import instruction_pipeline
+from client import SYSTEM_PROMPT_VERSION
+from config import CONFIG
+from prompt_cache import PromptCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = PromptCache(path=str(tmp_path / "prompt_cache.sqlite3"))
+    monkeypatch.setattr(instruction_pipeline, "get_prompt_cache", lambda: cache)
+    monkeypatch.setitem(CONFIG, "intent_grammar", True)
+    monkeypatch.setitem(CONFIG, "prompt_cache", {"enabled": True})
+    monkeypatch.setitem(CONFIG, "stream_parse", False)
+    yield cache
+    cache.close()
+
+
+def answer_with(monkeypatch, output):
+    """Make the model answer every prompt with `output`, and return the list of prompts it was asked"""
+    calls = []
+
+    def fake_call(prompt, stop_when=None):
+        calls.append(prompt)
+        return output
+    monkeypatch.setattr(instruction_pipeline, "call_ollama_model", fake_call)
+    return calls
+
+
+def test_grammar_then_cache_then_llm(cache, monkeypatch):
+    calls = answer_with(monkeypatch, 'Sure: {"action": "check_pricing", "car_type": "VAN"}')
+    monkeypatch.setattr(instruction_pipeline, "match_intent",
+                        lambda prompt: {"action": "reset_form"} if prompt == "reset" else None)
+
+    assert instruction_pipeline.resolve_instruction("reset") == ({"action": "reset_form"}, None, "grammar")
+    assert calls == []
+
+    instruction, output, source = instruction_pipeline.resolve_instruction("how much is a van")
+    assert (instruction, source) == ({"action": "check_pricing", "car_type": "VAN"}, "llm")
+    assert output.startswith("Sure")
+
+    assert instruction_pipeline.resolve_instruction("how much is a van") == (instruction, None, "cache")
+    assert calls == ["how much is a van"]
+
+
+def test_path_stats_count_each_source(cache, monkeypatch):
+    answer_with(monkeypatch, '{"action": "reset_form"}')
+    monkeypatch.setattr(instruction_pipeline, "match_intent",
+                        lambda prompt: {"action": "submit_booking"} if prompt == "submit" else None)
+    monkeypatch.setattr(instruction_pipeline, "PATH_STATS", {"grammar": 0, "cache": 0, "llm": 0})
+
+    for prompt in ("submit", "start over", "start over", "submit"):
+        instruction_pipeline.resolve_instruction(prompt)
+
+    assert instruction_pipeline.get_path_stats() == {"grammar": 2, "cache": 1, "llm": 1, "llm_avoided_ratio": 0.75}
+
+
+def test_invalid_answers_are_not_cached(cache, monkeypatch):
+    answer_with(monkeypatch, '{"action": "search_car"}')
+    monkeypatch.setattr(instruction_pipeline, "match_intent", lambda prompt: None)
+
+    instruction_pipeline.resolve_instruction("look something up")
+
+    assert cache.get("look something up", CONFIG["ollama_model"], SYSTEM_PROMPT_VERSION) is None
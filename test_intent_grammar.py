@@ -0,0 +1,70 @@
+import pytest
+
+from intent_grammar import match_intent
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("Search for BMW cars", {"action": "search_car", "query": "BMW"}),
+    ("check SUV pricing", {"action": "check_pricing", "car_type": "SUV"}),
+    ("Check pricing for Luxury cars", {"action": "check_pricing", "car_type": "Luxury"}),
+    ("check luxury car details", {"action": "check_car_details", "car_type": "Luxury"}),
+    ("go to cars section", {"action": "navigate_to_section", "section": "#cars"}),
+    ("navigate to pricing", {"action": "navigate_to_section", "section": "#price"}),
+    ("open the booking form", {"action": "navigate_to_section", "section": "#booking"}),
+    ("book a SUV without insurance", {"action": "fill_booking_form", "form_data": {"car_type": "SUV", "cdw": False}}),
+    ("Reset the booking form", {"action": "reset_form"}),
+    ("Validate empty form", {"action": "validate_empty_form"}),
+    ("Submit the booking", {"action": "submit_booking"}),
+    ("test contact links", {"action": "test_contact_links"}),
+    ("fill booking form for van", {"action": "fill_booking_form", "form_data": {"car_type": "VAN"}}),
+])
+def test_common_commands_take_the_fast_path(prompt, expected):
+    assert match_intent(prompt) == expected
+
+
+def test_booking_slots_are_extracted():
+    instruction = match_intent("Book a VAN from 2025-08-15 to 2025-08-20 named John Smith, email john@example.com")
+
+    assert instruction == {
+        "action": "fill_booking_form",
+        "form_data": {
+            "name": "John Smith",
+            "email": "john@example.com",
+            "start_date": "2025-08-15",
+            "end_date": "2025-08-20",
+            "car_type": "VAN",
+        },
+    }
+
+
+@pytest.mark.parametrize("prompt", [
+    "fill the booking form for a van and submit it, then check SUV pricing",
+    "check pricing",
+    "compare SUV and VAN pricing",
+    "what's the weather like",
+    "",
+    "go to the booking form and submit it",
+    "open the booking form and reset it",
+    "navigate to booking and fill it",
+    "go to the cars section and search for BMW",
+    "go check SUV pricing",
+    "do not submit the form",
+    "don't reset the booking form",
+])
+def test_ambiguous_commands_fall_back_to_the_model(prompt):
+    assert match_intent(prompt) is None
+
+
+def test_only_explicit_names_are_taken():
+    assert match_intent("book for Monday") == {"action": "fill_booking_form", "form_data": {}}
+    assert match_intent("book a van for John") == {"action": "fill_booking_form", "form_data": {"car_type": "VAN"}}
+    assert match_intent("book a car named Ann Lee")["form_data"] == {"name": "Ann Lee"}
+
+
+@pytest.mark.parametrize("prompt", [
+    "find me a car for Monday",
+    "search for cars available next week",
+    "look for something for my trip",
+])
+def test_sentences_are_not_search_queries(prompt):
+    assert match_intent(prompt) is None
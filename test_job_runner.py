@@ -0,0 +1,112 @@
+import time
+
+import job_runner
+from job_runner import JobRunner
+
+
+def wait_for(runner, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = runner.get(job_id)
+        if job.done:
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_command_job_reports_each_stage(monkeypatch):
+    instruction = {"action": "check_pricing", "car_type": "SUV"}
+    monkeypatch.setattr(job_runner, "resolve_instruction", lambda command: (instruction, None, "grammar"))
+
+    def fake_perform_action(instruction, on_event=None):
+        on_event("page_ready", "Site loaded")
+        on_event("screenshot", "SUV pricing")
+        return "Checked SUV pricing", None
+
+    monkeypatch.setattr(job_runner, "perform_action", fake_perform_action)
+    runner = JobRunner(workers=1)
+
+    job = wait_for(runner, runner.submit("check SUV pricing"))
+
+    assert job.status == "success"
+    assert job.result == "Checked SUV pricing"
+    assert job.progress == 100
+    assert [stage for _, stage, _ in job.events] == [
+        "queued", "llm_started", "llm_finished", "parsed",
+        "browser_started", "page_ready", "screenshot", "done",
+    ]
+
+
+def test_unparsed_command_fails_without_touching_the_browser(monkeypatch):
+    monkeypatch.setattr(job_runner, "resolve_instruction", lambda command: (None, "gibberish", "llm"))
+    monkeypatch.setattr(job_runner, "perform_action", unexpected_browser_call)
+    runner = JobRunner(workers=1)
+
+    job = wait_for(runner, runner.submit("do something odd"))
+
+    assert job.status == "error"
+    assert job.result == "Could not parse instruction"
+    assert job.raw_output == "gibberish"
+
+
+def test_failed_action_marks_the_job_as_error(monkeypatch):
+    monkeypatch.setattr(job_runner, "resolve_instruction", lambda command: ({"action": "reset_form"}, None, "grammar"))
+    monkeypatch.setattr(job_runner, "perform_action", lambda instruction, on_event=None: ("Error: #reset not found", None))
+    runner = JobRunner(workers=1)
+
+    job = wait_for(runner, runner.submit("reset the form"))
+
+    assert job.status == "error"
+    assert job.result == "Error: #reset not found"
+    assert job.stage == "error"
+
+
+def unexpected_browser_call(*args, **kwargs):
+    raise AssertionError("perform_action should not be called")
+
+
+def test_step_jobs_run_in_one_session_and_notify_listeners(monkeypatch):
+    def fake_run_session(steps, on_step=None):
+        results = []
+        for index, step in enumerate(steps, start=1):
+            result = {"action": step["action"], "status": "success", "result": "ok",
+                      "screenshot": None, "duration": 0.0, "step": index}
+            on_step(result)
+            results.append(result)
+        return results
+
+    monkeypatch.setattr(job_runner, "run_session", fake_run_session)
+    runner = JobRunner(workers=1)
+    seen = []
+    runner.add_listener(lambda job, stage, message: seen.append(stage))
+
+    job = wait_for(runner, runner.submit("Fill and Submit Form", steps=[
+        {"action": "fill_booking_form", "form_data": {}}, {"action": "submit_booking"},
+    ]))
+
+    assert job.status == "success"
+    assert job.instruction == {"action": "submit_booking"}
+    assert seen == ["queued", "browser_started", "step", "step", "done"]
+    assert runner.pending == 0
+
+
+def test_planned_command_runs_all_steps_in_one_session(monkeypatch):
+    steps = [{"action": "submit_booking"}, {"action": "check_pricing", "car_type": "SUV"}]
+    plan = {"action": "run_plan", "steps": steps}
+    monkeypatch.setattr(job_runner, "resolve_instruction", lambda command: (plan, "raw", "llm"))
+    monkeypatch.setattr(job_runner, "perform_action", unexpected_browser_call)
+    sessions = []
+
+    def fake_run_session(steps, on_step=None):
+        sessions.append(steps)
+        return [{"action": step["action"], "status": "success", "result": "ok",
+                 "screenshot": None, "duration": 0.0, "step": index} for index, step in enumerate(steps, start=1)]
+
+    monkeypatch.setattr(job_runner, "run_session", fake_run_session)
+    runner = JobRunner(workers=1)
+
+    job = wait_for(runner, runner.submit("submit the booking, then check SUV pricing"))
+
+    assert job.status == "success"
+    assert sessions == [steps]
+    assert job.instruction == plan
@@ -0,0 +1,90 @@
+import pytest
+
+from config import CONFIG
+from launch_profiles import LEAN_CHROMIUM_ARGS, ResourceBlocker, blocking_rules, launch_options, wants_blocking
+from screenshot_pipeline import ScreenshotOptions
+
+
+def test_launch_options_follow_config(monkeypatch):
+    monkeypatch.setitem(CONFIG, "browser", "chromium")
+    monkeypatch.setitem(CONFIG, "headless", True)
+    assert launch_options(profile="standard") == {"headless": True}
+    assert launch_options(profile="lean")["args"] == LEAN_CHROMIUM_ARGS
+    assert launch_options(headless=False, profile="lean")["headless"] is False
+
+    # The Chromium switches are not passed to other engines
+    monkeypatch.setitem(CONFIG, "browser", "firefox")
+    assert launch_options(profile="lean") == {"headless": True}
+
+    with pytest.raises(ValueError):
+        launch_options(profile="turbo")
+
+
+def test_full_blocking_only_when_no_screenshots(monkeypatch):
+    monkeypatch.setitem(CONFIG, "resource_blocking", {"mode": "auto"})
+    action = {"action": "check_pricing"}
+    assert blocking_rules(action, ScreenshotOptions(capture="none")) == ({"image", "font", "media"}, True)
+    # Actions that take screenshots load the full page by default
+    assert not wants_blocking(action, ScreenshotOptions(capture="final"))
+    assert blocking_rules(dict(action, block_resources=True), ScreenshotOptions(capture="all"))[1] is True
+    assert not wants_blocking(dict(action, block_resources=False), ScreenshotOptions(capture="none"))
+
+    monkeypatch.setitem(CONFIG, "resource_blocking", {"mode": "auto", "always_block": ["media"]})
+    assert blocking_rules(action, ScreenshotOptions(capture="final")) == ({"media"}, False)
+
+    monkeypatch.setitem(CONFIG, "resource_blocking", {"mode": "never"})
+    assert not wants_blocking(action, ScreenshotOptions(capture="none"))
+
+
+def test_configure_switches_a_blocker_between_actions(monkeypatch):
+    monkeypatch.setitem(CONFIG, "resource_blocking", {"mode": "auto", "always_block": ["font", "media"]})
+    blocker = ResourceBlocker.for_action({"action": "reset_form"}, ScreenshotOptions(capture="none"))
+    assert blocker.active and "image" in blocker.resource_types
+
+    blocker.configure({"action": "reset_form"}, ScreenshotOptions(capture="final"))
+    assert blocker.resource_types == {"font", "media"} and not blocker.third_party
+
+    blocker.configure({"action": "reset_form", "block_resources": False}, ScreenshotOptions(capture="none"))
+    assert not blocker.active
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    def abort(self):
+        self.outcome = "abort"
+
+    def fallback(self):
+        self.outcome = "fallback"
+
+
+def test_blocker_aborts_heavy_and_third_party_requests():
+    blocker = ResourceBlocker({"resource_types": ["image", "font"], "third_party": True})
+    blocker._origin = "https://automationdemo.vercel.app"
+
+    cases = [
+        ("document", "https://automationdemo.vercel.app/", "fallback"),
+        ("stylesheet", "https://automationdemo.vercel.app/style.css", "fallback"),
+        ("image", "https://automationdemo.vercel.app/car.png", "abort"),
+        ("document", "https://www.google.com/maps/embed?pb=1", "abort"),
+        ("image", "data:image/png;base64,AAAA", "abort"),
+        ("script", "data:text/javascript,1", "fallback"),
+    ]
+    for resource_type, url, outcome in cases:
+        route = FakeRoute(resource_type, url)
+        blocker._handle(route)
+        assert route.outcome == outcome, url
+    assert blocker.blocked == 3
+
+    blocker.active = False
+    route = FakeRoute("image", "https://automationdemo.vercel.app/car.png")
+    blocker._handle(route)
+    assert route.outcome == "fallback"
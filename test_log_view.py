@@ -0,0 +1,64 @@
+from log_view import LogBuffer, LogView
+
+
+class FakeRoot:
+    def __init__(self):
+        self.timers = []
+
+    def after(self, ms, callback):
+        self.timers.append(callback)
+        return len(self.timers)
+
+    def fire(self):
+        timers, self.timers = self.timers, []
+        for callback in timers:
+            callback()
+
+
+class FakeText:
+    """Just enough of tk.Text for LogView: text content, line indices, insert, delete"""
+
+    def __init__(self):
+        self.text = ""
+        self.inserts = 0
+
+    def insert(self, index, text):
+        self.text += text
+        self.inserts += 1
+
+    def index(self, index):
+        return f"{self.text.count(chr(10)) + 1}.0"
+
+    def delete(self, start, end):
+        last = int(end.split(".")[0]) - 1
+        self.text = "".join(self.text.splitlines(keepends=True)[last:])
+
+    def see(self, index):
+        pass
+
+
+def test_buffer_keeps_only_the_last_lines_and_spills_everything(tmp_path):
+    spill = tmp_path / "logs" / "gui.log"
+    buffer = LogBuffer(max_lines=3, spill_path=str(spill))
+
+    for i in range(5):
+        buffer.append(f"line {i}")
+    buffer.close()
+
+    assert buffer.lines() == ["line 2", "line 3", "line 4"]
+    assert spill.read_text().splitlines() == [f"line {i}" for i in range(5)]
+
+
+def test_view_batches_inserts_and_caps_widget_length():
+    root = FakeRoot()
+    widgets = [FakeText(), FakeText()]
+    view = LogView(root, widgets, buffer=LogBuffer(max_lines=3, spill_path=""), flush_ms=50)
+
+    for i in range(5):
+        view.write(f"line {i}")
+
+    assert len(root.timers) == 1
+    root.fire()
+    for widget in widgets:
+        assert widget.inserts == 1
+        assert widget.text.splitlines() == ["line 2", "line 3", "line 4"]
@@ -1,15 +1,10 @@
-import subprocess
-import json
+from client import get_ollama_client
 
-def run_ollama(prompt, model='tinyllama'):
-    result = subprocess.run(
-        ['ollama', 'run', model],
-        input=prompt.encode(),
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    output = result.stdout.decode()
+def run_ollama(prompt, model=None):
     print("Ollama Response:")
-    print(output)
+    for token in get_ollama_client().generate_stream(prompt, model=model):
+        print(token, end="", flush=True)
+    print()
 
-run_ollama("Explain Playwright with an example.")
+if __name__ == "__main__":
+    run_ollama("Explain Playwright with an example.")
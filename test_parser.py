@@ -0,0 +1,168 @@
+import json
+import time
+
+from parser import (
+    StreamingActionExtractor, compile_plan, extract_json_lists, extract_json_objects_with_offsets, parse_response,
+    validate_instruction, validate_plan,
+)
+
+
+def test_extractor_returns_objects_with_offsets():
+    text = 'Use this: {"action": "reset_form"} or {"action": "search_car", "query": "BMW"}'
+
+    matches = extract_json_objects_with_offsets(text)
+
+    assert [obj["action"] for obj, _, _ in matches] == ["reset_form", "search_car"]
+    for obj, start, end in matches:
+        assert text[start] == "{" and text[end - 1] == "}"
+
+
+def test_extractor_skips_broken_candidates_and_string_braces():
+    text = '{{{ {"action": "x" oops} {"note": "a } in a string"} {"action": "submit_booking"}'
+
+    objects = [obj for obj, _, _ in extract_json_objects_with_offsets(text)]
+
+    assert objects == [{"note": "a } in a string"}, {"action": "submit_booking"}]
+
+
+def test_extractor_is_linear_on_many_broken_candidates():
+    text = '{"a" [' * 20000 + '\n' * 20000 + '{"action": "reset_form"}'
+
+    started = time.perf_counter()
+    matches = extract_json_objects_with_offsets(text)
+    lists = extract_json_lists(text)
+
+    assert [obj for obj, _, _ in matches] == [{"action": "reset_form"}] and lists == []
+    assert time.perf_counter() - started < 2
+
+
+def test_list_extractor_ignores_brackets_in_strings():
+    text = 'Plan: [{"action": "search_car", "query": "]["}, {"action": "reset_form"}] done'
+
+    assert extract_json_lists(text) == [[{"action": "search_car", "query": "]["}, {"action": "reset_form"}]]
+
+
+def test_parse_response_prefers_the_answer_over_echoed_examples():
+    response = (
+        'Use only one of the following formats, for example: {"action": "search_car", "query": "BMW"}\n'
+        'Answer for searching cars: {"action": "search_car", "query": "Audi"}'
+    )
+
+    assert parse_response(response) == {"action": "search_car", "query": "Audi"}
+
+
+def feed_all(extractor, tokens):
+    for index, token in enumerate(tokens):
+        result = extractor.feed(token)
+        if result is not None:
+            return result, index
+    return None, None
+
+
+def test_stops_at_first_valid_action_object():
+    tokens = ['Sure! ', '{"action": ', '"check_pricing", ', '"car_type": "SUV"}',
+              '\n\nHere is another example: ', '{"action": "reset_form"}']
+    extractor = StreamingActionExtractor()
+
+    result, index = feed_all(extractor, tokens)
+
+    assert result == {"action": "check_pricing", "car_type": "SUV"}
+    assert index == 3
+
+
+def test_braces_inside_strings_are_ignored():
+    tokens = ['{"action": "search_car", ', '"query": "BMW }{ X5"', '}']
+
+    result, _ = feed_all(StreamingActionExtractor(), tokens)
+
+    assert result == {"action": "search_car", "query": "BMW }{ X5"}
+
+
+def test_objects_that_fail_the_schema_are_skipped():
+    tokens = ['{"action": "unknown"} ', '{"action": "check_pricing", "car_type": 3} ',
+              '{"action": "navigate_to_section", "section": "#cars"}']
+
+    result, index = feed_all(StreamingActionExtractor(), tokens)
+
+    assert result == {"action": "navigate_to_section", "section": "#cars"}
+    assert index == 2
+
+
+def test_stops_at_actions_that_rely_on_defaults():
+    tokens = ['{"action": "check_pricing"}', ' blah ', '{"action": "reset_form"}']
+
+    result, index = feed_all(StreamingActionExtractor(), tokens)
+
+    assert result == {"action": "check_pricing"}
+    assert index == 0
+
+
+def test_validate_instruction():
+    assert validate_instruction({"action": "submit_booking"})
+    assert validate_instruction({"action": "fill_booking_form", "form_data": {}})
+    assert validate_instruction({"action": "fill_booking_form"})
+    assert validate_instruction({"action": "navigate_to_section"})
+    assert not validate_instruction({"action": "fill_booking_form", "form_data": "x"})
+    assert not validate_instruction({"action": "search_car"})
+    assert not validate_instruction(["action"])
+
+
+PLAN_STEPS = [
+    {"action": "fill_booking_form", "form_data": {"car_type": "VAN"}},
+    {"action": "submit_booking"},
+    {"action": "check_pricing", "car_type": "SUV"},
+]
+
+
+def test_parse_response_compiles_plans():
+    as_object = 'Here is the plan: {"plan": %s}' % json.dumps(PLAN_STEPS)
+    as_list = 'Plan:\n%s' % json.dumps(PLAN_STEPS)
+
+    for response in (as_object, as_list):
+        assert parse_response(response) == {"action": "run_plan", "steps": PLAN_STEPS}
+
+    # A one-step plan is just that action, a plan with an invalid step is rejected as a whole
+    assert parse_response('{"plan": [{"action": "reset_form"}]}') == {"action": "reset_form"}
+    assert parse_response('{"plan": [{"action": "reset_form"}, {"action": "fly"}]}') is None
+
+
+def test_rejected_plan_falls_back_to_single_actions():
+    response = 'Draft: {"plan": [{"action": "fly"}]} Final answer: {"action": "reset_form"}'
+    assert parse_response(response) == {"action": "reset_form"}
+
+    response = 'Fields: [{"name": "Ann"}]\n{"action": "submit_booking"}'
+    assert parse_response(response) == {"action": "submit_booking"}
+
+    # The valid steps of a rejected plan are never run on their own
+    assert parse_response('[{"action": "reset_form"}, {"action": "fly"}]') is None
+
+
+def test_streaming_does_not_stop_inside_a_plan():
+    text = '{"plan": %s} trailing text' % json.dumps(PLAN_STEPS)
+    tokens = [text[i:i + 7] for i in range(0, len(text), 7)]
+
+    result, index = feed_all(StreamingActionExtractor(), tokens)
+
+    assert result == {"action": "run_plan", "steps": PLAN_STEPS}
+    assert index == text.index("} trailing") // 7  # The token with the plan's closing brace
+
+    result, _ = feed_all(StreamingActionExtractor(), [json.dumps(PLAN_STEPS)])
+    assert result == {"action": "run_plan", "steps": PLAN_STEPS}
+
+
+def test_validate_plan_instruction():
+    assert validate_instruction({"action": "run_plan", "steps": PLAN_STEPS})
+    assert not validate_instruction({"action": "run_plan", "steps": []})
+    assert not validate_instruction({"action": "run_plan", "steps": [{"action": "run_plan", "steps": PLAN_STEPS}]})
+    assert not validate_instruction({"action": "run_plan", "steps": PLAN_STEPS * 4})
+
+
+def test_plan_steps_may_rely_on_defaults():
+    steps = [{"action": "fill_booking_form"}, {"action": "submit_booking"}, {"action": "check_pricing"}]
+
+    assert validate_plan(steps)
+    assert compile_plan(steps) == {"action": "run_plan", "steps": steps}
+    assert parse_response('{"plan": %s}' % json.dumps(steps)) == {"action": "run_plan", "steps": steps}
+
+    # search_car has nothing to search for without a query
+    assert compile_plan([{"action": "search_car"}, {"action": "submit_booking"}]) is None
@@ -0,0 +1,268 @@
+import json
+import os
+import platform
+import time
+
+import pytest
+from playwright.sync_api import Browser, BrowserContext, Page, expect
+
+from benchmarks.local_servers import site_server
+from benchmarks.stats import compare, summarize
+from config import CONFIG
+from playwright_actions import site_url
+from site_mirror import site_mode
+from wait_strategies import WaitRecorder, go_to_section
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "perf_baseline.json")
+
+# Allowed relative slowdown and absolute noise floor per unit before a percentile counts as a regression
+TOLERANCE = {"ms": 0.25, "bytes": 0.2, "count": 0.25}
+MIN_DELTA = {"ms": 5.0, "bytes": 512 * 1024, "count": 2}
+
+# Navigation Timing and paint entries of the current document, in ms since navigation start
+NAVIGATION_TIMING_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const paints = Object.fromEntries(performance.getEntriesByType('paint').map(p => [p.name, p.startTime]));
+    return {
+        ttfb: nav.responseStart - nav.requestStart,
+        dom_content_loaded: nav.domContentLoadedEventEnd,
+        load: nav.loadEventEnd,
+        first_paint: paints['first-paint'] ?? null,
+        first_contentful_paint: paints['first-contentful-paint'] ?? null,
+    };
+}
+"""
+LOAD_FINISHED_JS = "() => performance.getEntriesByType('navigation')[0].loadEventEnd > 0"
+
+# CDP Performance.getMetrics name -> (stage, unit, factor); durations are reported in seconds
+CDP_METRICS = {
+    "JSHeapUsedSize": ("js_heap_used", "bytes", 1),
+    "LayoutCount": ("layout_count", "count", 1),
+    "RecalcStyleCount": ("recalc_style_count", "count", 1),
+    "ScriptDuration": ("script_duration", "ms", 1000),
+    "LayoutDuration": ("layout_duration", "ms", 1000),
+    "TaskDuration": ("task_duration", "ms", 1000),
+}
+
+
+class PerfRecorder:
+    """Samples per stage, summarized as percentiles at the end of the module"""
+
+    def __init__(self):
+        self.samples = {}
+        self.units = {}
+
+    def add(self, stage, value, unit="ms"):
+        if value is None:
+            return
+        self.units[stage] = unit
+        self.samples.setdefault(stage, []).append(value)
+
+    def summary(self, stage):
+        return summarize(self.samples[stage], self.units[stage])
+
+    def summaries(self):
+        return {stage: self.summary(stage) for stage in self.samples}
+
+
+@pytest.fixture(scope="module")
+def perf(request):
+    recorder = PerfRecorder()
+    yield recorder
+
+    config = request.config
+    summaries = recorder.summaries()
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+    if reporter and summaries:
+        reporter.write_line("")
+        reporter.write_line(f"{'stage':36} {'n':>4} {'p50':>12} {'p95':>12} {'p99':>12}")
+        for stage, summary in summaries.items():
+            unit = recorder.units[stage]
+            reporter.write_line(f"{stage:36} {summary['n']:>4} {summary[f'p50_{unit}']:>12.1f} "
+                                f"{summary[f'p95_{unit}']:>12.1f} {summary[f'p99_{unit}']:>12.1f}  {unit}")
+    if config.getoption("update_perf_baseline") and summaries:
+        path = config.getoption("perf_baseline") or DEFAULT_BASELINE
+        with open(path, "w") as f:
+            json.dump({
+                "meta": {
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "iterations": config.getoption("perf_iterations"),
+                    "url": site_url(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                },
+                "stages": summaries,
+            }, f, indent=2)
+
+
+@pytest.fixture(scope="module")
+def baseline(request):
+    """Stages of the stored baseline, or None while --update-perf-baseline records a new one; skips without one"""
+    if request.config.getoption("update_perf_baseline"):
+        return None
+    path = request.config.getoption("perf_baseline")
+    if path is None and not os.path.exists(DEFAULT_BASELINE):
+        pytest.skip(f"No performance baseline at {DEFAULT_BASELINE}; baselines are machine specific, record one with "
+                    f"`pytest test_performance.py --perf-iterations=20 --update-perf-baseline`")
+    path = path or DEFAULT_BASELINE
+    if not os.path.exists(path):
+        pytest.fail(f"No performance baseline at {path}", pytrace=False)
+    with open(path) as f:
+        return json.load(f).get("stages", {})
+
+
+@pytest.fixture(scope="module")
+def perf_site():
+    """The site without any request routing: the live URL, or the local copy served over HTTP.
+
+    Routes (site_mirror's replay/local modes, conftest's AssetCache) turn
+    off the browser's HTTP cache and add their own latency, so the numbers
+    here would not be the browser's.
+    """
+    if site_mode() == "live":
+        yield site_url()
+        return
+    with site_server() as server, pytest.MonkeyPatch.context() as patch:
+        patch.setitem(CONFIG, "base_url", server.url + "/")
+        yield site_url()
+
+
+@pytest.fixture
+def plain_context(browser: Browser, browser_context_args, perf_site):
+    """A fresh context with no routes installed"""
+    context = browser.new_context(**browser_context_args)
+    yield context
+    context.close()
+
+
+@pytest.fixture(scope="module")
+def iterations(request):
+    return request.config.getoption("perf_iterations")
+
+
+def assert_no_regressions(perf, baseline, stages):
+    """Fail with every stage whose p50 or p95 is past its tolerance, or that the baseline does not have"""
+    if baseline is None:
+        return  # Recording a new baseline
+    stages = [stage for stage in stages if stage in perf.samples]
+    missing = [stage for stage in stages if stage not in baseline]
+    assert not missing, f"Stages missing from the baseline, record it again: {', '.join(missing)}"
+    regressions = []
+    for stage in stages:
+        unit = perf.units[stage]
+        regressions += compare({stage: perf.summary(stage)}, baseline, tolerance=TOLERANCE[unit],
+                               min_delta=MIN_DELTA[unit], metrics=(f"p50_{unit}", f"p95_{unit}"))
+    assert not regressions, "\n".join(
+        f"{r['stage']} {r['metric']}: {r['baseline']:.1f} -> {r['current']:.1f} (x{r['ratio']:.2f})" for r in regressions
+    )
+
+
+def load_site(page: Page):
+    """Navigate, wait for the load event to be recorded and return the navigation/paint timings"""
+    page.goto(site_url(), wait_until="load")
+    page.wait_for_function(LOAD_FINISHED_JS)
+    expect(page.locator('h1.welcome')).to_be_visible()
+    return page.evaluate(NAVIGATION_TIMING_JS)
+
+
+def record_timings(perf, prefix, timings):
+    for name, value in timings.items():
+        perf.add(f"{prefix}.{name}", value)
+
+
+class TestPageLoad:
+    """Cold loads (new context, empty HTTP cache) and warm loads (same context, cache filled)"""
+
+    def test_cold_load(self, browser: Browser, browser_context_args, perf_site, perf, baseline, iterations):
+        for _ in range(iterations):
+            context = browser.new_context(**browser_context_args)
+            try:
+                record_timings(perf, "cold", load_site(context.new_page()))
+            finally:
+                context.close()
+
+        assert perf.summary("cold.load")["p95_ms"] < 10000, "Cold page load takes more than 10 seconds"
+        assert_no_regressions(perf, baseline, [stage for stage in perf.samples if stage.startswith("cold.")])
+
+    def test_warm_load(self, plain_context: BrowserContext, perf, baseline, iterations):
+        load_site(plain_context.new_page())  # Fill the HTTP cache
+        for _ in range(iterations):
+            page = plain_context.new_page()
+            record_timings(perf, "warm", load_site(page))
+            page.close()
+
+        assert_no_regressions(perf, baseline, [stage for stage in perf.samples if stage.startswith("warm.")])
+
+
+class TestRuntimeMetrics:
+    def test_cdp_performance_metrics(self, browser: Browser, plain_context: BrowserContext, perf, baseline, iterations):
+        """JS heap, layout/style recalculation counts and script time after a load (Chromium only)"""
+        if browser.browser_type.name != "chromium":
+            pytest.skip("Performance.getMetrics needs the Chrome DevTools Protocol")
+
+        for _ in range(iterations):
+            page = plain_context.new_page()
+            cdp = plain_context.new_cdp_session(page)
+            cdp.send("Performance.enable")
+            load_site(page)
+            metrics = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+            for name, (stage, unit, factor) in CDP_METRICS.items():
+                if name in metrics:
+                    perf.add(f"cdp.{stage}", metrics[name] * factor, unit)
+            cdp.detach()
+            page.close()
+
+        assert_no_regressions(perf, baseline, [f"cdp.{stage}" for stage, _, _ in CDP_METRICS.values()])
+
+
+def search_interaction(page: Page):
+    """Type a query and click search, until the results tab opens"""
+    page.locator('form.search-bar input[name="search"]').fill('BMW')
+    with page.context.expect_page() as new_page_info:
+        page.locator('form.search-bar button').click()
+    return new_page_info.value
+
+
+def booking_interaction(page: Page):
+    """Go to the form, fill it and submit, until the confirmation tab opens"""
+    go_to_section(page, '#booking', WaitRecorder())
+    page.locator('#fn').fill('John Doe')
+    page.locator('#email').fill('john.doe@example.com')
+    page.locator('input[name="start"]').fill('2025-08-01')
+    page.locator('input[name="end"]').fill('2025-08-07')
+    page.locator('#type').select_option('VAN')
+    page.locator('#cdw').check()
+    page.locator('#term1').check()
+    with page.context.expect_page() as new_page_info:
+        page.locator('#submit').click()
+    return new_page_info.value
+
+
+def pricing_interaction(page: Page):
+    """Go to the pricing table and read the SUV price"""
+    go_to_section(page, '#price', WaitRecorder())
+    assert page.locator('tbody tr').nth(0).locator('td').nth(1).text_content()
+
+
+INTERACTIONS = {
+    "search": search_interaction,
+    "booking": booking_interaction,
+    "pricing": pricing_interaction,
+}
+
+
+class TestInteractionLatency:
+    @pytest.mark.parametrize("name", list(INTERACTIONS))
+    def test_interaction_latency(self, name, plain_context: BrowserContext, perf, baseline, iterations):
+        for _ in range(iterations):
+            page = plain_context.new_page()
+            load_site(page)
+            start = time.perf_counter()
+            opened = INTERACTIONS[name](page)
+            perf.add(f"interaction.{name}", (time.perf_counter() - start) * 1000)
+            if opened is not None:
+                opened.close()
+            page.close()
+
+        assert_no_regressions(perf, baseline, [f"interaction.{name}"])
@@ -0,0 +1,47 @@
+from prompt_cache import PromptCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return PromptCache(path=str(tmp_path / "prompt_cache.sqlite3"), **kwargs)
+
+
+def test_hit_ignores_case_whitespace_and_trailing_punctuation(tmp_path):
+    cache = make_cache(tmp_path)
+    instruction = {"action": "check_pricing", "car_type": "SUV"}
+
+    cache.put("Check SUV pricing.", "tinyllama", "v1", instruction)
+
+    assert cache.get("  check   suv PRICING", "tinyllama", "v1") == instruction
+    assert cache.stats["memory_hits"] == 1
+
+
+def test_model_and_prompt_version_are_part_of_the_key(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("reset the form", "tinyllama", "v1", {"action": "reset_form"})
+
+    assert cache.get("reset the form", "mistral", "v1") is None
+    assert cache.get("reset the form", "tinyllama", "v2") is None
+    assert cache.stats["misses"] == 2
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    make_cache(tmp_path).put("go to cars section", "tinyllama", "v1",
+                             {"action": "navigate_to_section", "section": "#cars"})
+
+    reopened = make_cache(tmp_path)
+
+    assert reopened.get("go to cars section", "tinyllama", "v1")["section"] == "#cars"
+    assert reopened.stats["disk_hits"] == 1
+
+
+def test_expired_and_overflowing_entries_are_evicted(tmp_path):
+    cache = make_cache(tmp_path, memory_size=1, disk_size=2, ttl=60)
+    cache.put("a", "m", "v", {"action": "a"})
+    cache.put("b", "m", "v", {"action": "b"})
+    cache.put("c", "m", "v", {"action": "c"})
+
+    assert cache.get("a", "m", "v") is None
+    assert cache.get("c", "m", "v") == {"action": "c"}
+
+    cache.ttl = -1  # everything is now older than the TTL
+    assert cache.get("c", "m", "v") is None
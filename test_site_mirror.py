@@ -0,0 +1,68 @@
+import pytest
+
+import site_mirror
+from config import CONFIG
+
+
+class FakeRequest:
+    def __init__(self, url):
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, url):
+        self.request = FakeRequest(url)
+        self.fulfilled = None
+
+    def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+        self.har = None
+
+    def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    def route_from_har(self, path, not_found):
+        self.har = (path, not_found)
+
+
+@pytest.fixture
+def site_mode(monkeypatch):
+    def set_mode(mode):
+        monkeypatch.setitem(CONFIG, "site_mode", mode)
+        monkeypatch.setitem(CONFIG, "base_url", None)
+    return set_mode
+
+
+def test_local_mode_serves_the_site_origin_from_the_static_copy(site_mode):
+    site_mode("local")
+    context = FakeContext()
+
+    site_mirror.apply_site_mode(context)
+    pattern, handler = context.routes[0]
+    root, missing, escape = (FakeRoute(f"https://automationdemo.vercel.app/{p}")
+                             for p in ("", "nope.png", "..%2F..%2Fconfig.py"))
+    for route in (root, missing, escape):
+        handler(route)
+
+    assert pattern == "https://automationdemo.vercel.app/**"
+    assert root.fulfilled["path"].endswith("index.html")
+    assert missing.fulfilled["status"] == 404
+    assert escape.fulfilled["status"] == 404
+
+
+def test_replay_mode_routes_from_the_har_and_live_mode_does_nothing(site_mode):
+    site_mode("replay")
+    replay = FakeContext()
+    site_mirror.apply_site_mode(replay)
+
+    site_mode("live")
+    live = FakeContext()
+    site_mirror.apply_site_mode(live)
+
+    assert replay.har == (site_mirror.har_path(), "abort")
+    assert live.har is None and live.routes == []
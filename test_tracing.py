@@ -0,0 +1,54 @@
+import json
+import threading
+
+from tracing import NOOP_SPAN, Tracer
+
+
+def test_disabled_tracer_returns_noop_span():
+    tracer = Tracer(enabled=False)
+    with tracer.span("anything", selector="#fn") as trace:
+        trace.set(bytes=10)
+    assert trace is NOOP_SPAN
+    assert tracer.spans() == []
+
+
+def test_spans_nest_and_export(tmp_path):
+    tracer = Tracer(enabled=True)
+    with tracer.span("perform_action", action="search_car") as outer:
+        step = ("fill", 'form.search-bar input[name="search"]', "BMW")
+        # The span _run_step opens around each step
+        with tracer.span(f"step.{step[0]}", args=step[1:]) as inner:
+            inner.set(bytes=3)
+
+    spans = {span.name: span for span in tracer.spans()}
+    assert spans["step.fill"].parent_id == outer.span_id
+    assert spans["perform_action"].parent_id is None
+
+    tracer.export_chrome(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    fill = next(event for event in events if event["name"] == "step.fill")
+    assert fill["ph"] == "X" and fill["dur"] >= 0
+    assert fill["args"]["args"] == ['form.search-bar input[name="search"]', "BMW"] and fill["args"]["bytes"] == 3
+
+    tracer.export_jsonl(tmp_path / "spans.jsonl")
+    lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["step.fill", "perform_action"]
+
+
+def test_error_is_recorded_and_threads_do_not_share_parents():
+    tracer = Tracer(enabled=True)
+    try:
+        with tracer.span("goto"):
+            raise TimeoutError("slow")
+    except TimeoutError:
+        pass
+
+    with tracer.span("main"):
+        thread = threading.Thread(target=lambda: tracer.span("worker").__enter__().__exit__(None, None, None))
+        thread.start()
+        thread.join()
+
+    spans = {span.name: span for span in tracer.spans()}
+    assert spans["goto"].attrs["error"] == "TimeoutError: slow"
+    assert spans["worker"].parent_id is None
+
@@ -0,0 +1,118 @@
+import playwright_actions
+import warm_pages
+from warm_pages import WarmPagePool, page_profile
+
+
+class FakePage:
+    def __init__(self, context, url):
+        self.context = context
+        self.url = url
+        self.closed = False
+        self.scripts = []
+
+    def is_closed(self):
+        return self.closed or self.context.closed
+
+    def close(self):
+        self.closed = True
+
+    def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    def remove_listener(self, event, handler):
+        raise KeyError(event)
+
+    def evaluate(self, script):
+        self.scripts.append(script)
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+        self.cookies_cleared = 0
+
+    def new_page(self, url, wait_until=None, blocker=None):
+        page = FakePage(self, url)
+        page.wait_until = wait_until
+        page.blocker = blocker
+        self.pages.append(page)
+        return page
+
+    def clear_cookies(self):
+        self.cookies_cleared += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(monkeypatch, size=1, max_uses=20):
+    site = playwright_actions.site_url()
+    monkeypatch.setattr(warm_pages, "new_context", lambda browser: FakeContext())
+    monkeypatch.setattr(playwright_actions, "open_site",
+                        lambda context, wait_until=None, blocker=None: context.new_page(site, wait_until, blocker))
+    return WarmPagePool(size, max_uses, max_profiles=2), site
+
+
+def test_idle_work_prepares_pages_ahead_of_time(monkeypatch):
+    pool, _ = make_pool(monkeypatch, size=2)
+    while pool.needs_work():
+        pool.do_idle_work(browser=None)
+    assert pool._count(warm_pages.default_profile()) == 2
+
+    warm = pool.take(browser=None)
+    assert (pool.hits, pool.misses) == (1, 0)
+    pool.give_back(warm)
+    assert pool.needs_work()  # The used page still has to be reset
+
+    pool.do_idle_work(browser=None)
+    assert not pool.needs_work()
+    assert warm.page.scripts == [warm_pages.RESET_PAGE_JS]
+    assert warm.context.cookies_cleared == 1
+
+
+def test_reset_closes_popups_and_drops_pages_that_left_the_site(monkeypatch):
+    pool, site = make_pool(monkeypatch)
+    warm = pool.take(browser=None)
+    assert pool.misses == 1
+    popup = warm.context.new_page(site + "search?q=BMW")
+    pool.give_back(warm)
+
+    reused = pool.take(browser=None)
+    assert reused is warm and popup.closed
+
+    warm.page.url = site + "submit.html"
+    pool.give_back(warm)
+    replacement = pool.take(browser=None)
+    assert replacement is not warm and warm.context.closed
+
+
+def test_pages_are_replaced_after_max_uses(monkeypatch):
+    pool, _ = make_pool(monkeypatch, max_uses=2)
+    first = pool.take(browser=None)
+    pool.give_back(first)
+    assert pool.take(browser=None) is first
+    pool.give_back(first)
+    assert first.context.closed
+    assert pool.needs_work()
+
+
+def test_pages_are_kept_per_load_state_and_blocking_profile(monkeypatch):
+    pool, _ = make_pool(monkeypatch)
+    lean = page_profile("commit", ({"image", "font"}, True))
+    plain = page_profile("load", None)
+
+    warm = pool.take(browser=None, profile=lean)
+    assert warm.page.wait_until == "commit"
+    assert warm.page.blocker.resource_types == {"image", "font"} and warm.page.blocker.third_party
+    pool.give_back(warm)
+
+    other = pool.take(browser=None, profile=plain)
+    assert other is not warm and other.page.blocker is None
+    pool.give_back(other)
+    assert pool.take(browser=None, profile=lean) is warm
+    pool.give_back(warm)
+
+    # A third profile evicts the least recently used one
+    pool.take(browser=None, profile=page_profile("networkidle", None))
+    assert other.context.closed and not warm.context.closed
@@ -0,0 +1,167 @@
+#tracing.py
+import atexit
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from config import CONFIG
+
+# Innermost open span of the current thread / asyncio task
+_current = contextvars.ContextVar("current_span", default=None)
+_ids = itertools.count(1)
+
+
+class Span:
+    """One timed operation; use as a context manager and add attributes with set()"""
+
+    __slots__ = ("tracer", "name", "attrs", "span_id", "parent_id", "thread_id", "start_ns", "end_ns", "_token")
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(_ids)
+        parent = _current.get()
+        self.parent_id = parent.span_id if parent else None
+        self.thread_id = threading.get_ident()
+        self.start_ns = None
+        self.end_ns = None
+        self._token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self):
+        return {
+            "name": self.name, "span_id": self.span_id, "parent_id": self.parent_id,
+            "thread_id": self.thread_id, "start_ns": self.start_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6, "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    """Returned while tracing is off: entering, leaving and set() do nothing"""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects finished spans and exports them as Chrome trace JSON or JSONL.
+
+    Spans nest through a context variable, so a span opened inside another
+    one (same thread or asyncio task, or a thread started with a copied
+    context) records it as its parent. The buffer keeps the last
+    `max_spans` spans.
+    """
+
+    def __init__(self, enabled=None, max_spans=None):
+        settings = CONFIG.get("tracing", {})
+        self.enabled = settings.get("enabled", False) if enabled is None else enabled
+        self.max_spans = max_spans or settings.get("max_spans", 100000)
+        self._spans = deque(maxlen=self.max_spans)
+        self._lock = threading.Lock()
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def export_chrome(self, path):
+        """Write the spans as Chrome trace events (open in Perfetto or chrome://tracing)"""
+        pid = os.getpid()
+        events = [{
+            "name": s.name,
+            "cat": s.name.split(".")[0],
+            "ph": "X",
+            "ts": s.start_ns / 1000,
+            "dur": (s.end_ns - s.start_ns) / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": dict(s.attrs, span_id=s.span_id, parent_id=s.parent_id),
+        } for s in self.spans()]
+        _makedirs_for(path)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+        return len(events)
+
+    def export_jsonl(self, path):
+        spans = self.spans()
+        _makedirs_for(path)
+        with open(path, "w") as f:
+            for s in spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+        return len(spans)
+
+    def export(self):
+        """Write both formats to the paths in CONFIG["tracing"]"""
+        if not self.spans():
+            return
+        settings = CONFIG.get("tracing", {})
+        chrome_path = settings.get("chrome_path", "traces/trace.json")
+        jsonl_path = settings.get("jsonl_path", "traces/spans.jsonl")
+        count = self.export_chrome(chrome_path)
+        self.export_jsonl(jsonl_path)
+        print(f"🧭 Wrote {count} spans to {chrome_path} and {jsonl_path}")
+
+    def _finish(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+
+def _makedirs_for(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+
+_tracer = Tracer()
+if _tracer.enabled:
+    atexit.register(_tracer.export)
+
+
+def get_tracer():
+    return _tracer
+
+
+def span(name, **attrs):
+    """Open a span on the shared tracer; costs one attribute check while tracing is off"""
+    if not _tracer.enabled:
+        return NOOP_SPAN
+    return Span(_tracer, name, attrs)
+
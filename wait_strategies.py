@@ -0,0 +1,173 @@
+#wait_strategies.py
+import time
+from contextlib import contextmanager
+
+from config import CONFIG
+from tracing import span
+
+# Resolves once window.scrollY has stayed the same for a few animation frames,
+# i.e. the smooth scroll triggered by an anchor click has finished.
+SCROLL_SETTLED_JS = """
+() => new Promise(resolve => {
+    let last = window.scrollY;
+    let stableFrames = 0;
+    function tick() {
+        if (window.scrollY === last) {
+            stableFrames += 1;
+            if (stableFrames >= 3) {
+                resolve(last);
+                return;
+            }
+        } else {
+            stableFrames = 0;
+            last = window.scrollY;
+        }
+        requestAnimationFrame(tick);
+    }
+    requestAnimationFrame(tick);
+})
+"""
+
+FORM_CLEARED_JS = "() => !document.querySelector('#fn').value"
+
+
+class WaitRecorder:
+    """Collects how long each wait actually took"""
+
+    def __init__(self):
+        self.waits = []
+
+    @contextmanager
+    def measure(self, label):
+        start = time.perf_counter()
+        try:
+            with span("wait", label=label):
+                yield
+        finally:
+            self.waits.append((label, (time.perf_counter() - start) * 1000))
+
+    @property
+    def total_ms(self):
+        return sum(ms for _, ms in self.waits)
+
+    def summary(self):
+        details = ", ".join(f"{label} {ms:.0f}ms" for label, ms in self.waits)
+        return f"{self.total_ms:.0f}ms waiting ({details})" if details else "no waits"
+
+
+def get_wait_until(instruction=None):
+    """Load state to wait for: instruction override, then per-action config, then default"""
+    policies = CONFIG.get("wait_until", {})
+    instruction = instruction or {}
+    if instruction.get("wait_until"):
+        return instruction["wait_until"]
+    return policies.get(instruction.get("action"), policies.get("default", "load"))
+
+
+def wait_timeout():
+    return CONFIG.get("wait_timeout_ms", 10000)
+
+
+def wait_for_page_ready(page, wait_until, recorder):
+    """Wait until the demo site is loaded and its heading is rendered"""
+    with recorder.measure(f"page ready ({wait_until})"):
+        page.wait_for_load_state(wait_until, timeout=wait_timeout())
+        page.locator("h1.welcome").wait_for(state="visible", timeout=wait_timeout())
+
+
+def wait_for_new_page(new_page, wait_until, recorder):
+    with recorder.measure(f"new page ({wait_until})"):
+        new_page.wait_for_load_state(wait_until, timeout=wait_timeout())
+
+
+def go_to_section(page, section, recorder):
+    """Click a navbar anchor and wait for the hash change and the scroll to finish"""
+    page.locator(f'a[href="{section}"]').click()
+    with recorder.measure(f"scroll to {section}"):
+        page.wait_for_function(
+            "hash => window.location.hash === hash", arg=section, timeout=wait_timeout()
+        )
+        page.locator(section).wait_for(state="visible", timeout=wait_timeout())
+        page.evaluate(SCROLL_SETTLED_JS)
+
+
+def scroll_into_view(page, selector, recorder):
+    page.locator(selector).scroll_into_view_if_needed()
+    with recorder.measure(f"scroll to {selector}"):
+        page.evaluate(SCROLL_SETTLED_JS)
+
+
+def click_and_capture_dialog(page, locator, recorder):
+    """Click something that opens an alert, accept it and return its message"""
+    page.on("dialog", _accept_dialog)
+    try:
+        with recorder.measure("dialog"):
+            with page.expect_event("dialog", timeout=wait_timeout()) as dialog_info:
+                locator.click()
+        return dialog_info.value.message
+    finally:
+        page.remove_listener("dialog", _accept_dialog)
+
+
+def wait_for_form_cleared(page, recorder):
+    with recorder.measure("form reset"):
+        page.wait_for_function(FORM_CLEARED_JS, timeout=wait_timeout())
+
+
+def _accept_dialog(dialog):
+    dialog.accept()
+
+
+def remove_dialog_handler(page):
+    """Drop a handler click_and_capture_dialog left behind (e.g. when the page was reused after an error)"""
+    try:
+        page.remove_listener("dialog", _accept_dialog)
+    except (KeyError, ValueError):
+        pass
+
+
+async def wait_for_page_ready_async(page, wait_until, recorder):
+    with recorder.measure(f"page ready ({wait_until})"):
+        await page.wait_for_load_state(wait_until, timeout=wait_timeout())
+        await page.locator("h1.welcome").wait_for(state="visible", timeout=wait_timeout())
+
+
+async def wait_for_new_page_async(new_page, wait_until, recorder):
+    with recorder.measure(f"new page ({wait_until})"):
+        await new_page.wait_for_load_state(wait_until, timeout=wait_timeout())
+
+
+async def go_to_section_async(page, section, recorder):
+    await page.locator(f'a[href="{section}"]').click()
+    with recorder.measure(f"scroll to {section}"):
+        await page.wait_for_function(
+            "hash => window.location.hash === hash", arg=section, timeout=wait_timeout()
+        )
+        await page.locator(section).wait_for(state="visible", timeout=wait_timeout())
+        await page.evaluate(SCROLL_SETTLED_JS)
+
+
+async def scroll_into_view_async(page, selector, recorder):
+    await page.locator(selector).scroll_into_view_if_needed()
+    with recorder.measure(f"scroll to {selector}"):
+        await page.evaluate(SCROLL_SETTLED_JS)
+
+
+async def click_and_capture_dialog_async(page, locator, recorder):
+    page.on("dialog", _accept_dialog_async)
+    try:
+        with recorder.measure("dialog"):
+            async with page.expect_event("dialog", timeout=wait_timeout()) as dialog_info:
+                await locator.click()
+        return (await dialog_info.value).message
+    finally:
+        page.remove_listener("dialog", _accept_dialog_async)
+
+
+async def wait_for_form_cleared_async(page, recorder):
+    with recorder.measure("form reset"):
+        await page.wait_for_function(FORM_CLEARED_JS, timeout=wait_timeout())
+
+
+async def _accept_dialog_async(dialog):
+    await dialog.accept()
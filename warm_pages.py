@@ -0,0 +1,195 @@
+#warm_pages.py
+from collections import OrderedDict, deque
+
+from config import CONFIG
+from launch_profiles import ResourceBlocker, blocking_rules
+from screenshot_pipeline import ScreenshotOptions
+from site_mirror import new_context
+from tracing import span
+from wait_strategies import get_wait_until, remove_dialog_handler, wait_timeout
+
+# Puts a used page back into the state the site loads in: forms cleared,
+# no #section in the URL, storage empty and scrolled to the top
+RESET_PAGE_JS = """
+() => {
+    document.querySelectorAll('form').forEach(form => form.reset());
+    try {
+        localStorage.clear();
+        sessionStorage.clear();
+    } catch (e) {}
+    history.replaceState(null, '', location.pathname + location.search);
+    window.scrollTo({top: 0, left: 0, behavior: 'instant'});
+    return window.scrollY;
+}
+"""
+
+
+def page_profile(wait_until, rules):
+    """Key for pages opened the same way: the load state goto waited for and what the page blocks.
+
+    `rules` is launch_profiles.blocking_rules() for the action, or None.
+    """
+    return wait_until, (None if rules is None else (frozenset(rules[0]), rules[1]))
+
+
+def default_profile():
+    """The profile of an instruction without overrides, prepared before any action asks"""
+    return page_profile(get_wait_until(), blocking_rules(None, ScreenshotOptions()))
+
+
+class WarmPage:
+    """A page (in its own context) that is already on the site"""
+
+    def __init__(self, context, page, profile):
+        self.context = context
+        self.page = page
+        self.profile = profile
+        self.uses = 0
+
+    def close(self):
+        try:
+            self.context.close()
+        except Exception:
+            pass
+
+
+class WarmPagePool:
+    """Pages that are navigated, loaded and settled before an action asks for one.
+
+    Pages are kept per profile (see page_profile): the blocker is
+    installed before goto, so a page only serves actions that wait for the
+    same load state and block the same requests. The `max_profiles` most
+    recently used profiles keep `size` pages each; older ones are closed.
+
+    Owned by a single PooledBrowser and only used from its worker thread,
+    so nothing here is locked. Used pages come back "dirty" and are reset
+    (or replaced after `max_uses`) while the worker has nothing else to do.
+    """
+
+    def __init__(self, size=None, max_uses=None, max_profiles=None):
+        settings = CONFIG.get("warm_pages", {})
+        self.size = settings.get("size", 1) if size is None else size
+        self.max_uses = max_uses or settings.get("max_uses", 20)
+        self.max_profiles = max_profiles or settings.get("max_profiles", 2)
+        self.hits = 0
+        self.misses = 0
+        # profile -> (clean, dirty) deques, most recently used profile last
+        self._profiles = OrderedDict()
+        self._paused = False
+
+    def take(self, browser, profile=None):
+        """A ready page: a clean one, else a reset dirty one, else a freshly opened one"""
+        profile = profile or default_profile()
+        clean, dirty = self._slot(profile)
+        with span("page.warm") as trace:
+            while clean or dirty:
+                warm = clean.popleft() if clean else self._reset(dirty.popleft())
+                if warm is not None and not warm.page.is_closed():
+                    self.hits += 1
+                    trace.set(hit=True, uses=warm.uses)
+                    return warm
+            self.misses += 1
+            trace.set(hit=False)
+            return self._open(browser, profile)
+
+    def give_back(self, warm):
+        warm.uses += 1
+        slot = self._profiles.get(warm.profile)
+        if (slot is None or warm.uses >= self.max_uses or warm.page.is_closed()
+                or self._count(warm.profile) >= self.size):
+            warm.close()
+            return
+        slot[1].append(warm)
+
+    def needs_work(self):
+        return not self._paused and self._next_work() is not None
+
+    def do_idle_work(self, browser):
+        """Reset one used page or open one new page; called while the worker is idle"""
+        profile = self._next_work()
+        if profile is None:
+            return
+        clean, dirty = self._profiles[profile]
+        try:
+            with span("page.refill", dirty=len(dirty)):
+                if dirty:
+                    warm = self._reset(dirty.popleft())
+                    if warm is not None:
+                        clean.append(warm)
+                else:
+                    clean.append(self._open(browser, profile))
+        except Exception as e:
+            print(f"⚠️ Could not prepare a warm page: {e}")
+            # Do not retry in a tight loop; resume() is called after the next task
+            self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    def clear(self):
+        while self._profiles:
+            self._close_slot(self._profiles.popitem()[1])
+
+    def _slot(self, profile):
+        """The (clean, dirty) deques of a profile, marked as most recently used"""
+        if profile not in self._profiles:
+            self._profiles[profile] = (deque(), deque())
+            while len(self._profiles) > self.max_profiles:
+                self._close_slot(self._profiles.popitem(last=False)[1])
+        self._profiles.move_to_end(profile)
+        return self._profiles[profile]
+
+    def _next_work(self):
+        """The profile that needs a page reset or opened, most recently used first"""
+        if not self._profiles and self.size:
+            self._slot(default_profile())
+        for profile in reversed(self._profiles):
+            clean, dirty = self._profiles[profile]
+            if dirty or self._count(profile) < self.size:
+                return profile
+        return None
+
+    def _count(self, profile):
+        clean, dirty = self._profiles.get(profile, ((), ()))
+        return len(clean) + len(dirty)
+
+    @staticmethod
+    def _close_slot(slot):
+        for pages in slot:
+            while pages:
+                pages.popleft().close()
+
+    def _open(self, browser, profile):
+        from playwright_actions import open_site
+        wait_until, rules = profile
+        blocker = None
+        if rules is not None:
+            blocker = ResourceBlocker({"resource_types": rules[0], "third_party": rules[1]})
+        context = new_context(browser)
+        try:
+            page = open_site(context, wait_until, blocker=blocker)
+            # Nobody is waiting for this page yet, so let it finish loading completely
+            page.wait_for_load_state("load", timeout=wait_timeout())
+        except Exception:
+            context.close()
+            raise
+        return WarmPage(context, page, profile)
+
+    def _reset(self, warm):
+        """Return the page to its just-loaded state, or close it and return None"""
+        from playwright_actions import site_url
+        try:
+            for other in warm.context.pages:
+                if other != warm.page:
+                    other.close()  # Search results and booking pages opened by the action
+            if warm.page.is_closed() or warm.page.url.split("#")[0] != site_url().split("#")[0]:
+                warm.close()
+                return None
+            remove_dialog_handler(warm.page)
+            warm.page.evaluate(RESET_PAGE_JS)
+            warm.context.clear_cookies()
+            return warm
+        except Exception as e:
+            print(f"⚠️ Could not reset a warm page: {e}")
+            warm.close()
+            return None